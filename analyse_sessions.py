@@ -0,0 +1,171 @@
+"""
+Analyse hors ligne du journal des sessions (voir journal.py).
+
+    journal = lire_journal("journal/")      # colonnes NumPy, triées par horodatage
+    notes = rejouer(journal)                # renote chaque événement par lots
+    resume = convergence(journal, seuil=70) # une ligne par session
+
+lire_journal relit tous les segments d'un dossier : fermés (Parquet ou CSV)
+et en cours d'écriture (CSV). rejouer fait passer tous les événements par la
+simulation par lots (calculer_mesures_lot, un appel par niveau et par jeu
+d'options) : on peut ainsi renoter des sessions avec un autre barème, ou
+après une modification du modèle, sans les rejouer une à une. Le mode
+« engagement des unités » est rejoué par lot lui aussi (noyaux.py).
+
+En ligne de commande : python analyse_sessions.py <dossier> [seuil]
+"""
+
+import csv
+import glob
+import os
+import sys
+
+import numpy as np
+
+from bareme import compiler_bareme
+from data import ORDRE_MERIT, ORDRE_SLIDERS, FLEXIBILITE
+from journal import COLONNES_JOURNAL, SEPARATEUR_OPTIONS
+from scenarios import charger_scenario
+from simulation import calculer_mesures_lot
+
+_COLONNES_TEXTE = ("session", "scenario", "options")
+
+
+def lire_journal(dossier: str) -> dict:
+    """
+    Relit tous les segments du journal d'un dossier.
+
+    Returns:
+        dict {colonne: tableau (N,)} (colonnes de journal.COLONNES_JOURNAL), trié par
+        horodatage : session, scenario, options (str), horodatage (s), une colonne
+        d'unités par slider (int), score (float, NaN si le niveau n'existait plus)
+    """
+    morceaux = []
+    for chemin in sorted(glob.glob(os.path.join(dossier, "sessions-*.parquet"))):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(chemin)
+        morceaux.append({nom: table.column(nom).to_numpy(zero_copy_only=False) for nom in COLONNES_JOURNAL})
+    for motif in ("sessions-*.csv", "journal-*.csv"):
+        for chemin in sorted(glob.glob(os.path.join(dossier, motif))):
+            with open(chemin, newline="", encoding="utf-8") as f:
+                lignes = list(csv.DictReader(f))
+            morceaux.append({nom: [ligne[nom] for ligne in lignes] for nom in COLONNES_JOURNAL})
+
+    journal = {}
+    for nom in COLONNES_JOURNAL:
+        valeurs = [valeur for morceau in morceaux for valeur in morceau[nom]]
+        if nom in _COLONNES_TEXTE:
+            journal[nom] = np.array(valeurs, dtype=object)
+        elif nom in ORDRE_SLIDERS:
+            journal[nom] = np.array(valeurs, dtype=float).astype(np.int64)
+        else:
+            journal[nom] = np.array(valeurs, dtype=float)
+
+    ordre = np.argsort(journal["horodatage"], kind="stable")
+    return {nom: colonne[ordre] for nom, colonne in journal.items()}
+
+
+def rejouer(journal: dict, bareme: dict | None = None) -> dict:
+    """
+    Renote tous les événements par la simulation par lots.
+
+    Args:
+        journal: résultat de lire_journal
+        bareme: barème de notation (None : celui du niveau de chaque événement)
+
+    Returns:
+        dict : mesures {mesure: tableau (N,)}, scores {critère: tableau (N,)},
+        score_total (N,) — NaN pour les événements dont le niveau n'existe plus
+    """
+    nb = len(journal["horodatage"])
+    unites = np.column_stack([journal[s] for s in ORDRE_MERIT]).astype(float).reshape(nb, len(ORDRE_MERIT))
+    flexibilite = journal[FLEXIBILITE].astype(float)
+    mesures, scores = {}, {}
+    score_total = np.full(nb, np.nan)
+
+    groupes = {(s, o) for s, o in zip(journal["scenario"], journal["options"])}
+    for scenario_id, options in sorted(groupes):
+        try:
+            scenario = charger_scenario(scenario_id)
+        except ValueError:
+            continue
+        masque = (journal["scenario"] == scenario_id) & (journal["options"] == options)
+        mesures_groupe = calculer_mesures_lot(
+            unites[masque], scenario=scenario, flexibilite=flexibilite[masque],
+            ecretement="ecretement" in options.split(SEPARATEUR_OPTIONS),
+            engagement="engagement" in options.split(SEPARATEUR_OPTIONS),
+        )
+        notation = compiler_bareme(bareme if bareme is not None else scenario.bareme).noter(mesures_groupe)
+
+        for nom, valeurs in mesures_groupe.items():
+            mesures.setdefault(nom, np.full(nb, np.nan))[masque] = valeurs
+        for nom, points in notation["scores"].items():
+            scores.setdefault(nom, np.full(nb, np.nan))[masque] = points
+        score_total[masque] = notation["score_total"]
+
+    return {"mesures": mesures, "scores": scores, "score_total": score_total}
+
+
+def convergence(journal: dict, seuil: float = 70.0, scores: np.ndarray | None = None) -> dict:
+    """
+    Résumé de chaque session : comment le joueur s'approche d'un bon mix.
+
+    Args:
+        journal: résultat de lire_journal
+        seuil: score considéré comme atteint
+        scores: score de chaque événement (défaut : la colonne score du journal ;
+                rejouer(journal)["score_total"] pour un autre barème)
+
+    Returns:
+        dict {colonne: tableau (nb_sessions,)} : session, nb_evenements, duree (s),
+        score_initial (premier score affiché : les événements de l'écran d'accueil
+        sont notés NaN), meilleur_score, score_final, evenements_avant_seuil et
+        secondes_avant_seuil (-1 / NaN si le seuil n'est jamais atteint)
+    """
+    scores = journal["score"] if scores is None else np.asarray(scores, dtype=float)
+    sessions, inverse = np.unique(journal["session"].astype(str), return_inverse=True)
+    # Tri par session puis par horodatage : chaque session devient une tranche contiguë
+    ordre = np.lexsort((journal["horodatage"], inverse))
+    inverse, horodatage, scores = inverse[ordre], journal["horodatage"][ordre], scores[ordre]
+    debuts = np.searchsorted(inverse, np.arange(len(sessions)))
+    fins = np.append(debuts[1:], len(inverse))
+
+    nb = len(sessions)
+    resume = {
+        "session": sessions,
+        "nb_evenements": fins - debuts,
+        "duree": horodatage[np.maximum(fins - 1, 0)] - horodatage[debuts] if nb else np.zeros(0),
+        "score_initial": np.full(nb, np.nan),
+        "meilleur_score": np.full(nb, np.nan),
+        "score_final": scores[np.maximum(fins - 1, 0)] if nb else np.zeros(0),
+        "evenements_avant_seuil": np.full(nb, -1),
+        "secondes_avant_seuil": np.full(nb, np.nan),
+    }
+    for k, (debut, fin) in enumerate(zip(debuts, fins)):
+        tranche = scores[debut:fin]
+        if np.all(np.isnan(tranche)):
+            continue
+        resume["score_initial"][k] = tranche[~np.isnan(tranche)][0]
+        resume["meilleur_score"][k] = np.nanmax(tranche)
+        atteint = np.flatnonzero(tranche >= seuil)
+        if len(atteint):
+            resume["evenements_avant_seuil"][k] = atteint[0]
+            resume["secondes_avant_seuil"][k] = horodatage[debut + atteint[0]] - horodatage[debut]
+    return resume
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Usage : python analyse_sessions.py <dossier> [seuil]")
+    seuil = float(sys.argv[2]) if len(sys.argv) > 2 else 70.0
+    journal = lire_journal(sys.argv[1])
+    resume = convergence(journal, seuil, rejouer(journal)["score_total"])
+    atteint = resume["evenements_avant_seuil"] >= 0
+    print(f"{len(journal['horodatage'])} événements, {len(resume['session'])} sessions")
+    print(f"Seuil {seuil:g} atteint par {atteint.sum()} sessions")
+    if atteint.any():
+        print(f"  médiane : {np.median(resume['evenements_avant_seuil'][atteint]):g} événements, "
+              f"{np.median(resume['secondes_avant_seuil'][atteint]):.0f} s")
+    if len(resume["session"]):
+        print(f"Meilleur score médian : {np.nanmedian(resume['meilleur_score']):.1f}")
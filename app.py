@@ -3,43 +3,195 @@
 Application Dash principale — point d'entrée et callbacks.
 """
 
-from dash import Dash, html, dcc, dash_table, Input, Output, State, callback, clientside_callback
-
-from data import MOYENS_PRODUCTION, DEMANDE_HORAIRE, ORDRE_MERIT
-from simulation import calculer_production_horaire, calculer_indicateurs
-from translations import t
-
-from components.sidebar import creer_sidebar, lire_choix_joueur
-from components.metrics import creer_metriques, creer_message_etat, creer_tableau_details
+from dash import (
+    Dash, html, dcc, dash_table, Input, Output, State, MATCH,
+    callback, clientside_callback, ctx, no_update,
+)
+from urllib.parse import urlencode
+import gzip
+import math
+import mimetypes
+import os
+import secrets
+
+import numpy as np
+from flask import Response, abort, g, has_request_context, request, stream_with_context
+from werkzeug.security import safe_join
+from plotly.io.json import to_json_plotly
+
+from data import MOYENS_PRODUCTION, ORDRE_MERIT, ORDRE_SLIDERS, OPTIONS_SIMULATION, FLEXIBILITE
+from scenarios import SCENARIO_DEFAUT, charger_scenario, lister_scenarios, version_scenarios
+from simulation import carte_scores, simuler
+from trajectoire import simuler_trajectoire
+from partage import MAGASIN, NomPris, lire_url, construire_lien, decoder_mix, encoder_mix
+from export import FORMATS_EXPORT, exporter_dispatch
+from cache_reponses import CacheReponses
+from journal import JOURNAL
+from compression_http import installer_compression, lire_asset
+from translations import t, nom_source, LANGUES
+
+from components.sidebar import creer_sidebar, lire_choix_joueur, lire_options
+from components.metrics import (
+    creer_metriques, creer_fiabilite, creer_message_etat, creer_tableau_details, creer_tableau_caracteristiques,
+    creer_metriques_trajectoire,
+)
 from components.charts import (
     graphique_production_vs_demande,
+    fenetre_zoom,
+    SEUIL_DETAIL,
     graphique_mix_energetique,
     graphique_decomposition_score,
     graphique_cout_par_source,
     graphique_co2_par_source,
+    graphique_carte,
+    graphique_trajectoire,
+    figure_demande_json,
 )
-from components.welcome import creer_ecran_accueil, creer_section_pedagogique
+from components.welcome import creer_ecran_accueil, creer_section_pedagogique, charger_section
 
 
 # =============================================================================
 # Initialisation de l'application Dash
 # =============================================================================
 
-app = Dash(
+class DashLayoutPreserialise(Dash):
+    """
+    Dash dont le layout initial (statique) est sérialisé une seule fois :
+    /_dash-layout renvoie directement les octets JSON pré-calculés.
+    """
+
+    _layout_json: bytes | None = None
+
+    def preserialiser_layout(self) -> bytes:
+        """Sérialise le layout courant et le garde pour les requêtes suivantes."""
+        self._layout_json = to_json_plotly(self.get_layout()).encode("utf-8")
+        return self._layout_json
+
+    def serve_layout(self):
+        layout_json = self._layout_json or self.preserialiser_layout()
+        return self.backend.make_response(layout_json, mimetype="application/json")
+
+    def get_asset_url(self, path: str) -> str:
+        """URL d'un fichier de assets/ contenant l'empreinte de son contenu (cache « immutable »)."""
+        chemin = safe_join(self.config.assets_folder, path)
+        if chemin is None or not os.path.isfile(chemin):
+            return super().get_asset_url(path)
+        empreinte, _ = lire_asset(chemin)
+        return f"{self.config.requests_pathname_prefix}assets-v/{empreinte}/{path}"
+
+
+app = DashLayoutPreserialise(
     __name__,
     title="⚡ Équilibre du Réseau Électrique",
     update_title=None,
     assets_folder="assets",
+    # Les sections chargées à la demande n'existent pas dans le layout initial
+    suppress_callback_exceptions=True,
 )
 
 server = app.server  # pour déploiement WSGI (gunicorn, etc.)
 
+# Compression gzip / brotli des réponses (voir compression_http.py) — enregistrée
+# avant les autres hooks after_request pour s'exécuter après eux
+installer_compression(server)
+
+
+# =============================================================================
+# Ressources statiques pré-calculées
+# =============================================================================
+
+def url_graphique_demande(lang: str, scenario_id: str) -> str:
+    """
+    URL de la courbe de demande d'un niveau, avec la version du registre des scénarios :
+    un niveau modifié sur disque change l'URL, le navigateur ne garde pas l'ancienne figure.
+    """
+    lister_scenarios()  # tient compte des fichiers modifiés (voir version_scenarios)
+    return f"/graphiques/demande-{lang}.json?{urlencode({'s': scenario_id, 'v': version_scenarios()})}"
+
+
+@server.route("/graphiques/demande-<lang>.json")
+def servir_graphique_demande(lang):
+    """
+    Courbe de demande de l'écran d'accueil (?s=<scénario>&v=<version>), sérialisée une fois
+    par langue et par scénario, et mise en cache HTTP un jour si la version est l'actuelle.
+    """
+    scenario = request.args.get("s", SCENARIO_DEFAUT)
+    if lang not in LANGUES or scenario not in lister_scenarios():
+        abort(404)
+    # Ancienne version (page servie avant une modification du niveau) : contenu actuel, non figé
+    actuelle = request.args.get("v") == str(version_scenarios())
+    return Response(
+        figure_demande_json(lang, scenario),
+        mimetype="application/json",
+        headers={"Cache-Control": "public, max-age=86400" if actuelle else "no-cache"},
+    )
+
+
+@server.route("/assets-v/<empreinte>/<path:chemin>")
+def servir_asset(empreinte, chemin):
+    """
+    Fichier de assets/ sous une URL à empreinte (voir DashLayoutPreserialise.get_asset_url) :
+    mis en cache un an si l'empreinte est celle du contenu actuel.
+    """
+    fichier = safe_join(app.config.assets_folder, chemin)
+    if fichier is None or not os.path.isfile(fichier):
+        abort(404)
+    actuelle, contenu = lire_asset(fichier)
+    reponse = Response(contenu, mimetype=mimetypes.guess_type(fichier)[0] or "application/octet-stream")
+    if empreinte == actuelle:
+        reponse.cache_control.public = True
+        reponse.cache_control.max_age = 31536000
+        reponse.cache_control.immutable = True
+    else:
+        # Ancienne URL (page servie avant une modification) : contenu actuel, non figé
+        reponse.cache_control.no_cache = True
+    return reponse
+
+
+# Nombre maximal de mix par export (paramètres m / c répétés)
+_MAX_MIX_EXPORT = 100_000
+
+
+@server.route("/export/dispatch.<format_export>")
+def exporter(format_export):
+    """
+    Dispatch horaire en flux : /export/dispatch.parquet?m=<code>&m=<code>&c=<nom>...&s=<scénario>&o=<option>...
+    Formats : arrow (IPC stream), parquet, csv. Sans pyarrow, retombe sur du CSV.
+    Les options (o, répété) et le pilotage de la demande de chaque mix suivent le dispatch de l'interface.
+    """
+    scenario = request.args.get("s", SCENARIO_DEFAUT)
+    if format_export not in FORMATS_EXPORT or scenario not in lister_scenarios():
+        abort(404)
+    try:
+        mixes = [decoder_mix(code, scenario) for code in request.args.getlist("m")]
+        configurations = [MAGASIN.charger(nom) for nom in request.args.getlist("c")]
+    except ValueError:
+        abort(400)
+    if None in configurations:
+        abort(400)
+    mixes += [choix_joueur for choix_joueur, _, _ in configurations]
+    if not mixes or len(mixes) > _MAX_MIX_EXPORT:
+        abort(400)
+
+    unites = np.array([[choix[s] for s in ORDRE_MERIT] for choix in mixes], dtype=float)
+    flexibilite = np.array([choix.get(FLEXIBILITE, 0) for choix in mixes], dtype=float)
+    options = lire_options(request.args.getlist("o"))
+    format_effectif, flux = exporter_dispatch(unites, format_export, scenario, flexibilite, options)
+    return Response(
+        stream_with_context(flux),
+        mimetype=FORMATS_EXPORT[format_effectif],
+        headers={"Content-Disposition": f"attachment; filename=dispatch.{format_effectif}"},
+    )
+
 
 # =============================================================================
 # Layout
 # =============================================================================
 
 app.layout = html.Div(className="app-container", children=[
+    # URL de la page : un lien partagé (?m=... ou ?c=...) décrit un mix
+    dcc.Location(id="url", refresh=False),
+
     # Store pour la langue sélectionnée
     dcc.Store(id="lang-store", data="fr"),
 
@@ -68,6 +220,8 @@ app.layout = html.Div(className="app-container", children=[
     ]),
 ])
 
+app.preserialiser_layout()
+
 
 # =============================================================================
 # Callback de sélection de langue (clientside pour la réactivité)
@@ -77,7 +231,11 @@ clientside_callback(
     """
     function(n_fr, n_en, current_lang) {
         const ctx = dash_clientside.callback_context;
-        if (!ctx.triggered.length) return current_lang || "fr";
+        if (!ctx.triggered.length) {
+            // Chargement initial : langue éventuellement fixée par un lien partagé
+            const lang_url = new URLSearchParams(window.location.search).get("lang");
+            return lang_url === "en" || lang_url === "fr" ? lang_url : (current_lang || "fr");
+        }
         const triggered_id = ctx.triggered[0].prop_id.split(".")[0];
         return triggered_id === "btn-lang-fr" ? "fr" : "en";
     }
@@ -109,7 +267,39 @@ clientside_callback(
 
 
 # =============================================================================
-# Callback principal — mis à jour à chaque changement de slider ou de langue
+# Chargement à la demande du contenu lourd
+# =============================================================================
+
+# La courbe de demande est récupérée côté client (le navigateur la met en cache),
+# à l'URL versionnée rendue avec l'écran d'accueil (url_graphique_demande)
+clientside_callback(
+    """
+    function(url) {
+        return fetch(url).then(function(reponse) { return reponse.json(); });
+    }
+    """,
+    Output("graphique-demande-accueil", "figure"),
+    Input("url-graphique-demande", "data"),
+)
+
+
+@callback(
+    Output({"type": "section-contenu", "section": MATCH}, "children"),
+    Input({"type": "section-titre", "section": MATCH}, "n_clicks"),
+    State({"type": "section-titre", "section": MATCH}, "id"),
+    State("lang-store", "data"),
+    State("choix-scenario", "value"),
+    prevent_initial_call=True,
+)
+def ouvrir_section(n_clicks, id_titre, lang, scenario):
+    """Remplit une section repliable au premier clic ; les suivants ne font que la replier."""
+    if n_clicks != 1:
+        return no_update
+    return charger_section(id_titre["section"], lang if lang in LANGUES else "fr", scenario)
+
+
+# =============================================================================
+# Callback principal — mis à jour à chaque changement de slider, de niveau ou de langue
 # =============================================================================
 
 @callback(
@@ -120,53 +310,133 @@ clientside_callback(
     Output("sidebar-investissement", "children"),
     Output("sidebar-puissance", "children"),
     Output("sidebar-warning", "children"),
+    Output("sidebar-partage", "children"),
     Input("lang-store", "data"),
-    [Input(f"slider-{source_id}", "value") for source_id in ORDRE_MERIT],
+    Input("url", "search"),
+    Input("options-simulation", "value"),
+    Input("choix-scenario", "value"),
+    [Input(f"slider-{slider_id}", "value") for slider_id in ORDRE_SLIDERS],
 )
-def mettre_a_jour(lang, *slider_values):
-    """Callback principal : recalcule tout à chaque changement de slider ou de langue."""
-    lang = lang or "fr"
+def mettre_a_jour(lang, search, options, scenario, *slider_values):
+    """Callback principal : recalcule tout à chaque changement de slider, d'option, de niveau ou de langue."""
+    return construire_sorties(*lire_entrees(lang, search, options, scenario, slider_values, ctx.triggered_id))
+
+
+def lire_entrees(lang, search, options, scenario, slider_values, declencheur) -> tuple:
+    """
+    Entrées effectives du callback principal : (lang, choix_joueur, options, scenario_id).
+    Les sorties ne dépendent que de ces valeurs (clé du cache des réponses).
+    """
+    # Langue inconnue (valeur du store forgée) ramenée au français : les caches par langue restent bornés
+    lang = lang if lang in LANGUES else "fr"
     choix_joueur = lire_choix_joueur(slider_values)
+    options = lire_options(options)
+    scenario = scenario if scenario in lister_scenarios() else SCENARIO_DEFAUT
+
+    # Au chargement (ou si l'URL change), un lien partagé impose son mix, son niveau et
+    # (configuration nommée) ses options : la sidebar est reconstruite avec, dans la même réponse
+    if declencheur in (None, "url"):
+        choix_url, scenario_url, options_url = lire_url(search)
+        choix_joueur = choix_url or choix_joueur
+        scenario = scenario_url or scenario
+        options = options_url if options_url is not None else options
+
+    return lang, choix_joueur, options, scenario
+
+
+# Style sombre des tableaux du contenu principal
+_STYLE_TABLEAU = dict(
+    style_table={"overflowX": "auto"},
+    style_header={
+        "backgroundColor": "#252b3b",
+        "color": "#ffffff",
+        "fontWeight": "bold",
+        "border": "1px solid #333",
+    },
+    style_cell={
+        "backgroundColor": "#1a1f2e",
+        "color": "#e0e0e0",
+        "border": "1px solid #333",
+        "textAlign": "center",
+        "padding": "10px",
+    },
+    style_data_conditional=[
+        {"if": {"row_index": "odd"}, "backgroundColor": "#1e2433"},
+    ],
+)
+
+# Lignes vides du plan de trajectoire (actions à programmer)
+_NB_ACTIONS_TRAJECTOIRE = 8
+
+
+def construire_sorties(
+    lang: str,
+    choix_joueur: dict,
+    options: tuple = (),
+    scenario_id: str = SCENARIO_DEFAUT,
+) -> tuple:
+    """Construit toutes les sorties du callback principal pour un mix, des options, un niveau et une langue."""
+    scenario = charger_scenario(scenario_id)
 
     # --- Titres ---
     titre = t("titre_principal", lang)
     sous_titre = t("sous_titre", lang)
 
     # --- Sidebar reconstruite (pour la langue des labels) ---
-    sidebar = creer_sidebar(lang, choix_joueur)
+    sidebar = creer_sidebar(lang, choix_joueur, options, scenario)
 
     # --- Résumé sidebar ---
     cout_construction = sum(
-        (v or 0) * MOYENS_PRODUCTION[s]["cout_construction"]
-        for s, v in choix_joueur.items()
-    )
+        (choix_joueur.get(s) or 0) * scenario.moyens[s]["cout_construction"]
+        for s in ORDRE_MERIT
+    ) + (choix_joueur.get(FLEXIBILITE) or 0) * scenario.flexibilite["cout_construction"]
     puissance_installee = sum(
-        (v or 0) * MOYENS_PRODUCTION[s]["puissance"]
-        for s, v in choix_joueur.items()
+        (choix_joueur.get(s) or 0) * scenario.moyens[s]["puissance"]
+        for s in ORDRE_MERIT
     )
 
     sidebar_invest = t("sidebar_investissement", lang).format(montant=f"{cout_construction:,.0f}")
     sidebar_puissance = t("sidebar_puissance", lang).format(puissance=f"{puissance_installee:,.0f}")
 
     sidebar_warning = None
-    if puissance_installee < DEMANDE_HORAIRE.max():
+    if puissance_installee < scenario.demande.max():
         sidebar_warning = html.Div(
             t("sidebar_warning", lang),
             className="sidebar-warning",
         )
 
+    requete_export = urlencode(
+        {"m": encoder_mix(choix_joueur, scenario), "s": scenario_id, "o": list(options)}, doseq=True,
+    )
+    sidebar_partage = html.Div([
+        html.A(t("partage_lien", lang), href=construire_lien(choix_joueur, lang, scenario_id, options),
+               className="partage-lien"),
+        html.Div(className="partage-export", children=[
+            html.Span(t("export_titre", lang)),
+            *[
+                html.A(format_export.upper(), href=f"/export/dispatch.{format_export}?{requete_export}",
+                       className="partage-lien")
+                for format_export in FORMATS_EXPORT
+            ],
+        ]),
+    ])
+
     # --- Contenu principal ---
-    total_unites = sum(choix_joueur.values())
+    total_unites = sum(choix_joueur.get(s) or 0 for s in ORDRE_MERIT)
 
     if total_unites == 0:
         return (
-            creer_ecran_accueil(lang), titre, sous_titre,
-            sidebar, sidebar_invest, sidebar_puissance, sidebar_warning,
+            creer_ecran_accueil(lang, url_graphique_demande(lang, scenario_id)), titre, sous_titre,
+            sidebar, sidebar_invest, sidebar_puissance, sidebar_warning, sidebar_partage,
         )
 
-    # Simulation
-    df_prod = calculer_production_horaire(choix_joueur)
-    indicateurs = calculer_indicateurs(choix_joueur, df_prod)
+    # Simulation (mise en cache par mix, options et niveau)
+    df_prod, indicateurs = simuler(
+        tuple(choix_joueur[s] for s in ORDRE_MERIT), options, scenario_id, choix_joueur.get(FLEXIBILITE, 0),
+    )
+    # Score affiché, repris par le journal des sessions et gardé avec la réponse (memoriser_reponse)
+    if has_request_context():
+        g.score_affiche = indicateurs["score_total"]
 
     # Tableau détaillé
     colonnes_detail, donnees_detail = creer_tableau_details(indicateurs, lang)
@@ -180,10 +450,29 @@ def mettre_a_jour(lang, *slider_values):
         # Message d'état
         creer_message_etat(indicateurs, lang),
 
+        # Fiabilité (option « pannes fortuites »)
+        creer_fiabilite(indicateurs["fiabilite"], lang) if "fiabilite" in indicateurs else None,
+
+        # Pilotage de la demande
+        html.Div(
+            t("flexibilite_note", lang).format(energie=f"{indicateurs['energie_reportee']:,.0f}"),
+            className="info-box",
+        ) if indicateurs["energie_reportee"] > 0 else None,
+
+        # Écrêtement (option)
+        html.Div(
+            t("ecretement_note", lang).format(
+                energie=f"{indicateurs['energie_ecretee']:,.0f}",
+                cout=f"{indicateurs['cout_ecretement']:,.1f}",
+            ),
+            className="info-box",
+        ) if indicateurs["energie_ecretee"] > 0 else None,
+
         # Graphique principal
         html.H3(t("section_production_vs_demande", lang), className="section-title"),
         dcc.Graph(
-            figure=graphique_production_vs_demande(df_prod, choix_joueur, lang),
+            id="graphique-production",
+            figure=graphique_production_vs_demande(df_prod, choix_joueur, lang, scenario),
             config={"displayModeBar": False},
         ),
 
@@ -207,27 +496,7 @@ def mettre_a_jour(lang, *slider_values):
 
         # Tableau détaillé
         html.H3(t("section_details", lang), className="section-title"),
-        dash_table.DataTable(
-            columns=colonnes_detail,
-            data=donnees_detail,
-            style_table={"overflowX": "auto"},
-            style_header={
-                "backgroundColor": "#252b3b",
-                "color": "#ffffff",
-                "fontWeight": "bold",
-                "border": "1px solid #333",
-            },
-            style_cell={
-                "backgroundColor": "#1a1f2e",
-                "color": "#e0e0e0",
-                "border": "1px solid #333",
-                "textAlign": "center",
-                "padding": "10px",
-            },
-            style_data_conditional=[
-                {"if": {"row_index": "odd"}, "backgroundColor": "#1e2433"},
-            ],
-        ),
+        dash_table.DataTable(columns=colonnes_detail, data=donnees_detail, **_STYLE_TABLEAU),
 
         # Graphiques coût vs CO₂
         html.H3(t("section_cout_co2", lang), className="section-title"),
@@ -246,6 +515,68 @@ def mettre_a_jour(lang, *slider_values):
             ]),
         ]),
 
+        # Carte de deux sources : remplie par le callback mettre_a_jour_carte
+        html.H3(t("section_carte", lang), className="section-title"),
+        html.P(t("carte_note", lang), className="source-caption"),
+        html.Div(className="carte-controles", children=[
+            *[
+                dcc.Dropdown(
+                    id=id_liste,
+                    options=[
+                        {"label": f"{MOYENS_PRODUCTION[s]['emoji']} {nom_source(s, lang)}", "value": s}
+                        for s in ORDRE_MERIT
+                    ],
+                    value=defaut, clearable=False, searchable=False, persistence=True,
+                    className="carte-source",
+                )
+                for id_liste, defaut in (("carte-source-x", "nucleaire"), ("carte-source-y", "gaz"))
+            ],
+            dcc.RadioItems(
+                id="carte-mesure",
+                options=[{"label": t(f"carte_mesure_{m}", lang), "value": m} for m in ("score", "couverture")],
+                value="score", persistence=True, inline=True, className="carte-mesure",
+            ),
+        ]),
+        dcc.Graph(id="graphique-carte", config={"displayModeBar": False}),
+
+        # Trajectoire d'investissement : remplie par le callback mettre_a_jour_trajectoire
+        html.H3(t("section_trajectoire", lang), className="section-title"),
+        html.P(t("trajectoire_note", lang), className="source-caption"),
+        html.Div(className="trajectoire-controles", children=[
+            html.Div(className="trajectoire-reglage", children=[
+                html.Label(t("trajectoire_annees", lang)),
+                dcc.Slider(
+                    id="trajectoire-annees", min=10, max=30, step=1, value=20,
+                    marks={annees: str(annees) for annees in (10, 15, 20, 25, 30)}, persistence=True,
+                ),
+            ]),
+            html.Div(className="trajectoire-reglage", children=[
+                html.Label(t("trajectoire_croissance", lang)),
+                dcc.Slider(
+                    id="trajectoire-croissance", min=0, max=3, step=0.25, value=1,
+                    marks={taux: f"{taux} %" for taux in range(4)}, persistence=True,
+                ),
+            ]),
+        ]),
+        dash_table.DataTable(
+            id="trajectoire-actions",
+            columns=[
+                {"name": t("trajectoire_col_annee", lang), "id": "annee", "type": "numeric"},
+                {"name": t("trajectoire_col_source", lang), "id": "source", "presentation": "dropdown"},
+                {"name": t("trajectoire_col_unites", lang), "id": "unites", "type": "numeric"},
+            ],
+            data=[{"annee": None, "source": None, "unites": None} for _ in range(_NB_ACTIONS_TRAJECTOIRE)],
+            dropdown={"source": {"options": [
+                {"label": f"{MOYENS_PRODUCTION[s]['emoji']} {nom_source(s, lang)}", "value": s}
+                for s in ORDRE_MERIT
+            ]}},
+            editable=True, persistence=True, persisted_props=["data"],
+            css=[{"selector": ".Select-menu-outer", "rule": "display: block !important"}],
+            **_STYLE_TABLEAU,
+        ),
+        html.Div(id="trajectoire-resume"),
+        dcc.Graph(id="graphique-trajectoire", config={"displayModeBar": False}),
+
         # Section pédagogique
         creer_section_pedagogique(lang),
 
@@ -256,10 +587,292 @@ def mettre_a_jour(lang, *slider_values):
 
     return (
         contenu, titre, sous_titre,
-        sidebar, sidebar_invest, sidebar_puissance, sidebar_warning,
+        sidebar, sidebar_invest, sidebar_puissance, sidebar_warning, sidebar_partage,
+    )
+
+
+# =============================================================================
+# Zoom du graphique principal — détail horaire à la demande sur les horizons longs
+# =============================================================================
+
+@callback(
+    Output("graphique-production", "figure"),
+    Input("graphique-production", "relayoutData"),
+    State("lang-store", "data"),
+    State("url", "search"),
+    State("options-simulation", "value"),
+    State("choix-scenario", "value"),
+    [State(f"slider-{slider_id}", "value") for slider_id in ORDRE_SLIDERS],
+    prevent_initial_call=True,
+)
+def affiner_graphique_production(relayout, lang, search, options, scenario, *slider_values):
+    """
+    Horizon long : le graphique principal est agrégé par jour. Un zoom renvoie la
+    fenêtre visible, en détail horaire si elle est assez courte ; un double-clic
+    (autorange) revient à la vue d'ensemble.
+    """
+    lang, choix_joueur, options, scenario_id = lire_entrees(
+        lang, search, options, scenario, slider_values, ctx.triggered_id,
+    )
+    scenario = charger_scenario(scenario_id)
+    if scenario.nb_heures <= SEUIL_DETAIL or not relayout:
+        return no_update
+
+    if relayout.get("xaxis.autorange"):
+        fenetre = None
+    else:
+        fenetre = fenetre_zoom(relayout)
+        if fenetre is None:
+            return no_update
+
+    df_prod, _ = simuler(
+        tuple(choix_joueur[s] for s in ORDRE_MERIT), options, scenario_id, choix_joueur.get(FLEXIBILITE, 0),
+    )
+    return graphique_production_vs_demande(df_prod, choix_joueur, lang, scenario, fenetre)
+
+
+# =============================================================================
+# Carte de deux sources — score ou couverture de toute une grille de mix
+# =============================================================================
+
+@callback(
+    Output("graphique-carte", "figure"),
+    Input("carte-source-x", "value"),
+    Input("carte-source-y", "value"),
+    Input("carte-mesure", "value"),
+    State("lang-store", "data"),
+    State("url", "search"),
+    State("options-simulation", "value"),
+    State("choix-scenario", "value"),
+    [State(f"slider-{slider_id}", "value") for slider_id in ORDRE_SLIDERS],
+)
+def mettre_a_jour_carte(source_x, source_y, mesure, lang, search, options, scenario, *slider_values):
+    """
+    Carte de chaleur de deux sources, les autres sliders fixés. La carte est
+    recréée à chaque réponse du callback principal, ce qui déclenche ce
+    callback ; la grille est en cache par (sliders fixés, paire) : déplacer
+    l'un des deux sliders de la paire ne fait que déplacer le marqueur.
+    """
+    lang, choix_joueur, options, scenario_id = lire_entrees(
+        lang, search, options, scenario, slider_values, ctx.triggered_id,
+    )
+    carte = None
+    if source_x != source_y:
+        carte = carte_scores(
+            tuple(choix_joueur[s] for s in ORDRE_MERIT), source_x, source_y,
+            options, scenario_id, choix_joueur.get(FLEXIBILITE, 0),
+        )
+    return graphique_carte(carte, source_x, source_y, mesure, choix_joueur, lang)
+
+
+# =============================================================================
+# Trajectoire d'investissement — le mix actuel comme parc de l'année 0
+# =============================================================================
+
+@callback(
+    Output("trajectoire-resume", "children"),
+    Output("graphique-trajectoire", "figure"),
+    Input("trajectoire-annees", "value"),
+    Input("trajectoire-croissance", "value"),
+    Input("trajectoire-actions", "data"),
+    State("lang-store", "data"),
+    State("url", "search"),
+    State("options-simulation", "value"),
+    State("choix-scenario", "value"),
+    [State(f"slider-{slider_id}", "value") for slider_id in ORDRE_SLIDERS],
+)
+def mettre_a_jour_trajectoire(annees, croissance, actions, lang, search, options, scenario, *slider_values):
+    """
+    Trajectoire du mix des sliders selon le plan du tableau (lignes complètes
+    seulement). Les années déjà simulées sont en mémoire (trajectoire.py) :
+    modifier une action ne resimule que les années dont le parc change.
+    """
+    lang, choix_joueur, options, scenario_id = lire_entrees(
+        lang, search, options, scenario, slider_values, ctx.triggered_id,
+    )
+    plan = {
+        "annees": annees or 20,
+        "parc_initial": {s: choix_joueur.get(s) or 0 for s in ORDRE_MERIT},
+        FLEXIBILITE: choix_joueur.get(FLEXIBILITE) or 0,
+        "actions": [
+            action for action in actions or []
+            if all(action.get(cle) not in (None, "") for cle in ("annee", "source", "unites"))
+        ],
+        "croissance_demande": (croissance or 0) / 100,
+    }
+    try:
+        trajectoire = simuler_trajectoire(plan, scenario_id, options)
+    except ValueError as erreur:
+        return (
+            html.Div(t("trajectoire_plan_invalide", lang).format(erreur=erreur), className="warning-box"),
+            graphique_trajectoire(None, lang),
+        )
+    return creer_metriques_trajectoire(trajectoire, lang), graphique_trajectoire(trajectoire, lang)
+
+
+# =============================================================================
+# Cache des réponses du callback principal (voir cache_reponses.py)
+# =============================================================================
+
+CACHE_REPONSES = CacheReponses()
+
+_URL_CALLBACKS = app.config.routes_pathname_prefix + "_dash-update-component"
+_SORTIE_PRINCIPALE = "contenu-principal.children"
+
+
+def _cle_reponse(corps: dict) -> tuple | None:
+    """Clé de cache d'une requête du callback principal (None pour les autres callbacks)."""
+    # Callback à plusieurs sorties : "..sortie1...sortie2.."
+    if _SORTIE_PRINCIPALE not in str(corps.get("output", "")).strip(".").split("..."):
+        return None
+    valeurs = {entree["id"]: entree.get("value") for entree in corps.get("inputs", [])}
+    declencheurs = corps.get("changedPropIds") or [None]
+    declencheur = declencheurs[0] and declencheurs[0].split(".")[0]
+    lang, choix_joueur, options, scenario = lire_entrees(
+        valeurs.get("lang-store"), valeurs.get("url"), valeurs.get("options-simulation"),
+        valeurs.get("choix-scenario"), [valeurs.get(f"slider-{s}") for s in ORDRE_SLIDERS],
+        declencheur,
+    )
+    # Version du registre : un niveau modifié sur disque invalide les réponses (liste, noms...)
+    return lang, tuple(choix_joueur.get(s, 0) for s in ORDRE_SLIDERS), options, scenario, version_scenarios()
+
+
+# Cookie de session du journal des sessions (journal.py, si GRID_GAME_JOURNAL est défini)
+_COOKIE_SESSION = "grid_game_session"
+
+
+def _session_journal() -> str:
+    """Identifiant aléatoire de la session du navigateur, créé au premier appel."""
+    session = request.cookies.get(_COOKIE_SESSION, "")
+    if not (0 < len(session) <= 32 and session.isalnum()):
+        session = g.nouvelle_session = secrets.token_hex(8)
+    return session
+
+
+@server.before_request
+def servir_reponse_en_cache():
+    """Renvoie la réponse déjà sérialisée d'un callback principal, sans passer par Dash."""
+    if request.path != _URL_CALLBACKS or request.method != "POST":
+        return None
+    corps = request.get_json(silent=True)
+    cle = _cle_reponse(corps) if isinstance(corps, dict) else None
+    if cle is None:
+        return None
+
+    entree = CACHE_REPONSES.lire(cle)
+    if entree is None:
+        # Calculée par Dash : journalisée avec son score dans memoriser_reponse
+        g.cle_reponse = cle
+        return None
+    contenu, score = entree
+    _journaliser(cle, score)
+    if "gzip" in request.accept_encodings:
+        return Response(
+            contenu, mimetype="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(gzip.decompress(contenu), mimetype="application/json")
+
+
+def _journaliser(cle: tuple, score: float | None) -> None:
+    """
+    Journal des sessions : chaque appel, servi par le cache ou non, avec le score affiché
+    (None : écran d'accueil, sans score). Dépôt dans une file, sans E/S ni calcul.
+    """
+    if JOURNAL is not None:
+        _, unites, options, scenario, _ = cle
+        JOURNAL.enregistrer(_session_journal(), unites, options, scenario, math.nan if score is None else score)
+
+
+@server.after_request
+def memoriser_reponse(reponse):
+    """
+    Garde la réponse sérialisée d'un callback principal calculé par Dash, avec son score ;
+    la journalise et pose le cookie de session du journal.
+    """
+    cle = g.pop("cle_reponse", None)
+    score = g.pop("score_affiche", None)
+    if cle is not None:
+        _journaliser(cle, score)
+        if reponse.status_code == 200 and not reponse.direct_passthrough:
+            CACHE_REPONSES.ecrire(cle, reponse.get_data(), score)
+    session = g.pop("nouvelle_session", None)
+    if session is not None:
+        reponse.set_cookie(_COOKIE_SESSION, session, httponly=True, samesite="Lax")
+    return reponse
+
+
+# =============================================================================
+# Enregistrement d'une configuration nommée (magasin serveur)
+# =============================================================================
+
+@callback(
+    Output("configuration-enregistree", "children"),
+    Input("btn-enregistrer-configuration", "n_clicks"),
+    State("nom-configuration", "value"),
+    State("lang-store", "data"),
+    State("options-simulation", "value"),
+    State("choix-scenario", "value"),
+    [State(f"slider-{slider_id}", "value") for slider_id in ORDRE_SLIDERS],
+    prevent_initial_call=True,
+)
+def enregistrer_configuration(n_clicks, nom, lang, options, scenario, *slider_values):
+    """
+    Enregistre le mix courant, son niveau et ses options sous un nouveau nom ;
+    le lien ?c=<nom> les recharge. Un nom déjà pris n'est jamais remplacé.
+    """
+    lang = lang if lang in LANGUES else "fr"
+    if not n_clicks or not (nom or "").strip():
+        return no_update
+    nom = nom.strip()
+    scenario = scenario if scenario in lister_scenarios() else SCENARIO_DEFAUT
+    try:
+        MAGASIN.enregistrer(nom, lire_choix_joueur(slider_values), scenario, lire_options(options))
+    except NomPris:
+        return html.Div(t("partage_nom_pris", lang).format(nom=nom), className="sidebar-warning")
+    return html.A(
+        t("partage_enregistre", lang).format(nom=nom),
+        href=f"?{urlencode({'c': nom})}",
+        className="partage-lien",
     )
 
 
+# =============================================================================
+# Préchauffage (avant fork des workers gunicorn, voir gunicorn.conf.py)
+# =============================================================================
+
+# Mix représentatif : fait passer le callback principal par tous les graphiques
+_MIX_PRECHAUFFAGE = (20, 10, 10, 20, 5, 40, 5)
+
+
+def prechauffer() -> None:
+    """
+    Construit dans le processus maître tout ce qui est partagé en lecture seule :
+    figures sérialisées (octets), tableaux statiques par langue, layout sérialisé, traductions, et les imports
+    différés (plotly.graph_objects et ses classes de traces) déclenchés au premier rendu.
+    Les workers forkés héritent de ces pages mémoire sans les recopier.
+    """
+    app.preserialiser_layout()
+    for lang in LANGUES:
+        for scenario in lister_scenarios():
+            figure_demande_json(lang, scenario)
+            creer_tableau_caracteristiques(lang, scenario)
+        construire_sorties(lang, dict(zip(ORDRE_MERIT, _MIX_PRECHAUFFAGE)))
+        construire_sorties(lang, dict(zip(ORDRE_MERIT, _MIX_PRECHAUFFAGE)), OPTIONS_SIMULATION)
+        construire_sorties(lang, dict.fromkeys(ORDRE_MERIT, 0))
+
+    # Les configurations enregistrées sont simulées d'avance : un lien ?c=... est un succès de cache
+    for configuration in MAGASIN.lister().values():
+        try:
+            choix_joueur = decoder_mix(configuration["mix"], configuration["scenario"])
+        except ValueError:
+            continue
+        simuler(
+            tuple(choix_joueur[s] for s in ORDRE_MERIT), configuration["options"], configuration["scenario"],
+            choix_joueur[FLEXIBILITE],
+        )
+
+
 # =============================================================================
 # Point d'entrée
 # =============================================================================
@@ -0,0 +1,398 @@
+"""
+Balayage de paramètres — calibrage du catalogue (MOYENS_PRODUCTION) et du barème.
+
+Quand on retouche un coût, une intensité CO₂ ou la référence de LCOE du
+barème (80 €/MWh), on veut voir comment bougent la distribution des scores et
+le meilleur mix. Un balayage évalue une population fixe de mix pour chaque
+combinaison de valeurs des paramètres :
+    {
+      "scenario": "reference",
+      "nb_mix": 20000,
+      "graine": 0,
+      "parametres": {
+        "moyens.gaz.cout_production": [60, 75, 90],
+        "moyens.charbon.co2": [820, 1000],
+        "lcoe_reference": [60, 80, 100]
+      },
+      "precision": "float32"
+    }
+Un paramètre est un chemin pointé dans la description du scénario (format de
+scenarios.py ; un entier indexe une liste), ou un alias de ALIAS_PARAMETRES.
+Les chemins "bareme..." partent de BAREME_STANDARD si le niveau n'a pas de
+barème propre. "precision" (optionnel, "float64" par défaut) est la précision
+de stockage du dispatch (voir lots.py) : en "float32", un horizon long tient
+deux fois plus de mix par bloc.
+
+Les paramètres du barème ne changent pas le dispatch : pour chaque
+combinaison des paramètres du catalogue, les mesures de toute la population
+sont calculées une fois (calculer_mesures_lot), puis notées avec chaque
+variante du barème. Ces tâches sont réparties sur un pool de processus
+(démarrés par spawn) ; la population, tirée dans le catalogue du scénario
+balayé, est placée une seule fois en mémoire partagée, que chaque processus
+lit sans copie.
+
+Résultats : un tableau « tidy », une ligne par combinaison (valeurs des
+paramètres, quantiles des scores, meilleur mix et ses mesures), écrit dans
+<dossier>/resultats.csv au fil des tâches terminées. Relancé sur le même
+dossier avec la même définition, un balayage interrompu ne calcule que les
+combinaisons manquantes. figure_balayage trace l'effet d'un paramètre.
+
+En ligne de commande :
+    python balayage.py definition.json sortie/ [--processus N]
+écrit sortie/resultats.csv et sortie/resume.html (un graphique par paramètre).
+"""
+
+import copy
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from bareme import BAREME_STANDARD, compiler_bareme
+from data import MOYENS_PRODUCTION, ORDRE_MERIT
+from lots import type_stockage
+from scenarios import SCENARIO_DEFAUT, Scenario, charger_scenario, decrire_scenario
+from simulation import calculer_mesures_lot
+
+# Raccourcis pour les paramètres de calibrage courants
+ALIAS_PARAMETRES = {
+    # LCOE auquel le critère de coût tombe à 0 point (€/MWh)
+    "lcoe_reference": "bareme.criteres.cout.courbe.1.0",
+    # Couverture en dessous de laquelle le critère de couverture vaut 0 point (%)
+    "couverture_min": "bareme.criteres.couverture.courbe.0.0",
+}
+
+# Quantiles des scores de la population reportés pour chaque combinaison
+QUANTILES = {"score_p10": 10, "score_median": 50, "score_p90": 90}
+
+_FICHIER_DEFINITION = "balayage.json"
+_FICHIER_RESULTATS = "resultats.csv"
+
+# Population du processus courant, attachée depuis la mémoire partagée (voir _attacher)
+_POPULATION: np.ndarray | None = None
+_MEMOIRE = None
+
+
+# =============================================================================
+# Définition du balayage
+# =============================================================================
+
+def population_mix(nb_mix: int, graine: int = 0, scenario: "str | Scenario | None" = None) -> np.ndarray:
+    """
+    Population fixe de mix tirés uniformément entre 0 et max_unites (graine fixe).
+
+    Args:
+        scenario: niveau dont le catalogue borne les tirages (défaut : scénario par défaut)
+
+    Returns:
+        tableau (nb_mix, S) d'unités (ordre ORDRE_MERIT)
+    """
+    rng = np.random.default_rng(graine)
+    moyens = charger_scenario(scenario).moyens
+    maximums = np.array([moyens[s]["max_unites"] for s in ORDRE_MERIT])
+    return rng.integers(0, maximums + 1, size=(nb_mix, len(ORDRE_MERIT))).astype(float)
+
+
+def _chemin(parametre: str) -> list:
+    """Chemin d'un paramètre (alias résolu) : liste de clés et d'indices."""
+    chemin = ALIAS_PARAMETRES.get(parametre, parametre)
+    return [int(cle) if cle.isdigit() else cle for cle in chemin.split(".")]
+
+
+def _affecter(description: dict, parametre: str, valeur) -> None:
+    """Affecte une valeur dans une description de scénario (clés manquantes créées)."""
+    *parents, derniere = _chemin(parametre)
+    if parents and parents[0] == "bareme" and description.get("bareme") is None:
+        description["bareme"] = copy.deepcopy(BAREME_STANDARD)
+    noeud = description
+    for cle in parents:
+        noeud = noeud[cle] if isinstance(cle, int) else noeud.setdefault(cle, {})
+    noeud[derniere] = valeur
+
+
+def _du_bareme(parametre: str) -> bool:
+    return _chemin(parametre)[0] == "bareme"
+
+
+def _combinaisons(parametres: dict) -> list[tuple[tuple, list]]:
+    """
+    Combinaisons groupées par valeurs des paramètres du catalogue.
+
+    Returns:
+        [(valeurs du catalogue, [(numéro de combinaison, {paramètre: valeur}), ...]), ...]
+        — numéros dans l'ordre de itertools.product sur tous les paramètres
+    """
+    noms = list(parametres)
+    catalogue = [nom for nom in noms if not _du_bareme(nom)]
+    groupes: dict[tuple, list] = {}
+    for numero, valeurs in enumerate(itertools.product(*parametres.values())):
+        combinaison = dict(zip(noms, valeurs))
+        cle = tuple(combinaison[nom] for nom in catalogue)
+        groupes.setdefault(cle, []).append((numero, combinaison))
+    return list(groupes.items())
+
+
+def colonnes_resultats(parametres: dict) -> list[str]:
+    """Colonnes du tableau de résultats d'un balayage."""
+    return [
+        "combinaison", *parametres, "score_moyen", *QUANTILES, "score_max",
+        "part_couverture_totale", *[f"meilleur_{s}" for s in ORDRE_MERIT],
+        "meilleur_taux_couverture", "meilleur_lcoe", "meilleur_part_co2_evitee",
+    ]
+
+
+# =============================================================================
+# Évaluation (processus du pool)
+# =============================================================================
+
+def _attacher(nom: str, forme: tuple) -> None:
+    """Initialisation d'un processus du pool : vue sur la population en mémoire partagée."""
+    global _POPULATION, _MEMOIRE
+    try:
+        # Python ≥ 3.13 : le segment appartient au processus principal, qui le libère
+        _MEMOIRE = shared_memory.SharedMemory(name=nom, track=False)
+    except TypeError:
+        _MEMOIRE = shared_memory.SharedMemory(name=nom)
+    _POPULATION = np.ndarray(forme, dtype=float, buffer=_MEMOIRE.buf)
+    _POPULATION.setflags(write=False)
+
+
+def _evaluer(description: dict, variantes: list, precision: str = "float64") -> list[list]:
+    """
+    Mesures de la population pour une description de scénario, notées avec
+    chaque variante du barème.
+
+    Args:
+        description: description du scénario (paramètres du catalogue appliqués)
+        variantes: [(numéro de combinaison, {paramètre: valeur}), ...]
+        precision: précision de stockage du dispatch (lots.PRECISIONS)
+
+    Returns:
+        lignes du tableau de résultats (colonnes_resultats)
+    """
+    population = _POPULATION
+    scenario = Scenario("balayage", description)
+    # Découpée en blocs sous le budget mémoire du processus par calculer_mesures_lot
+    mesures = calculer_mesures_lot(population, scenario=scenario, precision=precision)
+
+    lignes = []
+    for numero, combinaison in variantes:
+        bareme_variante = copy.deepcopy(description.get("bareme"))
+        for parametre, valeur in combinaison.items():
+            if _du_bareme(parametre):
+                conteneur = {"bareme": bareme_variante}
+                _affecter(conteneur, parametre, valeur)
+                bareme_variante = conteneur["bareme"]
+        scores = compiler_bareme(bareme_variante).noter(mesures)["score_total"]
+
+        meilleur = int(np.argmax(scores))
+        lignes.append([
+            numero, *combinaison.values(), float(scores.mean()),
+            *(float(q) for q in np.percentile(scores, list(QUANTILES.values()))),
+            float(scores[meilleur]),
+            float((mesures["taux_couverture"] >= 100).mean() * 100),
+            *(int(n) for n in population[meilleur]),
+            float(mesures["taux_couverture"][meilleur]),
+            float(mesures["lcoe"][meilleur]),
+            float(mesures["part_co2_evitee"][meilleur]),
+        ])
+    return lignes
+
+
+# =============================================================================
+# Exécution
+# =============================================================================
+
+def _empreinte(definition: dict, population: np.ndarray) -> str:
+    """Empreinte d'une définition et de sa population (reprise d'un balayage)."""
+    contenu = json.dumps(definition, sort_keys=True).encode("utf-8") + population.tobytes()
+    return hashlib.sha256(contenu).hexdigest()[:16]
+
+
+def _reprendre(chemin: str) -> set[int]:
+    """
+    Numéros des combinaisons déjà écrites dans le tableau de résultats.
+
+    Une ligne tronquée par un arrêt brutal (sans fin de ligne) est retirée du
+    fichier, pour que les lignes ajoutées ensuite restent lisibles.
+    """
+    if not os.path.exists(chemin):
+        return set()
+    with open(chemin, "rb+") as f:
+        contenu = f.read()
+        f.truncate(contenu.rfind(b"\n") + 1)
+    with open(chemin, newline="", encoding="utf-8") as f:
+        lecteur = csv.reader(f)
+        en_tete = next(lecteur, None)
+        if en_tete is None:
+            return set()
+        return {int(ligne[0]) for ligne in lecteur if len(ligne) == len(en_tete)}
+
+
+def executer_balayage(
+    definition: dict,
+    dossier: str,
+    processus: int | None = None,
+    population: np.ndarray | None = None,
+) -> str:
+    """
+    Exécute (ou reprend) un balayage.
+
+    Args:
+        definition: {"parametres": {paramètre: [valeurs]}, "scenario", "nb_mix", "graine", "precision"}
+        dossier: dossier de sortie (créé au besoin)
+        processus: taille du pool (défaut : nombre de cœurs)
+        population: tableau (K, S) de mix à évaluer (défaut : population_mix(nb_mix, graine, scenario))
+
+    Returns:
+        chemin du tableau de résultats (CSV)
+
+    Raises:
+        ValueError si le dossier contient un balayage d'une autre définition,
+        ou si la précision est inconnue
+    """
+    parametres = definition["parametres"]
+    precision = definition.get("precision", "float64")
+    type_stockage(precision)
+    scenario_id = definition.get("scenario", SCENARIO_DEFAUT)
+    if population is None:
+        population = population_mix(definition.get("nb_mix", 20000), definition.get("graine", 0), scenario_id)
+    population = np.ascontiguousarray(population, dtype=float)
+    base = decrire_scenario(scenario_id)
+
+    # Reprise : la définition enregistrée doit être la même
+    os.makedirs(dossier, exist_ok=True)
+    chemin_definition = os.path.join(dossier, _FICHIER_DEFINITION)
+    empreinte = _empreinte(definition, population)
+    if os.path.exists(chemin_definition):
+        with open(chemin_definition, encoding="utf-8") as f:
+            if json.load(f).get("empreinte") != empreinte:
+                raise ValueError(f"{dossier} contient un balayage d'une autre définition")
+    else:
+        with open(chemin_definition, "w", encoding="utf-8") as f:
+            json.dump({**definition, "empreinte": empreinte}, f, ensure_ascii=False, indent=2)
+
+    chemin = os.path.join(dossier, _FICHIER_RESULTATS)
+    faites = _reprendre(chemin)
+    taches = []
+    for _, variantes in _combinaisons(parametres):
+        variantes = [(numero, combinaison) for numero, combinaison in variantes if numero not in faites]
+        if variantes:
+            description = copy.deepcopy(base)
+            for parametre, valeur in variantes[0][1].items():
+                if not _du_bareme(parametre):
+                    _affecter(description, parametre, valeur)
+            taches.append((description, variantes, precision))
+    if not taches:
+        return chemin
+
+    memoire = shared_memory.SharedMemory(create=True, size=population.nbytes)
+    try:
+        np.ndarray(population.shape, dtype=float, buffer=memoire.buf)[:] = population
+        nouveau = not os.path.exists(chemin) or os.path.getsize(chemin) == 0
+        # Processus démarrés par spawn, jamais par fork : un fork hériterait des verrous et
+        # des threads du parent (couche de threads de Numba, BLAS) et pourrait bloquer
+        with open(chemin, "w" if nouveau else "a", newline="", encoding="utf-8") as f, ProcessPoolExecutor(
+            max_workers=processus, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_attacher, initargs=(memoire.name, population.shape),
+        ) as pool:
+            ecrivain = csv.writer(f)
+            if nouveau:
+                ecrivain.writerow(colonnes_resultats(parametres))
+            for futur in as_completed([pool.submit(_evaluer, *tache) for tache in taches]):
+                # Lignes écrites dès qu'une tâche se termine : un arrêt ne perd que les tâches en cours
+                ecrivain.writerows(futur.result())
+                f.flush()
+    finally:
+        memoire.close()
+        memoire.unlink()
+    return chemin
+
+
+def lire_resultats(dossier: str) -> "pd.DataFrame":
+    """Tableau de résultats d'un balayage (une ligne par combinaison, triées par numéro)."""
+    import pandas as pd  # import différé : pandas n'est pas nécessaire au jeu lui-même
+
+    with open(os.path.join(dossier, _FICHIER_DEFINITION), encoding="utf-8") as f:
+        colonnes = colonnes_resultats(json.load(f)["parametres"])
+    table = pd.read_csv(os.path.join(dossier, _FICHIER_RESULTATS), on_bad_lines="skip")
+    table = table[colonnes].dropna(subset=["meilleur_part_co2_evitee"])
+    return table.drop_duplicates("combinaison").sort_values("combinaison").reset_index(drop=True)
+
+
+# =============================================================================
+# Graphiques de synthèse
+# =============================================================================
+
+def figure_balayage(table: "pd.DataFrame", parametre: str):
+    """
+    Effet d'un paramètre, les autres confondus (moyenne sur leurs combinaisons) :
+      - en haut, quantiles et maximum des scores de la population ;
+      - en bas, puissance installée du meilleur mix par source (empilée).
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    moyennes = table.groupby(parametre).mean(numeric_only=True).sort_index()
+    x = moyennes.index.tolist()
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+        subplot_titles=("Scores de la population", "Meilleur mix (MW installés)"),
+    )
+    fig.add_trace(go.Scatter(x=x, y=moyennes["score_p90"], name="p90", line=dict(width=0)), row=1, col=1)
+    fig.add_trace(go.Scatter(
+        x=x, y=moyennes["score_p10"], name="p10 – p90", fill="tonexty",
+        fillcolor="rgba(0, 170, 255, 0.2)", line=dict(width=0),
+    ), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=moyennes["score_median"], name="Médiane", line=dict(color="#00AAFF")), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=moyennes["score_max"], name="Maximum", line=dict(color="#44ff44")), row=1, col=1)
+    for source in ORDRE_MERIT:
+        info = MOYENS_PRODUCTION[source]
+        fig.add_trace(go.Bar(
+            x=x, y=moyennes[f"meilleur_{source}"] * info["puissance"],
+            name=f"{info['emoji']} {info['nom']}", marker_color=info["couleur"],
+        ), row=2, col=1)
+    fig.update_layout(
+        title=parametre, barmode="stack", height=700, template="plotly_dark",
+        legend=dict(orientation="h", yanchor="top", y=-0.08),
+    )
+    fig.update_xaxes(title_text=parametre, row=2, col=1)
+    return fig
+
+
+def ecrire_resume(dossier: str) -> str:
+    """Écrit <dossier>/resume.html : un graphique par paramètre balayé ; retourne son chemin."""
+    table = lire_resultats(dossier)
+    with open(os.path.join(dossier, _FICHIER_DEFINITION), encoding="utf-8") as f:
+        parametres = json.load(f)["parametres"]
+    morceaux = [
+        figure_balayage(table, parametre).to_html(full_html=False, include_plotlyjs="cdn" if k == 0 else False)
+        for k, parametre in enumerate(p for p in parametres if len(parametres[p]) > 1)
+    ]
+    chemin = os.path.join(dossier, "resume.html")
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write("<html><head><meta charset='utf-8'></head><body style='background:#111'>")
+        f.write("\n".join(morceaux))
+        f.write("</body></html>")
+    return chemin
+
+
+if __name__ == "__main__":
+    import argparse
+
+    arguments = argparse.ArgumentParser(description="Balayage de paramètres du catalogue et du barème")
+    arguments.add_argument("definition", help="fichier JSON de définition du balayage")
+    arguments.add_argument("dossier", help="dossier de sortie (reprise si déjà commencé)")
+    arguments.add_argument("--processus", type=int, default=None, help="taille du pool (défaut : nombre de cœurs)")
+    options = arguments.parse_args()
+
+    with open(options.definition, encoding="utf-8") as f:
+        definition_balayage = json.load(f)
+    print(executer_balayage(definition_balayage, options.dossier, options.processus))
+    print(ecrire_resume(options.dossier))
@@ -0,0 +1,142 @@
+"""
+Barème de notation — règles de score déclaratives, compilées en fonctions NumPy vectorisées.
+
+Un barème décrit le score sans code :
+    {
+      "criteres": {
+        "couverture": {"mesure": "taux_couverture", "courbe": [[80, 0], [100, 40]]},
+        "co2":        {"mesure": "part_co2_evitee", "courbe": [[0, 0], [1, 30]], "poids": 1},
+        ...
+      },
+      "conditions": [{"mesure": "heures_deficit", "max": 0, "plafond": 50}],
+      "plancher": 0
+    }
+  - chaque critère donne des points par une courbe linéaire par morceaux
+    (points [mesure, points] triés par mesure croissante ; constante au-delà
+    des extrémités), multipliés par "poids" (défaut 1) ;
+  - le total est la somme des critères, ramenée au "plancher" (défaut 0) et
+    au "plafond" éventuel ;
+  - une condition non remplie ("min" / "max" sur une mesure) plafonne le total.
+
+Les mesures sont celles de MESURES ; calculer_indicateurs les expose sous
+indicateurs["mesures"] et calculer_mesures_lot les calcule pour un lot de mix.
+Noter ne demande que les mesures : un résultat déjà simulé (ou enregistré
+dans une table) peut être renoté avec un autre barème sans refaire le dispatch.
+"""
+
+import json
+from functools import lru_cache
+from typing import Callable, Mapping
+
+import numpy as np
+
+# Mesures disponibles pour les critères et les conditions
+MESURES = (
+    "taux_couverture",   # % de l'énergie demandée couverte
+    "part_co2_evitee",   # 1 - CO₂ émis / CO₂ d'un parc 100 % charbon
+    "lcoe",              # coût complet amorti (€/MWh)
+    "ratio_surplus",     # énergie excédentaire / énergie demandée (avec l'écrêtement : excédent must-run)
+    "ratio_ecretement",  # énergie écrêtée / énergie demandée (option « écrêtement », 0 sinon)
+    "heures_deficit",    # heures de défaillance sur l'horizon
+    "co2_total",         # tCO₂ sur l'horizon
+    "cout_total",        # M€ (construction + production)
+)
+
+# Barème du jeu : 40 pts couverture, 30 pts CO₂, 30 pts coût, jusqu'à -25 pts de malus surplus
+BAREME_STANDARD = {
+    "criteres": {
+        # 0 pt sous 80 % de couverture, 40 pts à 100 %
+        "couverture": {"mesure": "taux_couverture", "courbe": [[80, 0], [100, 40]]},
+        # Référence : tout au charbon (0 pt), zéro émission (30 pts)
+        "co2": {"mesure": "part_co2_evitee", "courbe": [[0, 0], [1, 30]]},
+        # LCOE de référence 80 €/MWh (100 % gaz avec taxe carbone) : 0 pt
+        "cout": {"mesure": "lcoe", "courbe": [[0, 30], [80, 0]]},
+        # 0 % de surplus → 0 | 20 % → -10 | 50 % et plus → -25
+        "surplus": {"mesure": "ratio_surplus", "courbe": [[0, 0], [0.5, -25]]},
+    },
+    "plancher": 0,
+}
+
+
+def _courbe(points: list) -> Callable[[np.ndarray], np.ndarray]:
+    """Compile une courbe linéaire par morceaux [[x, y], ...] en fonction vectorisée."""
+    xp, fp = np.asarray(points, dtype=float).T
+    if len(xp) < 2 or np.any(np.diff(xp) <= 0):
+        raise ValueError(f"Courbe invalide (au moins 2 points, abscisses croissantes) : {points}")
+
+    def evaluer(x: np.ndarray) -> np.ndarray:
+        x = np.clip(np.asarray(x, dtype=float), xp[0], xp[-1])
+        i = np.clip(np.searchsorted(xp, x, side="right") - 1, 0, len(xp) - 2)
+        return fp[i] + (fp[i + 1] - fp[i]) * (x - xp[i]) / (xp[i + 1] - xp[i])
+
+    return evaluer
+
+
+class BaremeCompile:
+    """Barème prêt à noter des mesures scalaires ou des tableaux de mesures (lots de mix)."""
+
+    def __init__(self, bareme: dict):
+        self.criteres = []
+        self.points_max = {}  # points maximum de chaque critère (0 pour un malus)
+        for nom, critere in bareme["criteres"].items():
+            if critere["mesure"] not in MESURES:
+                raise ValueError(f"Mesure inconnue pour le critère {nom} : {critere['mesure']}")
+            poids = float(critere.get("poids", 1))
+            self.criteres.append((nom, critere["mesure"], _courbe(critere["courbe"]), poids))
+            self.points_max[nom] = max(0.0, max(y for _, y in critere["courbe"]) * poids)
+
+        self.conditions = []
+        for condition in bareme.get("conditions", []):
+            if condition["mesure"] not in MESURES:
+                raise ValueError(f"Mesure inconnue dans une condition : {condition['mesure']}")
+            self.conditions.append((
+                condition["mesure"],
+                condition.get("min", -np.inf),
+                condition.get("max", np.inf),
+                float(condition["plafond"]),
+            ))
+        self.plancher = float(bareme.get("plancher", 0))
+        self.plafond = float(bareme.get("plafond", np.inf))
+
+    def noter(self, mesures: Mapping) -> dict:
+        """
+        Note des mesures (scalaires, ou tableaux de même forme pour un lot de mix).
+
+        Args:
+            mesures: mapping {mesure: valeur(s)} — dict, indicateurs["mesures"],
+                     DataFrame, colonnes d'une table enregistrée...
+
+        Returns:
+            dict : scores {critère: points}, score_total (non arrondis)
+        """
+        scores = {}
+        total = None
+        for nom, mesure, courbe, poids in self.criteres:
+            points = courbe(mesures[mesure])
+            if poids != 1:
+                points = points * poids
+            scores[nom] = points
+            total = points if total is None else total + points
+
+        total = np.minimum(np.maximum(self.plancher, total), self.plafond)
+        for mesure, minimum, maximum, plafond in self.conditions:
+            valeur = np.asarray(mesures[mesure], dtype=float)
+            respectee = (valeur >= minimum) & (valeur <= maximum)
+            total = np.where(respectee, total, np.minimum(total, plafond))
+        return {"scores": scores, "score_total": total}
+
+
+@lru_cache(maxsize=64)
+def _compiler(bareme_json: str) -> BaremeCompile:
+    return BaremeCompile(json.loads(bareme_json))
+
+
+def compiler_bareme(bareme: dict | None = None) -> BaremeCompile:
+    """Compile un barème (mis en cache par contenu). None : BAREME_STANDARD."""
+    # Pas de tri des clés : l'ordre des critères est celui de la somme et de l'affichage
+    return _compiler(json.dumps(bareme or BAREME_STANDARD))
+
+
+def noter(mesures: Mapping, bareme: dict | None = None) -> dict:
+    """Note des mesures avec un barème (raccourci de compiler_bareme(bareme).noter)."""
+    return compiler_bareme(bareme).noter(mesures)
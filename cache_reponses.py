@@ -0,0 +1,73 @@
+"""
+Cache des réponses sérialisées du callback principal.
+
+Même quand la simulation est en cache, le callback principal reconstruit et
+sérialise en JSON tout l'arbre de composants (5 figures, tableau, section
+pédagogique) : 60 Ko par réponse. Ici, les octets JSON finaux sont gardés,
+compressés en gzip, par clé (langue, mix, options, niveau). Un succès est
+renvoyé par Flask avant même d'entrer dans Dash (voir app.py), et tel quel,
+compressé, aux navigateurs qui acceptent gzip.
+
+Chaque réponse peut porter une annexe (ex : le score affiché, pour le journal
+des sessions), rendue avec elle. La taille totale est bornée : au-delà, les réponses les moins récemment
+servies sont évincées. Un cache par processus (worker gunicorn).
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# Taille maximale du cache (octets compressés, par processus) : ~10 000 réponses
+TAILLE_MAX_CACHE = 64 * 1024 * 1024
+
+# Compromis vitesse / taille : une réponse de 60 Ko compressée en ~1 ms, à ~10 %
+NIVEAU_COMPRESSION = 6
+
+
+class CacheReponses:
+    """Cache LRU d'octets, borné en taille totale, compressé en gzip."""
+
+    def __init__(self, taille_max: int = TAILLE_MAX_CACHE, niveau_compression: int = NIVEAU_COMPRESSION):
+        self.taille_max = taille_max
+        self.niveau_compression = niveau_compression
+        self.taille = 0
+        self.succes = 0
+        self.echecs = 0
+        self._entrees: OrderedDict[Hashable, tuple[bytes, Any]] = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entrees)
+
+    def lire(self, cle: Hashable) -> tuple[bytes, Any] | None:
+        """Retourne (réponse compressée (gzip), annexe) enregistrée sous cette clé, ou None."""
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                self.echecs += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree
+
+    def ecrire(self, cle: Hashable, contenu: bytes, annexe: Any = None) -> None:
+        """Compresse et enregistre une réponse (et son annexe), en évinçant les plus anciennes si besoin."""
+        compresse = gzip.compress(contenu, self.niveau_compression)
+        if len(compresse) > self.taille_max:
+            return
+        with self._verrou:
+            ancien = self._entrees.pop(cle, None)
+            if ancien is not None:
+                self.taille -= len(ancien[0])
+            self._entrees[cle] = (compresse, annexe)
+            self.taille += len(compresse)
+            while self.taille > self.taille_max:
+                _, (evince, _) = self._entrees.popitem(last=False)
+                self.taille -= len(evince)
+
+    def vider(self) -> None:
+        """Oublie toutes les réponses."""
+        with self._verrou:
+            self._entrees.clear()
+            self.taille = 0
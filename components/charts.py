@@ -1,14 +1,34 @@
 """
 Composant graphiques — tous les graphiques Plotly de l'application.
+
+plotly.graph_objects est importé à l'intérieur des fonctions : son import
+(et celui des classes de traces) ne pèse pas sur le démarrage de l'application.
+
+Horizons longs : au-delà de SEUIL_DETAIL heures affichées, le graphique
+principal est agrégé côté serveur (moyennes journalières empilées, enveloppe
+min – max de la demande, demande sous-échantillonnée par LTTB et tracée en
+WebGL). Un zoom sur une fenêtre plus courte redemande le détail horaire de
+cette seule fenêtre (voir fenetre_zoom et le callback affiner_graphique_production).
 """
 
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
 
-from data import MOYENS_PRODUCTION, DEMANDE_HORAIRE, LABELS_HEURES, ORDRE_MERIT
+from data import MOYENS_PRODUCTION, ORDRE_MERIT, FLEXIBILITE_DEMANDE
+from scenarios import Scenario, SCENARIO_DEFAUT, charger_scenario
 from translations import t, nom_source
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+    from resultat import ResultatDispatch
+
 
 # =============================================================================
 # Utilitaires
@@ -21,6 +41,124 @@ def _hex_to_rgba(hex_color: str, alpha: float = 0.8) -> str:
     return f"rgba({r},{g},{b},{alpha})"
 
 
+# Séries horaires transmises en tableaux typés Plotly ({"dtype": "f4", "bdata": ...}) :
+# float32 suffit à l'affichage (MW arrondis) et deux fois moins lourd que float64.
+# GRID_GAME_TABLEAUX_TYPES=0 : listes JSON, pour les clients Plotly.js antérieurs à 2.28
+TABLEAUX_TYPES = os.environ.get("GRID_GAME_TABLEAUX_TYPES", "1") != "0"
+
+# Origine de l'axe temporel des séries horaires (année bissextile : jusqu'à 366 jours)
+_ORIGINE_HORAIRE = "2000-01-01"
+_ORIGINE = datetime.fromisoformat(_ORIGINE_HORAIRE)
+_MS_ORIGINE = 946_684_800_000  # _ORIGINE en ms depuis 1970 (abscisses numériques d'un axe "date")
+_MS_PAR_HEURE = 3_600_000
+
+# Nombre d'heures au-delà duquel le graphique principal est agrégé par jour (2 semaines)
+SEUIL_DETAIL = 24 * 14
+
+# Nombre de points de la courbe de demande sous-échantillonnée (rendu agrégé)
+POINTS_LTTB = 2000
+
+
+def _serie(valeurs) -> np.ndarray | list:
+    """Série horaire prête pour une trace : float32 (tableau typé) ou liste (repli)."""
+    if TABLEAUX_TYPES:
+        return np.asarray(valeurs, dtype=np.float32)
+    return np.asarray(valeurs, dtype=float).tolist()
+
+
+def _date_heure(heure: float) -> str:
+    """Date de l'axe temporel correspondant à une heure de l'horizon."""
+    return (_ORIGINE + timedelta(hours=heure)).strftime("%Y-%m-%d %H:%M")
+
+
+def _heure_date(valeur) -> float:
+    """Heure de l'horizon d'une abscisse renvoyée par Plotly (date ISO, ou ms depuis 1970)."""
+    if isinstance(valeur, str):
+        return (datetime.fromisoformat(valeur) - _ORIGINE) / timedelta(hours=1)
+    return (float(valeur) - _MS_ORIGINE) / _MS_PAR_HEURE
+
+
+def _abscisses_horaires(scenario: Scenario, debut: int = 0) -> tuple[dict, str]:
+    """
+    Abscisses implicites des séries horaires à partir de l'heure debut (x0 / dx :
+    aucun tableau de libellés transmis) et format d'heure de l'axe : "07h", ou
+    "J3 07h" sur plusieurs jours.
+    """
+    format_heure = "%Hh" if scenario.nb_jours == 1 else "J%-j %Hh"
+    x0 = _ORIGINE_HORAIRE if debut == 0 else _date_heure(debut)
+    return dict(x0=x0, dx=_MS_PAR_HEURE), format_heure
+
+
+def _abscisses_ms(heures: np.ndarray) -> np.ndarray | list:
+    """Abscisses explicites (ms depuis 1970) d'heures irrégulières : float64, l'heure près."""
+    abscisses = _MS_ORIGINE + np.asarray(heures, dtype=float) * _MS_PAR_HEURE
+    return abscisses if TABLEAUX_TYPES else abscisses.tolist()
+
+
+def lttb(valeurs: np.ndarray, nb_points: int) -> np.ndarray:
+    """
+    Sous-échantillonnage Largest-Triangle-Three-Buckets d'une série à pas régulier.
+
+    Garde le premier et le dernier point, puis, dans chacun des nb_points - 2
+    seaux intermédiaires, le point qui forme le plus grand triangle avec le point
+    retenu précédemment et la moyenne du seau suivant : les pointes et les creux
+    survivent, contrairement à une moyenne ou à un point sur n.
+
+    Returns:
+        indices (croissants) des points retenus
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    n = len(valeurs)
+    if nb_points >= n or nb_points < 3:
+        return np.arange(n)
+
+    bornes = np.linspace(1, n - 1, nb_points - 1).astype(np.int64)
+    # Moyenne de chaque seau (le « seau suivant » du dernier est le dernier point)
+    sommes = np.add.reduceat(valeurs[:n - 1], bornes[:-1])
+    tailles = np.diff(bornes)
+    moyennes_x = np.append((bornes[:-1] + bornes[1:] - 1) / 2, n - 1)
+    moyennes_y = np.append(sommes / tailles, valeurs[-1])
+
+    indices = np.empty(nb_points, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    precedent = 0
+    for i in range(nb_points - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        x = np.arange(debut, fin)
+        aires = np.abs(
+            (precedent - moyennes_x[i + 1]) * (valeurs[debut:fin] - valeurs[precedent])
+            - (precedent - x) * (moyennes_y[i + 1] - valeurs[precedent])
+        )
+        precedent = debut + int(np.argmax(aires))
+        indices[i + 1] = precedent
+    return indices
+
+
+def agreger_par_jour(serie: np.ndarray, debut: int, fin: int) -> np.ndarray:
+    """Tableau (jours, 24) des heures [debut, fin[ d'une série horaire (debut, fin : multiples de 24)."""
+    return np.asarray(serie[debut:fin], dtype=float).reshape(-1, 24)
+
+
+def fenetre_zoom(relayout: dict | None) -> tuple[float, float] | None:
+    """
+    Fenêtre (heure de début, heure de fin) d'un zoom sur l'axe des temps,
+    lue dans le relayoutData d'un graphique. None si l'événement n'en contient pas.
+    """
+    if not relayout:
+        return None
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        bornes = relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]
+    elif "xaxis.range" in relayout:
+        bornes = relayout["xaxis.range"]
+    else:
+        return None
+    try:
+        debut, fin = sorted(_heure_date(borne) for borne in bornes)
+    except (TypeError, ValueError):
+        return None
+    return debut, fin
+
+
 _LAYOUT_COMMUN = dict(
     template="plotly_dark",
     paper_bgcolor="rgba(0,0,0,0)",
@@ -37,56 +175,161 @@ _LAYOUT_COMMUN = dict(
 # Graphiques
 # =============================================================================
 
-def graphique_demande_seule(lang: str = "fr") -> go.Figure:
+def graphique_demande_seule(lang: str = "fr", scenario: "str | Scenario | None" = None) -> go.Figure:
     """Courbe de demande seule (écran d'accueil)."""
+    import plotly.graph_objects as go
+
+    scenario = charger_scenario(scenario)
+    abscisses, format_heure = _abscisses_horaires(scenario)
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=LABELS_HEURES, y=DEMANDE_HORAIRE,
-        mode="lines+markers",
-        name=t("hover_demande", lang),
-        line=dict(color="#ff6b6b", width=3),
-        marker=dict(size=6),
-        fill="tozeroy",
-        fillcolor="rgba(255, 107, 107, 0.15)",
-    ))
+    if scenario.nb_heures > SEUIL_DETAIL:
+        # Horizon long : demande sous-échantillonnée, tracée en WebGL
+        retenues = lttb(scenario.demande, POINTS_LTTB)
+        fig.add_trace(go.Scattergl(
+            x=_abscisses_ms(retenues), y=_serie(scenario.demande[retenues]),
+            mode="lines",
+            name=t("hover_demande", lang),
+            line=dict(color="#ff6b6b", width=1.5),
+            fill="tozeroy",
+            fillcolor="rgba(255, 107, 107, 0.15)",
+        ))
+    else:
+        fig.add_trace(go.Scatter(
+            **abscisses, y=_serie(scenario.demande),
+            mode="lines+markers",
+            name=t("hover_demande", lang),
+            line=dict(color="#ff6b6b", width=3),
+            marker=dict(size=6),
+            fill="tozeroy",
+            fillcolor="rgba(255, 107, 107, 0.15)",
+        ))
     fig.update_layout(
         **_LAYOUT_COMMUN,
-        xaxis_title=t("axe_heure", lang),
+        xaxis=dict(title=t("axe_heure", lang), type="date", tickformat=format_heure, hoverformat=format_heure),
         yaxis_title=t("axe_puissance", lang),
         height=400,
         margin=dict(l=60, r=30, t=30, b=60),
-        yaxis=dict(range=[0, DEMANDE_HORAIRE.max() * 1.15]),
+        yaxis=dict(range=[0, scenario.demande.max() * 1.15]),
     )
     return fig
 
 
+def figure_demande_json(lang: str = "fr", scenario: str = SCENARIO_DEFAUT) -> bytes:
+    """
+    Courbe de demande sérialisée une fois par langue et par scénario (JSON Plotly).
+    Servie comme ressource statique mise en cache par le navigateur.
+    """
+    return _figure_demande_json(lang, charger_scenario(scenario))
+
+
+# Borné : un niveau modifié sur disque est un nouveau Scenario, l'ancienne figure sort du cache
+@lru_cache(maxsize=64)
+def _figure_demande_json(lang: str, scenario: Scenario) -> bytes:
+    return graphique_demande_seule(lang, scenario).to_json().encode("utf-8")
+
+
 def graphique_production_vs_demande(
-    df_prod: pd.DataFrame,
+    df_prod: ResultatDispatch,
     choix_joueur: dict,
     lang: str = "fr",
+    scenario: "str | Scenario | None" = None,
+    fenetre: tuple[float, float] | None = None,
 ) -> go.Figure:
-    """Graphique principal : aires empilées de production + courbe de demande."""
-    fig = go.Figure()
+    """
+    Graphique principal : aires empilées de production + courbe de demande.
+
+    fenetre : (heure de début, heure de fin) affichée — zoom d'un horizon long ;
+    None : tout l'horizon. Au-delà de SEUIL_DETAIL heures affichées, le rendu
+    est agrégé par jour (voir _traces_production_agregees).
+    """
+    scenario = charger_scenario(scenario)
+    nb_heures = scenario.nb_heures
+    debut, fin = 0, nb_heures
+    if fenetre is not None:
+        debut = min(max(0, int(np.floor(fenetre[0]))), nb_heures - 1)
+        fin = max(debut + 1, min(nb_heures, int(np.ceil(fenetre[1]))))
 
     sources_a_afficher = [s for s in ORDRE_MERIT if choix_joueur.get(s, 0) > 0]
+    agrege = fin - debut > SEUIL_DETAIL
+    if agrege:
+        fig = _traces_production_agregees(df_prod, sources_a_afficher, lang, debut, fin)
+        xaxis = dict(title=t("axe_jour", lang), type="date", tickformat="J%-j", hoverformat="J%-j %Hh")
+    else:
+        fig = _traces_production_horaires(df_prod, sources_a_afficher, lang, scenario, debut, fin)
+        format_heure = _abscisses_horaires(scenario)[1]
+        xaxis = dict(title=t("axe_heure_journee", lang), type="date", tickformat=format_heure, hoverformat=format_heure)
+
+    horizon_long = nb_heures > SEUIL_DETAIL
+    if horizon_long and fenetre is not None:
+        # La figure renvoyée après un zoom garde la fenêtre demandée
+        xaxis["range"] = [_date_heure(fenetre[0]), _date_heure(fenetre[1])]
+
+    pic = max(df_prod["demande_mw"][debut:fin].max(), df_prod["production_totale"][debut:fin].max())
+    fig.update_layout(
+        **_LAYOUT_COMMUN,
+        xaxis=xaxis,
+        yaxis_title=t("axe_puissance", lang),
+        height=500,
+        margin=dict(l=60, r=30, t=30, b=60),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5),
+        hovermode="x unified",
+        # Horizon long : zoom sur l'axe des temps seulement (l'échelle suit la fenêtre)
+        yaxis=dict(range=[0, pic * 1.1], fixedrange=horizon_long),
+    )
+    return fig
+
+
+def _traces_production_horaires(
+    df_prod: ResultatDispatch,
+    sources: list[str],
+    lang: str,
+    scenario: Scenario,
+    debut: int,
+    fin: int,
+) -> go.Figure:
+    """Traces heure par heure des heures [debut, fin[ : aires empilées, demande, déficits."""
+    import plotly.graph_objects as go
+
+    abscisses, format_heure = _abscisses_horaires(scenario, debut)
+    demande = df_prod["demande_mw"][debut:fin]
+    fig = go.Figure()
 
     hover_prod = t("hover_production", lang)
     hover_heure = t("hover_heure", lang)
 
     # Aires empilées par source
-    for source_id in sources_a_afficher:
+    for source_id in sources:
         info = MOYENS_PRODUCTION[source_id]
         nom = nom_source(source_id, lang)
         fig.add_trace(go.Scatter(
-            x=LABELS_HEURES,
-            y=df_prod[source_id],
+            **abscisses,
+            y=_serie(df_prod[source_id][debut:fin]),
             name=f"{info['emoji']} {nom}",
             stackgroup="production",
             fillcolor=_hex_to_rgba(info["couleur"], 0.8),
             line=dict(width=0.5, color=info["couleur"]),
             hovertemplate=(
                 f"<b>{nom}</b><br>"
-                f"{hover_heure}: %{{x}}<br>"
+                f"{hover_heure}: %{{x|{format_heure}}}<br>"
+                f"{hover_prod}: %{{y:,.0f}} MW<br>"
+                "<extra></extra>"
+            ),
+        ))
+
+    # Production écrêtée (option « écrêtement ») : hachurée au-dessus de l'empilement
+    ecretement = df_prod.get("ecretement")
+    if ecretement is not None and np.any(ecretement[debut:fin]):
+        fig.add_trace(go.Scatter(
+            **abscisses,
+            y=_serie(ecretement[debut:fin]),
+            name=t("legende_ecretement", lang),
+            stackgroup="production",
+            fillcolor="rgba(255, 255, 255, 0.05)",
+            fillpattern=dict(shape="/", fgcolor="rgba(255, 255, 255, 0.5)", size=6),
+            line=dict(width=0.5, color="rgba(255, 255, 255, 0.5)"),
+            hovertemplate=(
+                f"<b>{t('legende_ecretement', lang)}</b><br>"
+                f"{hover_heure}: %{{x|{format_heure}}}<br>"
                 f"{hover_prod}: %{{y:,.0f}} MW<br>"
                 "<extra></extra>"
             ),
@@ -95,52 +338,154 @@ def graphique_production_vs_demande(
     # Courbe de demande
     hover_demande = t("hover_demande", lang)
     fig.add_trace(go.Scatter(
-        x=LABELS_HEURES,
-        y=DEMANDE_HORAIRE,
+        **abscisses,
+        y=_serie(demande),
         name=t("legende_demande", lang),
         mode="lines+markers",
         line=dict(color="#ff6b6b", width=3, dash="dot"),
         marker=dict(size=6, color="#ff6b6b"),
         hovertemplate=(
             f"<b>{hover_demande}</b><br>"
-            f"{hover_heure}: %{{x}}<br>"
+            f"{hover_heure}: %{{x|{format_heure}}}<br>"
             f"{hover_demande}: %{{y:,.0f}} MW<br>"
             "<extra></extra>"
         ),
     ))
 
+    # Demande avant report (pilotage de la demande)
+    report = df_prod.get("report_demande")
+    if report is not None and np.any(report[debut:fin]):
+        fig.add_trace(go.Scatter(
+            **abscisses,
+            y=_serie(demande - report[debut:fin]),
+            name=t("legende_demande_initiale", lang),
+            mode="lines",
+            line=dict(color=FLEXIBILITE_DEMANDE["couleur"], width=1.5, dash="dash"),
+            hovertemplate=(
+                f"<b>{t('legende_demande_initiale', lang)}</b><br>"
+                f"{hover_heure}: %{{x|{format_heure}}}<br>"
+                f"{hover_demande}: %{{y:,.0f}} MW<br>"
+                "<extra></extra>"
+            ),
+        ))
+
     # Marqueurs de déficit
-    deficit_mask = df_prod["deficit"] > 0
+    deficit_mask = df_prod["deficit"][debut:fin] > 0
     if deficit_mask.any():
         fig.add_trace(go.Scatter(
-            x=LABELS_HEURES,
-            y=np.where(deficit_mask, DEMANDE_HORAIRE, None),
+            **abscisses,
+            y=_serie(np.where(deficit_mask, demande, np.nan)),
             name=t("legende_deficit", lang),
             mode="markers",
             marker=dict(size=12, color="red", symbol="x"),
         ))
+    return fig
 
-    fig.update_layout(
-        **_LAYOUT_COMMUN,
-        xaxis_title=t("axe_heure_journee", lang),
-        yaxis_title=t("axe_puissance", lang),
-        height=500,
-        margin=dict(l=60, r=30, t=30, b=60),
-        legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5),
-        hovermode="x unified",
-        yaxis=dict(range=[0, max(DEMANDE_HORAIRE.max(), df_prod["production_totale"].max()) * 1.1]),
-    )
+
+def _traces_production_agregees(
+    df_prod: ResultatDispatch,
+    sources: list[str],
+    lang: str,
+    debut: int,
+    fin: int,
+) -> go.Figure:
+    """
+    Traces agrégées des jours couvrant les heures [debut, fin[ :
+      - aires empilées des moyennes journalières (l'empilement n'existe qu'en SVG,
+        mais un point par jour et par source reste léger) ;
+      - enveloppe min – max journalière de la demande ;
+      - demande horaire sous-échantillonnée (LTTB) et déficits, en WebGL (Scattergl).
+    """
+    import plotly.graph_objects as go
+
+    debut, fin = debut - debut % 24, -(-fin // 24) * 24
+    abscisses_jours = dict(x0=_date_heure(debut + 12), dx=24 * _MS_PAR_HEURE)
+    fig = go.Figure()
+
+    hover_moyenne = t("hover_moyenne_jour", lang)
+    hover_jour = t("hover_jour", lang)
+
+    for source_id in sources:
+        info = MOYENS_PRODUCTION[source_id]
+        nom = nom_source(source_id, lang)
+        fig.add_trace(go.Scatter(
+            **abscisses_jours,
+            y=_serie(agreger_par_jour(df_prod[source_id], debut, fin).mean(axis=1)),
+            name=f"{info['emoji']} {nom}",
+            stackgroup="production",
+            fillcolor=_hex_to_rgba(info["couleur"], 0.8),
+            line=dict(width=0.5, color=info["couleur"]),
+            hovertemplate=(
+                f"<b>{nom}</b><br>"
+                f"{hover_jour}: %{{x|J%-j}}<br>"
+                f"{hover_moyenne}: %{{y:,.0f}} MW<br>"
+                "<extra></extra>"
+            ),
+        ))
+
+    # Enveloppe de la demande : min puis max, remplie entre les deux
+    demande_jours = agreger_par_jour(df_prod["demande_mw"], debut, fin)
+    fig.add_trace(go.Scatter(
+        **abscisses_jours, y=_serie(demande_jours.min(axis=1)),
+        mode="lines", line=dict(width=0, color="#ff6b6b"),
+        showlegend=False, hoverinfo="skip",
+    ))
+    fig.add_trace(go.Scatter(
+        **abscisses_jours, y=_serie(demande_jours.max(axis=1)),
+        name=t("legende_demande_enveloppe", lang),
+        mode="lines", line=dict(width=0, color="#ff6b6b"),
+        fill="tonexty", fillcolor="rgba(255, 107, 107, 0.2)",
+        hoverinfo="skip",
+    ))
+
+    # Demande horaire sous-échantillonnée : pointes et creux conservés
+    hover_demande = t("hover_demande", lang)
+    demande = np.asarray(df_prod["demande_mw"][debut:fin], dtype=float)
+    retenues = lttb(demande, POINTS_LTTB)
+    fig.add_trace(go.Scattergl(
+        x=_abscisses_ms(debut + retenues),
+        y=_serie(demande[retenues]),
+        name=t("legende_demande", lang),
+        mode="lines",
+        line=dict(color="#ff6b6b", width=1.5),
+        hovertemplate=(
+            f"<b>{hover_demande}</b><br>"
+            f"{t('hover_heure', lang)}: %{{x|J%-j %Hh}}<br>"
+            f"{hover_demande}: %{{y:,.0f}} MW<br>"
+            "<extra></extra>"
+        ),
+    ))
+
+    # Marqueurs de déficit : toutes les heures concernées, ou, si elles sont trop
+    # nombreuses, l'heure du plus fort déficit de chaque jour touché
+    deficit = np.asarray(df_prod["deficit"][debut:fin], dtype=float)
+    heures_deficit = np.flatnonzero(deficit > 0)
+    if len(heures_deficit) > POINTS_LTTB:
+        deficit_jours = deficit.reshape(-1, 24)
+        jours = np.flatnonzero(deficit_jours.max(axis=1) > 0)
+        heures_deficit = jours * 24 + deficit_jours[jours].argmax(axis=1)
+    if len(heures_deficit):
+        fig.add_trace(go.Scattergl(
+            x=_abscisses_ms(debut + heures_deficit),
+            y=_serie(demande[heures_deficit]),
+            name=t("legende_deficit", lang),
+            mode="markers",
+            marker=dict(size=7, color="red", symbol="x"),
+        ))
     return fig
 
 
 def graphique_mix_energetique(
-    df_prod: pd.DataFrame,
+    df_prod: ResultatDispatch,
     choix_joueur: dict,
     lang: str = "fr",
 ) -> go.Figure:
     """Camembert (donut) du mix énergétique."""
+    import plotly.graph_objects as go
+
     sources = [s for s in ORDRE_MERIT if choix_joueur.get(s, 0) > 0]
-    prod_par_source = {s: df_prod[s].sum() for s in sources if df_prod[s].sum() > 0}
+    # Énergies mémorisées par le résultat : déjà calculées pour les indicateurs
+    prod_par_source = {s: df_prod.energie(s) for s in sources if df_prod.energie(s) > 0}
 
     if not prod_par_source:
         return go.Figure()
@@ -168,23 +513,25 @@ def graphique_mix_energetique(
 
 def graphique_decomposition_score(indicateurs: dict, lang: str = "fr") -> go.Figure:
     """Barres de décomposition du score (max en fond, score réel par-dessus)."""
+    import plotly.graph_objects as go
+
     couverture = indicateurs["taux_couverture"]
     couv_color = "#44ff44" if couverture >= 100 else "#ffaa00" if couverture >= 90 else "#ff4444"
 
+    # Un critère par barre, dans l'ordre du barème du scénario (voir bareme.py)
+    couleurs_criteres = {"couverture": couv_color, "co2": "#A0D911", "cout": "#00AAFF", "surplus": "#ff4444"}
+    scores = indicateurs["scores"]
+    max_valeurs = [indicateurs["scores_max"][nom] for nom in scores]
     categories = [
-        t("score_couverture", lang),
-        t("score_co2", lang),
-        t("score_cout", lang),
-        t("score_surplus", lang),
+        f"{t(f'score_{nom}', lang)}\n(/{maximum:g})" if maximum > 0
+        else f"{t(f'score_{nom}', lang)}\n({t('score_malus', lang)})"
+        for nom, maximum in zip(scores, max_valeurs)
     ]
-    valeurs = [
-        indicateurs["score_couverture"],
-        indicateurs["score_co2"],
-        indicateurs["score_cout"],
-        -indicateurs.get("malus_surplus", 0),
+    valeurs = list(scores.values())
+    couleurs = [
+        couleurs_criteres.get(nom, "#ff4444" if maximum <= 0 else "#FFD700")
+        for nom, maximum in zip(scores, max_valeurs)
     ]
-    max_valeurs = [40, 30, 30, 0]
-    couleurs = [couv_color, "#A0D911", "#00AAFF", "#ff4444"]
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -202,13 +549,15 @@ def graphique_decomposition_score(indicateurs: dict, lang: str = "fr") -> go.Fig
         **_LAYOUT_COMMUN,
         height=400, margin=dict(l=40, r=20, t=20, b=60),
         barmode="overlay", showlegend=False,
-        yaxis=dict(range=[-30, 45]),
+        yaxis=dict(range=[min(-30, min(valeurs) - 5), max(45, max(max_valeurs) + 5)]),
     )
     return fig
 
 
 def graphique_cout_par_source(indicateurs: dict, lang: str = "fr") -> go.Figure:
     """Barres empilées construction + production par source."""
+    import plotly.graph_objects as go
+
     details = indicateurs["details_par_source"]
     if not details:
         return go.Figure()
@@ -238,6 +587,8 @@ def graphique_cout_par_source(indicateurs: dict, lang: str = "fr") -> go.Figure:
 
 def graphique_co2_par_source(indicateurs: dict, lang: str = "fr") -> go.Figure:
     """Barres de CO₂ par source."""
+    import plotly.graph_objects as go
+
     details = indicateurs["details_par_source"]
     if not details:
         return go.Figure()
@@ -258,3 +609,99 @@ def graphique_co2_par_source(indicateurs: dict, lang: str = "fr") -> go.Figure:
         yaxis_title=t("axe_co2", lang), showlegend=False,
     )
     return fig
+
+
+def graphique_carte(
+    carte: dict | None,
+    source_x: str,
+    source_y: str,
+    mesure: str,
+    choix_joueur: dict,
+    lang: str = "fr",
+) -> go.Figure:
+    """
+    Carte de chaleur du score ou de la couverture selon le nombre d'unités de
+    deux sources (simulation.carte_scores), avec la position du mix du joueur.
+    carte None : deux fois la même source, carte vide avec un message.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    layout = dict(**_LAYOUT_COMMUN, height=500, margin=dict(l=60, r=30, t=20, b=60))
+    if carte is None:
+        fig.add_annotation(text=t("carte_meme_source", lang), showarrow=False, font=dict(size=16))
+        fig.update_layout(**layout, xaxis=dict(visible=False), yaxis=dict(visible=False))
+        return fig
+
+    titres = {
+        source: f"{MOYENS_PRODUCTION[source]['emoji']} {nom_source(source, lang)} ({t('axe_unites', lang)})"
+        for source in (source_x, source_y)
+    }
+    libelle = t(f"carte_mesure_{mesure}", lang)
+    # Abscisses et ordonnées implicites (x0 / dx) : seules les valeurs sont transmises, en tableau typé 2-D
+    fig.add_trace(go.Heatmap(
+        z=_serie(carte[mesure]), x0=0, dx=1, y0=0, dy=1,
+        colorscale="RdYlGn", zmin=0 if mesure == "couverture" else None, zmax=100 if mesure == "couverture" else None,
+        colorbar=dict(title=dict(text=libelle, side="right")),
+        hovertemplate=(
+            f"{titres[source_x]}: %{{x}}<br>"
+            f"{titres[source_y]}: %{{y}}<br>"
+            f"{libelle}: %{{z:.1f}}<extra></extra>"
+        ),
+    ))
+    fig.add_trace(go.Scatter(
+        x=[choix_joueur.get(source_x) or 0], y=[choix_joueur.get(source_y) or 0],
+        mode="markers", name=t("legende_votre_mix", lang), hoverinfo="skip",
+        marker=dict(symbol="star", size=18, color="#ffffff", line=dict(color="#000000", width=1)),
+    ))
+    fig.update_layout(
+        **layout,
+        xaxis_title=titres[source_x], yaxis_title=titres[source_y],
+        legend=dict(orientation="h", yanchor="bottom", y=1.0, xanchor="right", x=1.0),
+    )
+    return fig
+
+
+def graphique_trajectoire(trajectoire: dict | None, lang: str = "fr") -> go.Figure:
+    """
+    Trajectoire d'investissement (trajectoire.simuler_trajectoire) : capacité
+    installée par source et par année (barres empilées), pointe de demande, et
+    CO₂ annuel sur un second axe. trajectoire None : plan invalide, figure vide.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    layout = dict(**_LAYOUT_COMMUN, height=450, margin=dict(l=60, r=60, t=20, b=60))
+    if trajectoire is None:
+        fig.update_layout(**layout, xaxis=dict(visible=False), yaxis=dict(visible=False))
+        return fig
+
+    annees = trajectoire["annees"]
+    for i, source in enumerate(ORDRE_MERIT):
+        if not trajectoire["parc"][:, i].any():
+            continue
+        fig.add_trace(go.Bar(
+            x=annees, y=_serie(trajectoire["capacite"][:, i] / 1000),
+            name=f"{MOYENS_PRODUCTION[source]['emoji']} {nom_source(source, lang)}",
+            marker_color=MOYENS_PRODUCTION[source]["couleur"],
+            customdata=trajectoire["parc"][:, i],
+            hovertemplate=f"%{{y:.1f}} GW (%{{customdata}} {t('axe_unites', lang)})<extra></extra>",
+        ))
+    fig.add_trace(go.Scatter(
+        x=annees, y=_serie(trajectoire["pointe_demande"] / 1000),
+        name=t("legende_pointe", lang), mode="lines", line=dict(color="#ffffff", width=2, dash="dash"),
+        hovertemplate="%{y:.1f} GW<extra></extra>",
+    ))
+    fig.add_trace(go.Scatter(
+        x=annees, y=_serie(trajectoire["co2"] / 1e6), yaxis="y2",
+        name=t("legende_co2_annuel", lang), mode="lines+markers", line=dict(color="#A0D911", width=2),
+        hovertemplate="%{y:.2f} Mt<extra></extra>",
+    ))
+    fig.update_layout(
+        **layout,
+        barmode="stack", hovermode="x unified",
+        xaxis_title=t("axe_annee", lang), yaxis_title=t("axe_capacite", lang),
+        yaxis2=dict(title=t("axe_co2_annuel", lang), overlaying="y", side="right", showgrid=False, rangemode="tozero"),
+        legend=dict(orientation="h", yanchor="top", y=-0.15, xanchor="center", x=0.5),
+    )
+    return fig
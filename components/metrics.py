@@ -1,11 +1,22 @@
 """
 Composant des cartes métriques et messages d'état.
+
+Les textes fixes (en-têtes, libellés, noms des sources) sont construits une
+fois par langue ; le tableau des caractéristiques, entièrement statique, une
+fois par langue et par scénario. Le tableau des détails envoie des nombres
+bruts, arrondis à la précision affichée : le séparateur de milliers et les
+décimales sont appliqués par le DataTable (format des colonnes numériques).
 """
 
+from functools import lru_cache
+
+import numpy as np
 from dash import html
+from dash.dash_table.Format import Format, Group, Scheme
 
 from data import MOYENS_PRODUCTION, ORDRE_MERIT
-from translations import t, nom_source
+from scenarios import Scenario, charger_scenario
+from translations import LANGUES, t, nom_source
 
 
 def _carte_metrique(valeur: str, label: str, couleur: str) -> html.Div:
@@ -16,6 +27,15 @@ def _carte_metrique(valeur: str, label: str, couleur: str) -> html.Div:
     ])
 
 
+@lru_cache(maxsize=len(LANGUES))
+def _libelles_metriques(lang: str) -> dict:
+    """Libellés des cartes métriques d'une langue."""
+    return {
+        cle: t(f"metric_{cle}", lang)
+        for cle in ("score", "couverture", "cout", "co2", "blackout", "surplus")
+    }
+
+
 def creer_metriques(indicateurs: dict, lang: str = "fr") -> html.Div:
     """Crée la barre de 6 métriques clés."""
     score = indicateurs["score_total"]
@@ -34,21 +54,56 @@ def creer_metriques(indicateurs: dict, lang: str = "fr") -> html.Div:
     surplus_pct = indicateurs.get("ratio_surplus", 0)
     surplus_color = "#44ff44" if surplus_pct < 5 else "#ffaa00" if surplus_pct < 20 else "#ff4444"
     malus = indicateurs.get("malus_surplus", 0)
+    score_max = sum(indicateurs["scores_max"].values())
+    libelles = _libelles_metriques(lang)
 
     return html.Div(className="metrics-row", children=[
-        _carte_metrique(f"{score_emoji} {score}/100", t("metric_score", lang), score_color),
-        _carte_metrique(f"{couverture}%", t("metric_couverture", lang), couv_color),
-        _carte_metrique(f"{indicateurs['cout_total']:,.0f} M€", t("metric_cout", lang), "#00AAFF"),
-        _carte_metrique(f"{indicateurs['co2_total']:,.0f} t", t("metric_co2", lang), "#A0D911"),
-        _carte_metrique(f"{indicateurs['heures_deficit']}h / 24h", t("metric_blackout", lang), deficit_color),
+        _carte_metrique(f"{score_emoji} {score}/{score_max:g}", libelles["score"], score_color),
+        _carte_metrique(f"{couverture}%", libelles["couverture"], couv_color),
+        _carte_metrique(f"{indicateurs['cout_total']:,.0f} M€", libelles["cout"], "#00AAFF"),
+        _carte_metrique(f"{indicateurs['co2_total']:,.0f} t", libelles["co2"], "#A0D911"),
+        _carte_metrique(f"{indicateurs['heures_deficit']}h / {indicateurs['nb_heures']}h", libelles["blackout"], deficit_color),
         _carte_metrique(
             f"{surplus_pct}%",
-            t("metric_surplus", lang).format(malus=f"{malus:.0f}"),
+            libelles["surplus"].format(malus=f"{malus:.0f}"),
             surplus_color,
         ),
     ])
 
 
+def creer_metriques_trajectoire(trajectoire: dict, lang: str = "fr") -> html.Div:
+    """Crée la barre des métriques d'une trajectoire d'investissement (trajectoire.simuler_trajectoire)."""
+    score = trajectoire["score_moyen"]
+    score_color = "#44ff44" if score >= 70 else "#ffaa00" if score >= 40 else "#ff4444"
+    annees_deficit = trajectoire["annees_deficit"]
+    return html.Div(className="metrics-row", children=[
+        _carte_metrique(f"{score:.1f}", t("metric_score_moyen", lang), score_color),
+        _carte_metrique(f"{trajectoire['cout_actualise']:,.0f} M€", t("metric_cout_actualise", lang), "#00AAFF"),
+        _carte_metrique(f"{trajectoire['lcoe']:,.1f} €/MWh", t("metric_lcoe_trajectoire", lang), "#00AAFF"),
+        _carte_metrique(f"{trajectoire['co2_cumule'] / 1e6:,.1f} Mt", t("metric_co2_cumule", lang), "#A0D911"),
+        _carte_metrique(
+            f"{annees_deficit} / {len(trajectoire['annees'])}", t("metric_annees_deficit", lang),
+            "#44ff44" if annees_deficit == 0 else "#ff4444",
+        ),
+    ])
+
+
+def creer_fiabilite(fiabilite: dict, lang: str = "fr") -> html.Div:
+    """Crée la ligne des indicateurs de fiabilité (option « pannes fortuites »)."""
+    couleur = "#44ff44" if fiabilite["lole"] == 0 else "#ffaa00" if fiabilite["lole"] < 1 else "#ff4444"
+    return html.Div([
+        html.Div(className="metrics-row fiabilite-row", children=[
+            _carte_metrique(f"{fiabilite['lole']:.2f} h", t("metric_lole", lang), couleur),
+            _carte_metrique(f"{fiabilite['eens']:,.0f} MWh", t("metric_eens", lang), couleur),
+            _carte_metrique(f"{fiabilite['lolp']}%", t("metric_lolp", lang), couleur),
+        ]),
+        html.Div(
+            t("fiabilite_note", lang).format(tirages=f"{fiabilite['nb_tirages']:,}"),
+            className="info-box",
+        ),
+    ])
+
+
 def creer_message_etat(indicateurs: dict, lang: str = "fr") -> html.Div:
     """Crée le message de feedback (succès, avertissement ou alerte)."""
     couverture = indicateurs["taux_couverture"]
@@ -78,36 +133,84 @@ def creer_message_etat(indicateurs: dict, lang: str = "fr") -> html.Div:
         ])
 
 
-def creer_tableau_details(indicateurs: dict, lang: str = "fr") -> list:
-    """Retourne les colonnes et les données pour le DataTable des détails par source."""
-    colonnes = [
+# Colonnes numériques du tableau des détails : (id, clé de details_par_source, en-tête, décimales)
+_COLONNES_DETAILS = (
+    ("production", "production_mwh", "col_production", 0),
+    ("cout_constr", "cout_construction", "col_cout_constr", 0),
+    ("cout_prod", "cout_production", "col_cout_prod", 1),
+    ("co2", "co2_tonnes", "col_co2_tonnes", 0),
+    ("revenu", "revenu", "col_revenu", 1),
+    ("profit", "profit", "col_profit", 1),
+)
+
+
+@lru_cache(maxsize=len(LANGUES))
+def _colonnes_details(lang: str) -> list:
+    """En-têtes et formats du tableau des détails d'une langue (partagés : ne pas modifier)."""
+    return [
         {"name": "", "id": "emoji"},
         {"name": t("col_source", lang), "id": "source"},
         {"name": t("col_unites", lang), "id": "unites"},
-        {"name": t("col_production", lang), "id": "production"},
-        {"name": t("col_cout_constr", lang), "id": "cout_constr"},
-        {"name": t("col_cout_prod", lang), "id": "cout_prod"},
-        {"name": t("col_co2_tonnes", lang), "id": "co2"},
+    ] + [
+        {
+            "name": t(en_tete, lang),
+            "id": colonne,
+            "type": "numeric",
+            "format": Format(precision=decimales, scheme=Scheme.fixed, group=Group.yes),
+        }
+        for colonne, _, en_tete, decimales in _COLONNES_DETAILS
     ]
 
-    donnees = []
-    for source_id, detail in indicateurs["details_par_source"].items():
-        info = MOYENS_PRODUCTION[source_id]
-        donnees.append({
-            "emoji": info["emoji"],
-            "source": nom_source(source_id, lang),
-            "unites": detail["nb_unites"],
-            "production": f"{detail['production_mwh']:,.0f}",
-            "cout_constr": f"{detail['cout_construction']:,.0f}",
-            "cout_prod": f"{detail['cout_production']:,.1f}",
-            "co2": f"{detail['co2_tonnes']:,.0f}",
-        })
 
-    return colonnes, donnees
+@lru_cache(maxsize=len(LANGUES))
+def _noms_sources(lang: str) -> dict:
+    """{source: (emoji, nom traduit)} d'une langue."""
+    return {s: (MOYENS_PRODUCTION[s]["emoji"], nom_source(s, lang)) for s in MOYENS_PRODUCTION}
+
+
+def creer_tableau_details(indicateurs: dict, lang: str = "fr") -> list:
+    """Retourne les colonnes et les données pour le DataTable des détails par source."""
+    details = indicateurs["details_par_source"]
+    sources = list(details)
+
+    # Une matrice (sources × colonnes) arrondie d'un coup, colonne par colonne
+    valeurs = np.array(
+        [[details[s][cle] for _, cle, _, _ in _COLONNES_DETAILS] for s in sources], dtype=float,
+    ).reshape(len(sources), len(_COLONNES_DETAILS))
+    arrondies = {
+        colonne: (np.round(valeurs[:, j], decimales) if decimales else np.rint(valeurs[:, j]).astype(np.int64)).tolist()
+        for j, (colonne, _, _, decimales) in enumerate(_COLONNES_DETAILS)
+    }
+
+    noms = _noms_sources(lang)
+    donnees = [
+        {
+            "emoji": noms[source][0],
+            "source": noms[source][1],
+            "unites": details[source]["nb_unites"],
+            **{colonne: arrondies[colonne][k] for colonne in arrondies},
+        }
+        for k, source in enumerate(sources)
+    ]
+    return _colonnes_details(lang), donnees
+
+
+def creer_tableau_caracteristiques(lang: str = "fr", scenario: "str | Scenario | None" = None) -> tuple:
+    """
+    Retourne colonnes et données du tableau des caractéristiques (écran d'accueil), pour un scénario.
+    Construit une fois par langue et par scénario (partagé : ne pas modifier).
+    """
+    return _tableau_caracteristiques(lang, charger_scenario(scenario))
+
+
+# Tableaux gardés par (langue, Scenario) : un niveau modifié sur disque est un nouveau
+# Scenario, et l'ancien tableau finit par sortir du cache au lieu de s'accumuler
+_NB_TABLEAUX_CARACTERISTIQUES = 64
 
 
-def creer_tableau_caracteristiques(lang: str = "fr") -> tuple:
-    """Retourne colonnes et données du tableau des caractéristiques (écran d'accueil)."""
+@lru_cache(maxsize=_NB_TABLEAUX_CARACTERISTIQUES)
+def _tableau_caracteristiques(lang: str, scenario: Scenario) -> tuple:
+    moyens = scenario.moyens
     colonnes = [
         {"name": "", "id": "emoji"},
         {"name": t("col_source", lang), "id": "source"},
@@ -121,7 +224,7 @@ def creer_tableau_caracteristiques(lang: str = "fr") -> tuple:
 
     donnees = []
     for source_id in ORDRE_MERIT:
-        info = MOYENS_PRODUCTION[source_id]
+        info = moyens[source_id]
         donnees.append({
             "emoji": info["emoji"],
             "source": nom_source(source_id, lang),
@@ -3,13 +3,19 @@ Composant sidebar — sliders de sélection des moyens de production.
 """
 
 from dash import html, dcc
-from data import MOYENS_PRODUCTION, DEMANDE_HORAIRE, ORDRE_MERIT
+from data import ORDRE_MERIT, ORDRE_SLIDERS, OPTIONS_SIMULATION, FLEXIBILITE
+from scenarios import Scenario, charger_scenario, lister_scenarios, decrire_scenario
 from translations import t, nom_source
 
 
-def creer_slider_source(source_id: str, lang: str = "fr", valeur: int = 0) -> html.Div:
-    """Crée un bloc slider pour une source d'énergie donnée."""
-    info = MOYENS_PRODUCTION[source_id]
+def creer_slider_source(
+    source_id: str,
+    lang: str = "fr",
+    valeur: int = 0,
+    scenario: "str | Scenario | None" = None,
+) -> html.Div:
+    """Crée un bloc slider pour une source d'énergie donnée (caractéristiques du scénario)."""
+    info = charger_scenario(scenario).moyens[source_id]
     nom = nom_source(source_id, lang)
     return html.Div(className="source-block", children=[
         html.Div(f"{info['emoji']} {nom}", className="source-header"),
@@ -18,34 +24,70 @@ def creer_slider_source(source_id: str, lang: str = "fr", valeur: int = 0) -> ht
             f"{info['co2']} gCO₂/kWh",
             className="source-caption",
         ),
-        dcc.Slider(
-            id=f"slider-{source_id}",
-            min=0,
-            max=info["max_unites"],
-            step=1,
-            value=valeur,
-            marks={0: "0", info["max_unites"]: str(info["max_unites"])},
-            tooltip={
-                "placement": "bottom",
-                "always_visible": False,
-                "style": {
-                    "backgroundColor": "#1a1f2e",
-                    "color": "#ffffff",
-                    "border": "1px solid #333",
-                    "borderRadius": "4px",
-                    "padding": "4px 8px",
-                    "fontSize": "0.9rem",
-                },
-            },
+        _slider(source_id, info["max_unites"], valeur),
+    ])
+
+
+def creer_slider_flexibilite(
+    lang: str = "fr",
+    valeur: int = 0,
+    scenario: "str | Scenario | None" = None,
+) -> html.Div:
+    """Crée le bloc slider du pilotage de la demande (paramètres du scénario)."""
+    info = charger_scenario(scenario).flexibilite
+    return html.Div(className="source-block", children=[
+        html.Div(t("flexibilite_titre", lang), className="source-header"),
+        html.Div(
+            t("flexibilite_caption", lang).format(
+                puissance=info["puissance"], cout=info["cout_construction"], part=f"{info['part_max'] * 100:g}",
+            ),
+            className="source-caption",
         ),
+        _slider(FLEXIBILITE, info["max_unites"], valeur),
     ])
 
 
-def creer_sidebar(lang: str = "fr", valeurs: dict | None = None) -> html.Div:
-    """Construit la sidebar complète avec tous les sliders et le résumé."""
+def _slider(slider_id: str, max_unites: int, valeur: int) -> dcc.Slider:
+    """Slider du nombre d'unités (id slider-<slider_id>, voir ORDRE_SLIDERS)."""
+    return dcc.Slider(
+        id=f"slider-{slider_id}",
+        min=0,
+        max=max_unites,
+        step=1,
+        value=valeur,
+        marks={0: "0", max_unites: str(max_unites)},
+        tooltip={
+            "placement": "bottom",
+            "always_visible": False,
+            "style": {
+                "backgroundColor": "#1a1f2e",
+                "color": "#ffffff",
+                "border": "1px solid #333",
+                "borderRadius": "4px",
+                "padding": "4px 8px",
+                "fontSize": "0.9rem",
+            },
+        },
+    )
+
+
+def _nom_scenario(scenario_id: str, lang: str) -> str:
+    """Nom affiché d'un scénario, lu dans sa description (sans construire ses tableaux)."""
+    noms = decrire_scenario(scenario_id).get("nom", {})
+    return noms.get(lang, noms.get("fr", scenario_id))
+
+
+def creer_sidebar(
+    lang: str = "fr",
+    valeurs: dict | None = None,
+    options: tuple = (),
+    scenario: "str | Scenario | None" = None,
+) -> html.Div:
+    """Construit la sidebar complète avec le choix du niveau, les sliders, les options et le résumé."""
     valeurs = valeurs or {}
+    scenario = charger_scenario(scenario)
     sliders = [
-        creer_slider_source(source_id, lang, valeurs.get(source_id, 0))
+        creer_slider_source(source_id, lang, valeurs.get(source_id, 0), scenario)
         for source_id in ORDRE_MERIT
     ]
 
@@ -53,15 +95,53 @@ def creer_sidebar(lang: str = "fr", valeurs: dict | None = None) -> html.Div:
         html.H2(t("sidebar_titre", lang)),
         html.P(t("sidebar_instruction", lang)),
         html.Hr(),
+        # Niveau : scénario de demande, de météo et de prix
+        html.Div(t("scenario_titre", lang), className="source-header"),
+        dcc.Dropdown(
+            id="choix-scenario",
+            options=[{"label": _nom_scenario(s, lang), "value": s} for s in lister_scenarios()],
+            value=scenario.id,
+            clearable=False,
+            searchable=False,
+            className="choix-scenario",
+        ),
+        html.Div(scenario.description_affichee(lang), className="source-caption"),
+        html.Hr(),
         *sliders,
+        creer_slider_flexibilite(lang, valeurs.get(FLEXIBILITE, 0), scenario),
+        html.Hr(),
+        dcc.Checklist(
+            id="options-simulation",
+            options=[{"label": t(f"option_{option}", lang), "value": option} for option in OPTIONS_SIMULATION],
+            value=list(options),
+            className="options-simulation",
+        ),
         html.Hr(),
         html.Div(id="sidebar-investissement", className="sidebar-summary"),
         html.Div(id="sidebar-puissance", className="sidebar-summary"),
         html.Div(
-            t("sidebar_demande_max", lang).format(demande=f"{int(DEMANDE_HORAIRE.max()):,}"),
+            t("sidebar_demande_max", lang).format(demande=f"{int(scenario.demande.max()):,}"),
             style={"color": "#aaa", "fontSize": "0.9rem", "marginTop": "8px"},
         ),
         html.Div(id="sidebar-warning"),
+        html.Hr(),
+        # Partage : lien vers le mix courant + enregistrement nommé
+        html.Div(id="sidebar-partage"),
+        html.Div(className="partage-enregistrement", children=[
+            dcc.Input(
+                id="nom-configuration",
+                type="text",
+                placeholder=t("partage_nom", lang),
+                className="partage-input",
+            ),
+            html.Button(
+                t("partage_enregistrer", lang),
+                id="btn-enregistrer-configuration",
+                n_clicks=0,
+                className="partage-btn",
+            ),
+        ]),
+        html.Div(id="configuration-enregistree"),
     ])
 
 
@@ -70,12 +150,17 @@ def lire_choix_joueur(slider_values: list) -> dict:
     Convertit les valeurs des sliders en dictionnaire choix_joueur.
 
     Args:
-        slider_values: liste de valeurs dans l'ordre de ORDRE_MERIT
+        slider_values: liste de valeurs dans l'ordre de ORDRE_SLIDERS
 
     Returns:
-        dict {source_id: nb_unites, ...}
+        dict {source_id: nb_unites, ..., FLEXIBILITE: nb_unites}
     """
     return {
-        source_id: (val or 0)
-        for source_id, val in zip(ORDRE_MERIT, slider_values)
+        slider_id: (val or 0)
+        for slider_id, val in zip(ORDRE_SLIDERS, slider_values)
     }
+
+
+def lire_options(valeurs: list | None) -> tuple:
+    """Convertit la valeur de la checklist d'options en tuple trié (clé de cache de simuler)."""
+    return tuple(sorted(set(valeurs or ()) & set(OPTIONS_SIMULATION)))
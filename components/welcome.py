@@ -4,16 +4,67 @@ Composant écran d'accueil et section pédagogique.
 
 from dash import html, dcc, dash_table
 
-from data import ORDRE_MERIT, MOYENS_PRODUCTION
-from components.charts import graphique_demande_seule
 from components.metrics import creer_tableau_caracteristiques
 from translations import t
 
 
-def creer_ecran_accueil(lang: str = "fr") -> html.Div:
-    """Construit l'écran d'accueil affiché quand aucune unité n'est sélectionnée."""
-    colonnes, donnees = creer_tableau_caracteristiques(lang)
+# Figure d'attente affichée le temps que la courbe de demande pré-calculée soit récupérée
+_FIGURE_ATTENTE = {
+    "data": [],
+    "layout": {
+        "height": 400,
+        "paper_bgcolor": "rgba(0,0,0,0)",
+        "plot_bgcolor": "rgba(0,0,0,0)",
+        "xaxis": {"visible": False},
+        "yaxis": {"visible": False},
+    },
+}
 
+
+def _section_repliable(section: str, titre: str) -> html.Details:
+    """
+    Section repliable dont le contenu n'est pas envoyé avec la page :
+    un callback le remplit au premier clic sur le titre (voir charger_section).
+    """
+    return html.Details(
+        style={"marginTop": "1.5rem"},
+        children=[
+            html.Summary(
+                titre,
+                id={"type": "section-titre", "section": section},
+                n_clicks=0,
+                style={
+                    "cursor": "pointer",
+                    "fontSize": "1.1rem",
+                    "fontWeight": "600",
+                    "color": "#ffffff",
+                    "padding": "12px 16px",
+                    "backgroundColor": "#1a1f2e",
+                    "borderRadius": "8px",
+                    "border": "1px solid #333",
+                },
+            ),
+            html.Div(
+                id={"type": "section-contenu", "section": section},
+                style={
+                    "backgroundColor": "#1a1f2e",
+                    "border": "1px solid #333",
+                    "borderTop": "none",
+                    "borderRadius": "0 0 8px 8px",
+                    "padding": "20px",
+                    "lineHeight": "1.7",
+                    "color": "#e0e0e0",
+                },
+            ),
+        ],
+    )
+
+
+def creer_ecran_accueil(lang: str = "fr", url_demande: str = "/graphiques/demande-fr.json") -> html.Div:
+    """
+    Construit l'écran d'accueil affiché quand aucune unité n'est sélectionnée.
+    url_demande : URL (versionnée) de la courbe de demande, chargée côté client.
+    """
     return html.Div([
         html.Hr(),
 
@@ -40,34 +91,18 @@ def creer_ecran_accueil(lang: str = "fr") -> html.Div:
             ]),
         ]),
 
-        # Courbe de demande
+        # Courbe de demande : figure pré-calculée, chargée côté client (cache HTTP)
         html.H3(t("section_courbe_charge", lang), className="section-title"),
-        dcc.Graph(figure=graphique_demande_seule(lang), config={"displayModeBar": False}),
-
-        # Tableau des caractéristiques
-        html.H3(t("section_caracteristiques", lang), className="section-title"),
-        dash_table.DataTable(
-            columns=colonnes,
-            data=donnees,
-            style_table={"overflowX": "auto"},
-            style_header={
-                "backgroundColor": "#252b3b",
-                "color": "#ffffff",
-                "fontWeight": "bold",
-                "border": "1px solid #333",
-            },
-            style_cell={
-                "backgroundColor": "#1a1f2e",
-                "color": "#e0e0e0",
-                "border": "1px solid #333",
-                "textAlign": "center",
-                "padding": "10px",
-            },
-            style_data_conditional=[
-                {"if": {"row_index": "odd"}, "backgroundColor": "#1e2433"},
-            ],
+        dcc.Store(id="url-graphique-demande", data=url_demande),
+        dcc.Graph(
+            id="graphique-demande-accueil",
+            figure=_FIGURE_ATTENTE,
+            config={"displayModeBar": False},
         ),
 
+        # Tableau des caractéristiques (contenu chargé à l'ouverture)
+        _section_repliable("caracteristiques", t("section_caracteristiques", lang)),
+
         html.Hr(),
 
         # Conseils
@@ -97,51 +132,67 @@ def creer_ecran_accueil(lang: str = "fr") -> html.Div:
 
 
 def creer_section_pedagogique(lang: str = "fr") -> html.Details:
-    """Crée la section pédagogique repliable."""
-    return html.Details(
-        style={"marginTop": "1.5rem"},
-        children=[
-            html.Summary(
-                t("pedago_titre", lang),
-                style={
-                    "cursor": "pointer",
-                    "fontSize": "1.1rem",
-                    "fontWeight": "600",
-                    "color": "#ffffff",
-                    "padding": "12px 16px",
-                    "backgroundColor": "#1a1f2e",
-                    "borderRadius": "8px",
-                    "border": "1px solid #333",
-                },
-            ),
-            html.Div(
-                style={
-                    "backgroundColor": "#1a1f2e",
-                    "border": "1px solid #333",
-                    "borderTop": "none",
-                    "borderRadius": "0 0 8px 8px",
-                    "padding": "20px",
-                    "lineHeight": "1.7",
-                    "color": "#e0e0e0",
-                },
-                children=[
-                    html.H4(t("pedago_merit_titre", lang)),
-                    html.P(t("pedago_merit_texte", lang)),
-                    html.H4(t("pedago_intermittence_titre", lang)),
-                    html.Ul([
-                        html.Li(t("pedago_intermittence_1", lang)),
-                        html.Li(t("pedago_intermittence_2", lang)),
-                        html.Li(t("pedago_intermittence_3", lang)),
-                    ]),
-                    html.H4(t("pedago_equilibre_titre", lang)),
-                    html.P(t("pedago_equilibre_texte", lang)),
-                    html.Ul([
-                        html.Li([html.B(t("pedago_deficit", lang)), t("pedago_deficit_suite", lang)]),
-                        html.Li([html.B(t("pedago_surplus", lang)), t("pedago_surplus_suite", lang)]),
-                    ]),
-                    html.H4(t("pedago_realite_titre", lang)),
-                    html.P(t("pedago_realite_texte", lang)),
-                ],
-            ),
-        ],
-    )
+    """Crée la section pédagogique repliable (contenu chargé à la première ouverture)."""
+    return _section_repliable("pedagogie", t("pedago_titre", lang))
+
+
+def creer_contenu_pedagogique(lang: str = "fr", scenario: str | None = None) -> list:
+    """Contenu de la section pédagogique, envoyé seulement quand elle est ouverte."""
+    return [
+        html.H4(t("pedago_merit_titre", lang)),
+        html.P(t("pedago_merit_texte", lang)),
+        html.H4(t("pedago_intermittence_titre", lang)),
+        html.Ul([
+            html.Li(t("pedago_intermittence_1", lang)),
+            html.Li(t("pedago_intermittence_2", lang)),
+            html.Li(t("pedago_intermittence_3", lang)),
+        ]),
+        html.H4(t("pedago_equilibre_titre", lang)),
+        html.P(t("pedago_equilibre_texte", lang)),
+        html.Ul([
+            html.Li([html.B(t("pedago_deficit", lang)), t("pedago_deficit_suite", lang)]),
+            html.Li([html.B(t("pedago_surplus", lang)), t("pedago_surplus_suite", lang)]),
+        ]),
+        html.H4(t("pedago_realite_titre", lang)),
+        html.P(t("pedago_realite_texte", lang)),
+    ]
+
+
+def creer_contenu_caracteristiques(lang: str = "fr", scenario: str | None = None) -> list:
+    """Contenu du tableau des caractéristiques (catalogue du scénario), envoyé seulement quand il est ouvert."""
+    colonnes, donnees = creer_tableau_caracteristiques(lang, scenario)
+    return [
+        dash_table.DataTable(
+            columns=colonnes,
+            data=donnees,
+            style_table={"overflowX": "auto"},
+            style_header={
+                "backgroundColor": "#252b3b",
+                "color": "#ffffff",
+                "fontWeight": "bold",
+                "border": "1px solid #333",
+            },
+            style_cell={
+                "backgroundColor": "#1a1f2e",
+                "color": "#e0e0e0",
+                "border": "1px solid #333",
+                "textAlign": "center",
+                "padding": "10px",
+            },
+            style_data_conditional=[
+                {"if": {"row_index": "odd"}, "backgroundColor": "#1e2433"},
+            ],
+        ),
+    ]
+
+
+# Constructeurs de contenu des sections repliables, par identifiant de section
+CONTENUS_SECTIONS = {
+    "pedagogie": creer_contenu_pedagogique,
+    "caracteristiques": creer_contenu_caracteristiques,
+}
+
+
+def charger_section(section: str, lang: str = "fr", scenario: str | None = None) -> list:
+    """Construit le contenu d'une section repliable à la demande (callback d'ouverture)."""
+    return CONTENUS_SECTIONS[section](lang, scenario)
@@ -0,0 +1,173 @@
+"""
+Compression HTTP et empreintes de contenu des assets.
+
+Les réponses de l'application (JSON Plotly des callbacks, layout, bundles
+JavaScript de Dash et plotly.js) sont très redondantes et se compressent
+d'un facteur 5 à 10. installer_compression(server) ajoute un hook Flask qui :
+  - rend conditionnelles les petites réponses GET sans ETag (layout,
+    dépendances, page d'accueil) : une visite répétée reçoit un 304 ;
+  - compresse en brotli (si le module est installé) ou en gzip les réponses
+    textuelles au-delà de SEUIL_COMPRESSION octets, selon Accept-Encoding.
+Les ressources à longue durée de cache (bundles versionnés) ne sont
+compressées qu'une fois, au niveau maximal : le cache est indexé par
+l'empreinte du contenu (pas par l'URL), et borné. Une ressource dont le
+contenu change sous la même URL (courbe de demande d'un niveau modifié sur
+disque) est donc recompressée, jamais servie périmée.
+
+Les fichiers de assets/ sont servis sous une URL qui contient l'empreinte
+de leur contenu (/assets-v/<empreinte>/style.css, voir app.py) : ils peuvent
+donc être mis en cache un an (« immutable ») — une modification du fichier
+change l'URL.
+
+brotli est optionnel : sans lui, seul gzip est proposé.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from flask import request
+
+# Taille en dessous de laquelle la compression ne rapporte pas son coût (octets)
+SEUIL_COMPRESSION = 1024
+
+# Réponses dynamiques : compression rapide. Ressources statiques : compressées
+# une seule fois, donc au niveau maximal.
+NIVEAU_GZIP = 6
+NIVEAU_GZIP_STATIQUE = 9
+QUALITE_BROTLI = 4
+QUALITE_BROTLI_STATIQUE = 11
+
+# Durée de cache à partir de laquelle une réponse est considérée comme statique (s)
+DUREE_CACHE_STATIQUE = 86400
+
+TYPES_COMPRESSIBLES = {
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "image/svg+xml",
+    "image/x-icon",
+    "image/vnd.microsoft.icon",
+}
+
+# (SHA-256 du contenu, encodage) → octets compressés des ressources statiques, du plus
+# ancien au plus récemment servi ; au plus _NB_STATIQUES entrées
+_STATIQUES: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+_NB_STATIQUES = 64
+_VERROU_STATIQUES = threading.Lock()
+
+
+def brotli_disponible() -> bool:
+    """Indique si la compression brotli est possible."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def choisir_encodage(accept_encodings) -> str | None:
+    """Meilleur encodage accepté par le client : "br", "gzip" ou None."""
+    if accept_encodings["br"] and brotli_disponible():
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def compresser(donnees: bytes, encodage: str, statique: bool = False) -> bytes:
+    """Compresse des octets en "br" ou "gzip"."""
+    if encodage == "br":
+        import brotli
+
+        return brotli.compress(donnees, quality=QUALITE_BROTLI_STATIQUE if statique else QUALITE_BROTLI)
+    return gzip.compress(donnees, NIVEAU_GZIP_STATIQUE if statique else NIVEAU_GZIP)
+
+
+def _compresser_statique(donnees: bytes, encodage: str) -> bytes:
+    """Compression mise en cache par empreinte du contenu (LRU borné)."""
+    cle = (hashlib.sha256(donnees).digest(), encodage)
+    with _VERROU_STATIQUES:
+        compresse = _STATIQUES.get(cle)
+        if compresse is not None:
+            _STATIQUES.move_to_end(cle)
+            return compresse
+    compresse = compresser(donnees, encodage, statique=True)
+    with _VERROU_STATIQUES:
+        _STATIQUES[cle] = compresse
+        while len(_STATIQUES) > _NB_STATIQUES:
+            _STATIQUES.popitem(last=False)
+    return compresse
+
+
+def compresser_reponse(reponse):
+    """Hook after_request : réponse conditionnelle, puis compressée si le client l'accepte."""
+    if (
+        reponse.status_code != 200
+        or reponse.direct_passthrough
+        or reponse.is_streamed
+        or "Content-Encoding" in reponse.headers
+        or reponse.mimetype not in TYPES_COMPRESSIBLES
+    ):
+        return reponse
+
+    # Petites réponses GET (page, layout, dépendances) : ETag pour les visites répétées
+    if request.method == "GET" and reponse.get_etag()[0] is None:
+        reponse.add_etag()
+        reponse.make_conditional(request)
+        if reponse.status_code == 304:
+            return reponse
+
+    reponse.vary.add("Accept-Encoding")
+    encodage = choisir_encodage(request.accept_encodings)
+    donnees = reponse.get_data()
+    if encodage is None or len(donnees) < SEUIL_COMPRESSION:
+        return reponse
+
+    if (reponse.cache_control.max_age or 0) >= DUREE_CACHE_STATIQUE:
+        compresse = _compresser_statique(donnees, encodage)
+    else:
+        compresse = compresser(donnees, encodage)
+    reponse.set_data(compresse)
+    reponse.headers["Content-Encoding"] = encodage
+
+    # Le contenu transmis n'est plus celui de l'ETag : il devient faible
+    etag, faible = reponse.get_etag()
+    if etag is not None and not faible:
+        reponse.set_etag(etag, weak=True)
+    return reponse
+
+
+def installer_compression(server) -> None:
+    """
+    Enregistre la compression sur l'application Flask.
+
+    À appeler avant les autres hooks after_request : Flask les exécute dans
+    l'ordre inverse, la compression passe donc en dernier.
+    """
+    server.after_request(compresser_reponse)
+
+
+# =============================================================================
+# Empreintes des assets
+# =============================================================================
+
+@lru_cache(maxsize=256)
+def _lire_asset(chemin: str, mtime: float) -> tuple[str, bytes]:
+    with open(chemin, "rb") as f:
+        contenu = f.read()
+    return hashlib.sha256(contenu).hexdigest()[:12], contenu
+
+
+def lire_asset(chemin: str) -> tuple[str, bytes]:
+    """
+    Empreinte (12 caractères hexadécimaux du SHA-256) et contenu d'un fichier,
+    relus quand le fichier change sur disque.
+    """
+    return _lire_asset(chemin, os.path.getmtime(chemin))
@@ -4,7 +4,6 @@ Définition des moyens de production et de la courbe de charge.
 """
 
 import numpy as np
-import pandas as pd
 
 # =============================================================================
 # Moyens de production
@@ -20,6 +19,16 @@ import pandas as pd
 #   - puissance : puissance nominale par unité (MW)
 #   - pilotable : si la source est pilotable (True) ou intermittente (False)
 #   - description : description pédagogique
+# Sources pilotables uniquement (mode « engagement des unités ») :
+#   - min_marche : durée minimale de fonctionnement après démarrage (h)
+#   - min_arret : durée minimale d'arrêt avant redémarrage (h)
+#   - puissance_min : production minimale d'une unité en marche (fraction de sa capacité disponible)
+# Sources à disponibilité constante (option « pannes fortuites », voir fiabilite.py) :
+#   - duree_reparation : durée moyenne d'une panne fortuite (h)
+# Sources écrêtables (option « écrêtement ») :
+#   - cout_ecretement : indemnité versée au producteur par MWh écrêté (€/MWh) ;
+#     les sources sont écrêtées par indemnité croissante. Une source sans
+#     cout_ecretement produit à coup sûr (« must-run ») : son excédent reste du surplus
 
 MOYENS_PRODUCTION = {
     "charbon": {
@@ -34,6 +43,10 @@ MOYENS_PRODUCTION = {
         "pilotable": True,
         "max_unites": 120,
         "duree_vie": 40,
+        "min_marche": 6,
+        "min_arret": 6,
+        "puissance_min": 0.4,
+        "duree_reparation": 24,
         "description": "Centrale thermique à charbon. Très polluante mais fiable et pilotable. "
                        "Coût de production élevé (taxe carbone incluse). Source la plus émettrice de CO₂."
     },
@@ -49,6 +62,10 @@ MOYENS_PRODUCTION = {
         "pilotable": True,
         "max_unites": 170,
         "duree_vie": 30,
+        "min_marche": 3,
+        "min_arret": 2,
+        "puissance_min": 0.35,
+        "duree_reparation": 12,
         "description": "Centrale à cycle combiné gaz. Plus flexible et moins polluante que le charbon, "
                        "mais reste une énergie fossile (taxe carbone incluse). Idéal pour les pics."
     },
@@ -64,6 +81,10 @@ MOYENS_PRODUCTION = {
         "pilotable": True,
         "max_unites": 230,
         "duree_vie": 30,
+        "min_marche": 1,
+        "min_arret": 1,
+        "puissance_min": 0.25,
+        "duree_reparation": 12,
         "description": "Centrale thermique au fioul. Très coûteuse à exploiter et fortement émettrice. "
                        "Utilisée principalement en dernier recours pour les pointes."
     },
@@ -79,6 +100,7 @@ MOYENS_PRODUCTION = {
         "pilotable": False,
         "max_unites": 60,
         "duree_vie": 60,
+        "duree_reparation": 72,
         "description": "Centrale nucléaire. Très faible empreinte carbone et coût de production bas, "
                        "mais investissement initial très élevé. Production constante (inertie forte) : "
                        "impossible de moduler rapidement. Idéal pour fournir la base, mais génère du surplus la nuit."
@@ -95,6 +117,10 @@ MOYENS_PRODUCTION = {
         "pilotable": True,
         "max_unites": 50,
         "duree_vie": 80,
+        "min_marche": 1,
+        "min_arret": 1,
+        "puissance_min": 0.0,
+        "duree_reparation": 8,
         "description": "Barrage hydroélectrique. Énergie renouvelable, pilotable et très peu émettrice. "
                        "Disponibilité limitée par les ressources en eau."
     },
@@ -110,6 +136,7 @@ MOYENS_PRODUCTION = {
         "pilotable": False,
         "max_unites": 100,
         "duree_vie": 25,
+        "cout_ecretement": 20,
         "description": "Parc photovoltaïque. Coût de production quasi nul mais production uniquement "
                        "en journée. Intermittent : dépend de l'ensoleillement."
     },
@@ -125,14 +152,56 @@ MOYENS_PRODUCTION = {
         "pilotable": False,
         "max_unites": 80,
         "duree_vie": 20,
+        "cout_ecretement": 35,
         "description": "Parc éolien. Renouvelable et faible empreinte carbone, mais production variable "
                        "selon le vent. Produit plus la nuit et en hiver."
     },
 }
 
+# =============================================================================
+# Pilotage de la demande (effacement et report de consommation)
+# =============================================================================
+# Ressource achetée par unités comme un moyen de production, mais qui ne produit
+# rien : elle déplace une partie de la consommation des heures où la charge
+# nette (demande - production non-pilotable) est forte vers celles où elle est
+# faible, à énergie constante sur chaque journée (voir flexibilite.py).
+#   - puissance : report maximal par heure et par unité (MW), à la hausse comme à la baisse
+#   - part_max : part de la demande horaire qui peut être effacée (usages décalables)
+#   - cout_construction, duree_vie, max_unites : comme pour un moyen de production
+
+FLEXIBILITE = "flexibilite"
+
+FLEXIBILITE_DEMANDE = {
+    "nom": "Pilotage de la demande",
+    "emoji": "🔌",
+    "couleur": "#e84393",
+    "cout_construction": 25,
+    "puissance": 250,
+    "part_max": 0.10,
+    "max_unites": 40,
+    "duree_vie": 15,
+    "description": "Contrats d'effacement et pilotage des usages décalables (chauffe-eau, recharge "
+                   "des véhicules, process industriels). Ne produit rien : déplace la consommation "
+                   "des pointes vers les creux de la journée.",
+}
+
+# Prix de marché en heure de défaillance (€/MWh) : quand la demande n'est pas
+# couverte, le prix monte au plafond (valeur de l'énergie non distribuée)
+PRIX_PLAFOND = 3000
+
+# Options de simulation proposées au joueur (cases à cocher de la sidebar)
+#   - engagement : unités pilotables démarrées / arrêtées une à une (engagement.py)
+#   - pannes : indicateurs de fiabilité sur des pannes fortuites tirées au hasard (fiabilite.py)
+#   - ecretement : l'excédent des sources non-pilotables est écrêté (solaire, éolien)
+#     au lieu d'être injecté en surplus ; seul l'excédent « must-run » reste du surplus
+OPTIONS_SIMULATION = ("engagement", "pannes", "ecretement")
+
 # Ordre des couleurs pour le graphique empilé (du bas vers le haut = merit order)
 ORDRE_MERIT = ["nucleaire", "hydraulique", "eolien", "solaire", "charbon", "gaz", "petrole"]
 
+# Ordre des sliders de la sidebar : les sources, puis le pilotage de la demande
+ORDRE_SLIDERS = ORDRE_MERIT + [FLEXIBILITE]
+
 
 # =============================================================================
 # Courbe de charge (demande) — Journée type France métropolitaine
@@ -191,8 +260,15 @@ PROFIL_EOLIEN = np.array([
 ])
 
 
+# Les tableaux ci-dessus sont partagés (entre requêtes, et entre workers gunicorn
+# après le fork) : on les fige en lecture seule pour éviter toute modification.
+for _tableau in (DEMANDE_HORAIRE, PROFIL_SOLAIRE, PROFIL_EOLIEN):
+    _tableau.setflags(write=False)
+
+
 def get_demande_dataframe():
     """Retourne la courbe de charge sous forme de DataFrame."""
+    import pandas as pd  # import différé : pandas est absent du chemin critique de l'application
     return pd.DataFrame({
         "heure": HEURES,
         "label": LABELS_HEURES,
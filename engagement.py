@@ -0,0 +1,186 @@
+"""
+Engagement des unités (« unit commitment » simplifié) pour les sources pilotables.
+
+En mode agrégé, une source de nb_unites unités se comporte comme un bloc
+continu. Ici, chaque unité est démarrée ou arrêtée individuellement, avec :
+  - une durée minimale de marche après démarrage (min_marche),
+  - une durée minimale d'arrêt avant redémarrage (min_arret),
+  - une production minimale par unité en marche (puissance_min).
+
+Heuristique gloutonne par liste de priorité, heure par heure : on engage
+juste assez d'unités, des moins chères aux plus chères, pour couvrir la
+demande résiduelle, dans les limites imposées par les verrous de marche et
+d'arrêt. L'état des unités d'une source est un entier Python utilisé comme
+ensemble de bits (bit i = unité i en marche) : les verrous sont des OU des
+masques de démarrage / d'arrêt des dernières heures.
+
+Avec Numba installé, engager_unites passe par le noyau compilé de noyaux.py
+(même heuristique, même résultat au bit près). engager_unites_lot engage un
+lot de mix d'un coup (noyau compilé, ou sa version NumPy vectorisée sur les mix).
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+from data import MOYENS_PRODUCTION
+from noyaux import NUMBA_DISPONIBLE, engager_lot
+
+
+def _bits_bas(masque: int, k: int) -> int:
+    """Les k bits à 1 de poids le plus faible de masque."""
+    resultat = 0
+    for _ in range(k):
+        bit = masque & -masque
+        resultat |= bit
+        masque ^= bit
+    return resultat
+
+
+def _bits_hauts(masque: int, k: int) -> int:
+    """Les k bits à 1 de poids le plus fort de masque."""
+    resultat = 0
+    for _ in range(k):
+        bit = 1 << (masque.bit_length() - 1)
+        resultat |= bit
+        masque ^= bit
+    return resultat
+
+
+def _ou(masques) -> int:
+    """OU de tous les masques d'une fenêtre d'historique."""
+    resultat = 0
+    for masque in masques:
+        resultat |= masque
+    return resultat
+
+
+def _parametres_noyau(sources: list, moyens: dict) -> tuple:
+    """Paramètres des sources pour noyaux.engager_lot : capacité d'une unité, fraction min, min_marche, min_arret."""
+    infos = [moyens[s] for s in sources]
+    return (
+        np.array([info["puissance"] * info["disponibilite"] for info in infos], dtype=float),
+        np.array([info.get("puissance_min", 0.0) for info in infos], dtype=float),
+        np.array([info.get("min_marche", 1) for info in infos], dtype=np.int64),
+        np.array([info.get("min_arret", 1) for info in infos], dtype=np.int64),
+    )
+
+
+def engager_unites_lot(
+    sources: list,
+    nb_unites: np.ndarray,
+    demande_residuelle: np.ndarray,
+    moyens: dict = MOYENS_PRODUCTION,
+) -> dict:
+    """
+    Engagement des unités d'un lot de mix (voir engager_unites).
+
+    Args:
+        sources: sources pilotables, triées par coût de production croissant
+        nb_unites: tableau (..., len(sources)) du nombre d'unités construites
+        demande_residuelle: tableau (..., H) de la demande restante après les sources non-pilotables
+        moyens: catalogue des moyens de production (celui du scénario)
+
+    Returns:
+        dict au format de engager_unites, avec les dimensions du lot en tête :
+        production (..., len(sources), H), unites_engagees (idem), demarrages (..., len(sources))
+    """
+    nb_unites = np.asarray(nb_unites)
+    forme = nb_unites.shape[:-1]
+    demande_residuelle = np.asarray(demande_residuelle, dtype=float)
+    production, unites_engagees, demarrages = engager_lot(
+        nb_unites.reshape(-1, len(sources)).astype(np.int64),
+        np.broadcast_to(demande_residuelle, forme + demande_residuelle.shape[-1:]).reshape(-1, demande_residuelle.shape[-1]),
+        *_parametres_noyau(sources, moyens),
+    )
+    return {
+        "production": production.reshape(forme + production.shape[1:]),
+        "unites_engagees": unites_engagees.reshape(forme + unites_engagees.shape[1:]),
+        "demarrages": demarrages.reshape(forme + demarrages.shape[1:]),
+    }
+
+
+def engager_unites(
+    sources: list,
+    nb_unites: list,
+    demande_residuelle: np.ndarray,
+    moyens: dict = MOYENS_PRODUCTION,
+) -> dict:
+    """
+    Engage les unités pilotables heure par heure, puis répartit la production.
+
+    Args:
+        sources: sources pilotables, triées par coût de production croissant
+        nb_unites: nombre d'unités construites pour chaque source
+        demande_residuelle: demande restante après les sources non-pilotables (MW, par heure)
+        moyens: catalogue des moyens de production (celui du scénario)
+
+    Returns:
+        dict avec :
+          - production : tableau (len(sources), H) de la production (MW)
+          - unites_engagees : tableau (len(sources), H) du nombre d'unités en marche
+          - demarrages : tableau (len(sources),) du nombre de démarrages sur la période
+    """
+    if NUMBA_DISPONIBLE:
+        # Noyau compilé : même résultat, sans la boucle Python sur les heures
+        lot = engager_unites_lot(sources, np.array(nb_unites)[None], np.asarray(demande_residuelle)[None], moyens)
+        return {cle: valeurs[0] for cle, valeurs in lot.items()}
+
+    nb_heures = len(demande_residuelle)
+    nb_sources = len(sources)
+    production = np.zeros((nb_sources, nb_heures))
+    unites_engagees = np.zeros((nb_sources, nb_heures), dtype=int)
+    demarrages = np.zeros(nb_sources, dtype=int)
+
+    infos = [moyens[s] for s in sources]
+    capacite_unite = [info["puissance"] * info["disponibilite"] for info in infos]
+    fraction_min = [info.get("puissance_min", 0.0) for info in infos]
+    toutes = [(1 << int(n)) - 1 for n in nb_unites]
+    marche = [0] * nb_sources
+
+    # Masques de démarrage / d'arrêt des dernières heures, qui verrouillent l'état des unités
+    historique_demarrages = [deque(maxlen=max(0, info.get("min_marche", 1) - 1)) for info in infos]
+    historique_arrets = [deque(maxlen=max(0, info.get("min_arret", 1) - 1)) for info in infos]
+
+    for h in range(nb_heures):
+        reste = max(0.0, demande_residuelle[h])
+
+        # --- Engagement : juste assez d'unités, par coût croissant ---
+        for i in range(nb_sources):
+            verrou_marche = _ou(historique_demarrages[i]) & marche[i]
+            eligibles = toutes[i] & ~_ou(historique_arrets[i])
+
+            besoin = math.ceil(reste / capacite_unite[i]) if reste > 0 else 0
+            n = min(max(besoin, verrou_marche.bit_count()), eligibles.bit_count())
+            en_marche = marche[i].bit_count()
+
+            demarres = arretes = 0
+            if n > en_marche:
+                demarres = _bits_bas(eligibles & ~marche[i], n - en_marche)
+            elif n < en_marche:
+                arretes = _bits_hauts(marche[i] & ~verrou_marche, en_marche - n)
+            marche[i] = (marche[i] | demarres) & ~arretes
+
+            if historique_demarrages[i].maxlen:
+                historique_demarrages[i].append(demarres)
+            if historique_arrets[i].maxlen:
+                historique_arrets[i].append(arretes)
+            demarrages[i] += demarres.bit_count()
+            unites_engagees[i, h] = n
+            reste -= n * capacite_unite[i]
+
+        # --- Répartition : minimum technique de chaque unité en marche, puis merit order ---
+        capacite = [unites_engagees[i, h] * capacite_unite[i] for i in range(nb_sources)]
+        minimum = [capacite[i] * fraction_min[i] for i in range(nb_sources)]
+        reste = demande_residuelle[h] - sum(minimum)
+        for i in range(nb_sources):
+            complement = min(capacite[i] - minimum[i], max(0.0, reste))
+            production[i, h] = minimum[i] + complement
+            reste -= complement
+
+    return {
+        "production": production,
+        "unites_engagees": unites_engagees,
+        "demarrages": demarrages,
+    }
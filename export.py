@@ -0,0 +1,228 @@
+"""
+Export des résultats de dispatch — Arrow IPC, Parquet ou CSV, en flux.
+
+Les mix sont simulés par blocs (calculer_dispatch_lot, le chemin de
+l'interface : mêmes options de simulation) et chaque bloc est
+écrit dès qu'il est calculé : un lot de milliers de mix n'est jamais
+matérialisé entièrement en mémoire. Sur un horizon long, les blocs sont
+réduits pour tenir dans le budget mémoire (lots.BUDGET_MEMOIRE). En Parquet, chaque bloc devient un
+row group ; en Arrow IPC, un record batch.
+
+pyarrow est optionnel : sans lui, seul le CSV est disponible.
+"""
+
+import io
+
+import numpy as np
+
+from data import ORDRE_MERIT
+from lots import BUDGET_MEMOIRE, ecart_demande
+from scenarios import Scenario, charger_scenario
+from simulation import calculer_dispatch_lot, calculer_prix_lot
+
+# Formats d'export : extension → type MIME
+FORMATS_EXPORT = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+}
+
+COLONNES_EXPORT = [
+    "mix", "heure", "demande_mw", *ORDRE_MERIT,
+    "production_totale", "deficit", "surplus", "prix", "report_demande",
+]
+
+# Nombre de mix simulés et écrits à la fois (H lignes par mix), au plus
+TAILLE_BLOC = 2048
+
+# Tableaux de H valeurs par mix d'un bloc : production (S) et sa transposée (S),
+# capacité (S), colonnes de l'export et temporaires ; S de plus par option
+# « écrêtement » (MW écrêtés, plus leurs colonnes) ou « engagement » (unités engagées)
+_TABLEAUX_PAR_MIX = 3 * len(ORDRE_MERIT) + 10
+_TABLEAUX_PAR_OPTION = len(ORDRE_MERIT)
+
+
+def colonnes_export(scenario: "str | Scenario | None" = None, options: tuple = ()) -> list[str]:
+    """
+    Colonnes de l'export : COLONNES_EXPORT, suivies avec l'option « écrêtement » des MW
+    écrêtés (ecretement, toutes sources, puis ecretement_<source> dans l'ordre
+    scenario.ordre_ecretement, comme simulation.calculer_dispatch).
+    """
+    if "ecretement" not in options:
+        return list(COLONNES_EXPORT)
+    scenario = charger_scenario(scenario)
+    return [*COLONNES_EXPORT, "ecretement", *[f"ecretement_{ORDRE_MERIT[i]}" for i in scenario.ordre_ecretement]]
+
+
+def pyarrow_disponible() -> bool:
+    """Indique si les exports Arrow / Parquet sont possibles."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def iterer_blocs_dispatch(
+    unites: np.ndarray,
+    taille_bloc: int = TAILLE_BLOC,
+    scenario: "str | Scenario | None" = None,
+    flexibilite: np.ndarray | None = None,
+    options: tuple = (),
+):
+    """
+    Simule les mix bloc par bloc, avec les options de simulation de l'interface.
+
+    Args:
+        unites: tableau (K, S) du nombre d'unités par source (ordre ORDRE_MERIT)
+        taille_bloc: mix par bloc, au plus — moins si un bloc dépasse lots.BUDGET_MEMOIRE
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: tableau (K,) des unités de pilotage de la demande (None : aucune).
+                     demande_mw est alors la demande servie, après report_demande
+        options: options de simulation (OPTIONS_SIMULATION), comme simulation.calculer_dispatch
+
+    Yields:
+        dict {colonne: tableau 1-D contigu}, colonnes de colonnes_export(scenario, options)
+        — taille_bloc × H lignes au plus
+    """
+    scenario = charger_scenario(scenario)
+    unites = np.asarray(unites, dtype=float).reshape(-1, len(ORDRE_MERIT))
+    if flexibilite is not None:
+        flexibilite = np.broadcast_to(np.asarray(flexibilite, dtype=float), unites.shape[:1])
+    nb_heures = scenario.nb_heures
+    tableaux = _TABLEAUX_PAR_MIX + _TABLEAUX_PAR_OPTION * len({"ecretement", "engagement"} & set(options))
+    if "ecretement" in options:
+        tableaux += len(colonnes_export(scenario, options)) - len(COLONNES_EXPORT)
+    taille_bloc = max(1, min(taille_bloc, BUDGET_MEMOIRE // (tableaux * nb_heures * 8)))
+
+    for debut in range(0, len(unites), taille_bloc):
+        bloc = unites[debut:debut + taille_bloc]
+        flexibilite_bloc = None if flexibilite is None else flexibilite[debut:debut + taille_bloc]
+        k = len(bloc)
+
+        # (K, S, H) → (S, K, H) contigu : chaque source devient une colonne 1-D
+        # sans copie supplémentaire (vue reshape sur un tampon contigu)
+        production_lot, demande_lot, ecretees = calculer_dispatch_lot(bloc, options, scenario, flexibilite_bloc)
+        prix = calculer_prix_lot(production_lot, scenario, demande_lot).reshape(-1)
+        production = np.ascontiguousarray(production_lot.transpose(1, 0, 2))
+        totale = production.sum(axis=0).reshape(-1)
+        demande = np.ascontiguousarray(demande_lot).reshape(-1)
+
+        colonnes = {
+            "mix": np.repeat(np.arange(debut, debut + k, dtype=np.int32), nb_heures),
+            "heure": np.tile(np.arange(nb_heures, dtype=np.int16), k),
+            "demande_mw": demande,
+        }
+        for i, source in enumerate(ORDRE_MERIT):
+            colonnes[source] = production[i].reshape(-1)
+        colonnes["production_totale"] = totale
+        ecart = ecart_demande(demande, totale)
+        colonnes["deficit"] = np.maximum(0, ecart)
+        colonnes["surplus"] = np.maximum(0, -ecart)
+        colonnes["prix"] = prix
+        colonnes["report_demande"] = demande - np.tile(scenario.demande, k)
+        if ecretees is not None:
+            colonnes["ecretement"] = ecretees.sum(axis=-2).reshape(-1)
+            for i in scenario.ordre_ecretement:
+                colonnes[f"ecretement_{ORDRE_MERIT[i]}"] = np.ascontiguousarray(ecretees[:, i]).reshape(-1)
+        yield colonnes
+
+
+class _TamponFlux(io.RawIOBase):
+    """Fichier en écriture seule dont on récupère le contenu au fil de l'eau."""
+
+    def __init__(self):
+        self._morceaux: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, donnees) -> int:
+        self._morceaux.append(bytes(donnees))
+        return len(donnees)
+
+    def vider(self) -> bytes:
+        """Retourne (et oublie) tout ce qui a été écrit depuis le dernier appel."""
+        donnees = b"".join(self._morceaux)
+        self._morceaux.clear()
+        return donnees
+
+
+def _record_batch(colonnes: dict):
+    """RecordBatch Arrow construit sans copie depuis les tableaux NumPy contigus."""
+    import pyarrow as pa
+
+    return pa.RecordBatch.from_arrays(
+        [pa.array(tableau) for tableau in colonnes.values()],
+        names=list(colonnes),
+    )
+
+
+def _flux_arrow(blocs, parquet: bool):
+    """Générateur d'octets Arrow IPC (stream) ou Parquet, un bloc à la fois."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    tampon = _TamponFlux()
+    ecrivain = None
+    for colonnes in blocs:
+        batch = _record_batch(colonnes)
+        if ecrivain is None:
+            ecrivain = (
+                pq.ParquetWriter(tampon, batch.schema, compression="zstd") if parquet
+                else pa.ipc.new_stream(tampon, batch.schema)
+            )
+        if parquet:
+            ecrivain.write_batch(batch, row_group_size=batch.num_rows)
+        else:
+            ecrivain.write_batch(batch)
+        yield tampon.vider()
+    if ecrivain is not None:
+        ecrivain.close()
+    yield tampon.vider()
+
+
+def _flux_csv(blocs, noms: list[str]):
+    """Générateur d'octets CSV, un bloc à la fois (colonnes noms, voir colonnes_export)."""
+    yield (",".join(noms) + "\n").encode("utf-8")
+    for colonnes in blocs:
+        tampon = io.StringIO()
+        np.savetxt(
+            tampon,
+            np.column_stack([colonnes[nom] for nom in noms]),
+            delimiter=",",
+            fmt=["%d", "%d"] + ["%.3f"] * (len(noms) - 2),
+        )
+        yield tampon.getvalue().encode("utf-8")
+
+
+def exporter_dispatch(
+    unites: np.ndarray,
+    format_export: str = "csv",
+    scenario: "str | Scenario | None" = None,
+    flexibilite: np.ndarray | None = None,
+    options: tuple = (),
+) -> tuple[str, object]:
+    """
+    Exporte le dispatch horaire d'un ou plusieurs mix.
+
+    Args:
+        unites: tableau (K, S) — ou (S,) pour un seul mix
+        format_export: "arrow", "parquet" ou "csv"
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: tableau (K,) des unités de pilotage de la demande (None : aucune)
+        options: options de simulation (OPTIONS_SIMULATION)
+
+    Returns:
+        (format effectif, générateur d'octets). Sans pyarrow, Arrow et Parquet
+        retombent sur du CSV.
+    """
+    if format_export not in FORMATS_EXPORT:
+        raise ValueError(f"Format d'export inconnu : {format_export}")
+    if format_export != "csv" and not pyarrow_disponible():
+        format_export = "csv"
+
+    blocs = iterer_blocs_dispatch(unites, scenario=scenario, flexibilite=flexibilite, options=options)
+    if format_export == "csv":
+        return format_export, _flux_csv(blocs, colonnes_export(scenario, options))
+    return format_export, _flux_arrow(blocs, parquet=format_export == "parquet")
@@ -0,0 +1,203 @@
+"""
+Fiabilité du parc — pannes fortuites tirées au hasard, indicateurs LOLE / EENS.
+
+Le dispatch applique la disponibilité comme un déclassement déterministe :
+20 unités à 85 % valent 17 unités, toujours. Ici, chaque unité d'une source
+à disponibilité constante est en panne ou non, tirée au hasard, sur de
+nombreuses journées (tirages). Beaucoup de petites unités lissent les pannes ;
+quelques grosses unités exposent à des heures de défaillance.
+
+Deux modèles de pannes :
+  - binomial : chaque heure, le nombre d'unités disponibles suit une loi
+    binomiale (nb_unites, disponibilite), indépendamment des autres heures ;
+  - markov : chaque unité alterne marche / panne (chaîne de Markov à deux
+    états), avec une durée moyenne de réparation duree_reparation. Les pannes
+    durent donc plusieurs heures. Le taux de défaillance est choisi pour que
+    la disponibilité moyenne reste celle de data.py.
+
+Tout est vectorisé sur tirages × sources × heures : les unités d'une source
+sont comptées (tirages binomiaux), pas simulées une à une. 1000 tirages
+coûtent quelques millisecondes.
+
+Les indicateurs ne dépendent que de la capacité disponible : en dispatch
+agrégé, le déficit vaut max(0, demande - capacité disponible totale). Avec
+des unités de pilotage de la demande, la demande est d'abord reportée comme
+dans le dispatch (flexibilite.calculer_report), sur la charge nette de chaque
+tirage : la demande moins les sources non-pilotables disponibles.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from data import ORDRE_MERIT
+from flexibilite import calculer_report
+from lots import ecart_demande
+from scenarios import Scenario, charger_scenario
+
+# Nombre de journées tirées et graine par défaut : résultats reproductibles
+# (et donc mis en cache avec le mix par simulation.simuler)
+NB_TIRAGES = 1000
+GRAINE = 0
+
+MODELES_PANNES = ("binomial", "markov")
+
+
+# Borné : un niveau modifié sur disque est un nouveau Scenario, les anciens paramètres sortent du cache
+@lru_cache(maxsize=64)
+def _parametres_pannes(scenario: Scenario) -> dict:
+    """
+    Paramètres de pannes d'un scénario (tableaux en lecture seule).
+
+    Les sources sujettes aux pannes fortuites sont celles dont duree_reparation
+    est renseignée ; les autres (solaire, éolien) suivent leur profil météo.
+    """
+    moyens = scenario.moyens
+    indices_pannes = np.array([i for i, s in enumerate(ORDRE_MERIT) if "duree_reparation" in moyens[s]])
+    indices_meteo = np.array([i for i in range(len(ORDRE_MERIT)) if i not in indices_pannes])
+    disponibilite = np.array([moyens[ORDRE_MERIT[i]]["disponibilite"] for i in indices_pannes])
+    duree_reparation = np.array([moyens[ORDRE_MERIT[i]]["duree_reparation"] for i in indices_pannes], dtype=float)
+
+    # Chaîne de Markov à l'échelle horaire :
+    #   réparation  μ = 1 / duree_reparation
+    #   défaillance λ = μ (1 - A) / A   → disponibilité stationnaire μ / (λ + μ) = A
+    proba_reparation = 1 / duree_reparation
+    proba_defaillance = proba_reparation * (1 - disponibilite) / disponibilite
+
+    non_pilotables = [ORDRE_MERIT[i] for i in scenario.ordre_non_pilotables]
+    parametres = {
+        "indices_pannes": indices_pannes,
+        "puissance_pannes": scenario.puissance[indices_pannes],
+        "disponibilite": disponibilite,
+        "proba_reparation": proba_reparation,
+        "proba_defaillance": proba_defaillance,
+        "indices_meteo": indices_meteo,
+        # Production d'une unité de chaque source météo (MW, S_météo × H)
+        "capacite_unite_meteo": scenario.puissance[indices_meteo, None] * scenario.facteurs[indices_meteo],
+        # Sources non-pilotables parmi chaque groupe (charge nette du pilotage de la demande)
+        "non_pilotables_pannes": np.array([ORDRE_MERIT[i] in non_pilotables for i in indices_pannes], dtype=bool),
+        "non_pilotables_meteo": np.array([ORDRE_MERIT[i] in non_pilotables for i in indices_meteo], dtype=bool),
+    }
+    for tableau in parametres.values():
+        tableau.setflags(write=False)
+    return parametres
+
+
+def tirer_unites_disponibles(
+    unites: np.ndarray,
+    scenario: "str | Scenario | None" = None,
+    nb_tirages: int = NB_TIRAGES,
+    graine: int | None = GRAINE,
+    modele: str = "markov",
+) -> np.ndarray:
+    """
+    Tire le nombre d'unités disponibles, heure par heure, des sources sujettes aux pannes.
+
+    Args:
+        unites: tableau (S,) du nombre d'unités par source (ordre ORDRE_MERIT)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        nb_tirages: nombre d'horizons (journées, ou semaines...) tirés
+        graine: graine du générateur (None : non reproductible)
+        modele: "binomial" ou "markov"
+
+    Returns:
+        tableau (nb_tirages, nb de sources sujettes aux pannes, H) d'unités disponibles
+    """
+    if modele not in MODELES_PANNES:
+        raise ValueError(f"Modèle de pannes inconnu : {modele}")
+
+    scenario = charger_scenario(scenario)
+    parametres = _parametres_pannes(scenario)
+    disponibilite = parametres["disponibilite"]
+    rng = np.random.default_rng(graine)
+    nb = np.asarray(unites, dtype=np.int64)[parametres["indices_pannes"]]
+    nb_heures = scenario.nb_heures
+
+    if modele == "binomial":
+        return rng.binomial(nb[:, None], disponibilite[:, None], size=(nb_tirages, len(nb), nb_heures))
+
+    # Markov : état initial tiré dans la loi stationnaire, puis pannes et réparations
+    # de chaque heure tirées en bloc pour toutes les journées et toutes les sources
+    disponibles = np.empty((nb_tirages, len(nb), nb_heures), dtype=np.int64)
+    en_marche = rng.binomial(nb, disponibilite, size=(nb_tirages, len(nb)))
+    disponibles[..., 0] = en_marche
+    for h in range(1, nb_heures):
+        en_marche = (
+            en_marche - rng.binomial(en_marche, parametres["proba_defaillance"])
+            + rng.binomial(nb - en_marche, parametres["proba_reparation"])
+        )
+        disponibles[..., h] = en_marche
+    return disponibles
+
+
+def calculer_deficit_tirages(
+    unites: np.ndarray,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+    **tirage,
+) -> np.ndarray:
+    """
+    Déficit horaire (MW) de chaque horizon tiré.
+
+    Args:
+        unites: tableau (S,) du nombre d'unités par source (ordre ORDRE_MERIT)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: nombre d'unités de pilotage de la demande (None : aucune)
+        **tirage: nb_tirages, graine, modele (voir tirer_unites_disponibles)
+
+    Returns:
+        tableau (nb_tirages, H)
+    """
+    scenario = charger_scenario(scenario)
+    parametres = _parametres_pannes(scenario)
+    unites = np.asarray(unites, dtype=float)
+    capacite_meteo = unites[parametres["indices_meteo"], None] * parametres["capacite_unite_meteo"]
+
+    disponibles = tirer_unites_disponibles(unites, scenario, **tirage)
+    puissance = parametres["puissance_pannes"]
+    capacite_totale = capacite_meteo.sum(axis=0) + np.einsum("dsh,s->dh", disponibles, puissance)
+
+    # Pilotage de la demande : report sur la charge nette de chaque tirage, comme au dispatch
+    demande = scenario.demande
+    if flexibilite is not None and np.any(np.asarray(flexibilite) > 0):
+        charge_nette = (
+            demande - capacite_meteo[parametres["non_pilotables_meteo"]].sum(axis=0)
+            - np.einsum("dsh,s->dh", disponibles, np.where(parametres["non_pilotables_pannes"], puissance, 0))
+        )
+        demande = demande + calculer_report(charge_nette, flexibilite, scenario)
+    return np.maximum(0, ecart_demande(demande, capacite_totale))
+
+
+def evaluer_fiabilite(
+    unites: np.ndarray,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+    **tirage,
+) -> dict:
+    """
+    Indicateurs de fiabilité d'un mix, sur nb_tirages horizons.
+
+    Args:
+        unites: tableau (S,) du nombre d'unités par source (ordre ORDRE_MERIT)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: nombre d'unités de pilotage de la demande (None : aucune)
+        **tirage: nb_tirages, graine, modele (voir tirer_unites_disponibles)
+
+    Returns:
+        dict avec :
+          - lole : espérance du nombre d'heures de défaillance par jour (h)
+          - eens : espérance de l'énergie non distribuée par jour (MWh)
+          - lolp : probabilité qu'une journée compte au moins une heure de défaillance (%)
+          - proba_deficit_horaire : probabilité de défaillance de chaque heure (H valeurs)
+          - nb_tirages
+    """
+    scenario = charger_scenario(scenario)
+    deficit = calculer_deficit_tirages(unites, scenario, flexibilite, **tirage)
+    heures_deficit = deficit > 0
+    return {
+        "lole": round(float(heures_deficit.sum(axis=1).mean()) / scenario.nb_jours, 2),
+        "eens": round(float(deficit.sum(axis=1).mean()) / scenario.nb_jours, 1),
+        "lolp": round(float(heures_deficit.reshape(len(deficit), scenario.nb_jours, -1).any(axis=2).mean()) * 100, 1),
+        "proba_deficit_horaire": heures_deficit.mean(axis=0),
+        "nb_tirages": len(deficit),
+    }
@@ -0,0 +1,102 @@
+"""
+Pilotage de la demande — report de consommation par remplissage des creux.
+
+Les unités de pilotage achetées par le joueur déplacent de la consommation
+d'une heure à l'autre sans en changer le total sur chaque journée. Le report
+r_h de l'heure h (MW, positif : consommation ajoutée) est borné :
+    -min(P, part_max × demande_h) ≤ r_h ≤ P      (P : puissance pilotable)
+et Σ r_h = 0 sur chaque journée.
+
+Le report aplatit la charge nette n_h (demande - production non-pilotable)
+avant la passe des sources pilotables (« valley filling ») : on cherche le
+niveau L tel que
+    r_h = clip(L - n_h, bas_h, haut_h),   Σ r_h = 0.
+Les pointes descendent vers L, les creux montent vers L, dans la limite des
+bornes. Ce report minimise Σ (n_h + r_h)² sous les contraintes : c'est la
+charge nette la plus plate possible.
+
+La somme Σ r_h est croissante et linéaire par morceaux en L. Ses 48 points de
+cassure par jour (n_h + bas_h, n_h + haut_h) sont triés, la somme est évaluée
+en chacun par une somme cumulée des pentes, et L est interpolé sur le segment
+où elle change de signe. Tout est vectorisé sur (..., jours, 24) : un lot de
+mix se traite d'un bloc, en un temps linéaire en l'horizon.
+"""
+
+import numpy as np
+
+from scenarios import Scenario, charger_scenario
+
+
+def remplir_creux(charge_nette: np.ndarray, bas, haut) -> np.ndarray:
+    """
+    Report qui aplatit la charge nette de chaque journée, à énergie constante.
+
+    Args:
+        charge_nette: tableau (..., J, 24) de la charge nette (MW)
+        bas, haut: bornes du report (bas ≤ 0 ≤ haut), diffusables vers la forme de charge_nette
+
+    Returns:
+        tableau (..., J, 24) du report (MW) : sa somme sur chaque journée est nulle
+        (à l'arrondi près)
+    """
+    charge_nette = np.asarray(charge_nette, dtype=float)
+    bas = np.broadcast_to(bas, charge_nette.shape)
+    haut = np.broadcast_to(haut, charge_nette.shape)
+    nb_heures = charge_nette.shape[-1]
+
+    # Points de cassure : l'heure h entre dans sa plage libre en n_h + bas_h
+    # (pente +1) et en sort en n_h + haut_h (pente -1)
+    seuils = np.concatenate([charge_nette + bas, charge_nette + haut], axis=-1)
+    ordre = np.argsort(seuils, axis=-1)
+    seuils = np.take_along_axis(seuils, ordre, axis=-1)
+    pentes = np.cumsum(np.where(ordre < nb_heures, 1.0, -1.0), axis=-1)
+
+    # Σ r_h en chaque seuil : toutes les heures à leur borne basse au premier
+    sommes = np.concatenate([
+        np.zeros(seuils.shape[:-1] + (1,)),
+        np.cumsum(pentes[..., :-1] * np.diff(seuils, axis=-1), axis=-1),
+    ], axis=-1) + bas.sum(axis=-1, keepdims=True)
+
+    # Premier seuil où la somme atteint 0 ; L est interpolé sur le segment qui le précède
+    j = np.argmax(sommes >= 0, axis=-1)[..., None]
+    precedent = np.maximum(j - 1, 0)
+    pente = np.take_along_axis(pentes, precedent, axis=-1)
+    niveau = np.where(
+        (j > 0) & (pente > 0),
+        np.take_along_axis(seuils, precedent, axis=-1)
+        - np.take_along_axis(sommes, precedent, axis=-1) / np.where(pente > 0, pente, 1),
+        np.take_along_axis(seuils, j, axis=-1),
+    )
+    return np.clip(niveau - charge_nette, bas, haut)
+
+
+def calculer_report(
+    charge_nette: np.ndarray,
+    nb_unites,
+    scenario: "str | Scenario | None" = None,
+    demande: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Report de consommation des unités de pilotage de la demande.
+
+    Args:
+        charge_nette: tableau (..., H) de la demande moins la production non-pilotable (MW)
+        nb_unites: nombre d'unités de pilotage — scalaire, ou tableau (...) pour un lot de mix
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        demande: demande (H,) ou (..., H) qui borne l'effacement (défaut : scenario.demande)
+
+    Returns:
+        tableau (..., H) du report (MW) à ajouter à la demande
+    """
+    scenario = charger_scenario(scenario)
+    charge_nette = np.asarray(charge_nette, dtype=float)
+    forme_jours = charge_nette.shape[:-1] + (scenario.nb_jours, 24)
+
+    flexibilite = scenario.flexibilite
+    puissance = np.asarray(nb_unites, dtype=float)[..., None, None] * flexibilite["puissance"]
+    haut = puissance
+    demande = scenario.demande if demande is None else np.asarray(demande, dtype=float)
+    bas = -np.minimum(puissance, flexibilite["part_max"] * demande.reshape(demande.shape[:-1] + forme_jours[-2:]))
+
+    report = remplir_creux(charge_nette.reshape(forme_jours), bas, haut)
+    return report.reshape(charge_nette.shape)
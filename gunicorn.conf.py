@@ -0,0 +1,26 @@
+"""
+Configuration gunicorn — l'application est chargée une seule fois dans le
+processus maître (--preload), puis les workers sont forkés.
+
+Tout ce qui est immuable (catalogue et profils NumPy en lecture seule, figures
+et layout sérialisés en octets, traductions) est construit avant le fork par
+app.prechauffer(). gc.freeze() place ensuite ces objets dans une génération
+permanente : le ramasse-miettes des workers ne les parcourt plus, et ne
+provoque donc pas la copie des pages mémoire partagées (copy-on-write).
+"""
+
+import gc
+
+bind = "0.0.0.0:8501"
+workers = 4
+timeout = 120
+preload_app = True
+
+
+def when_ready(server):
+    """Appelé dans le maître, après le chargement de l'application et avant le premier fork."""
+    from app import prechauffer
+
+    prechauffer()
+    gc.collect()
+    gc.freeze()
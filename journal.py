@@ -0,0 +1,225 @@
+"""
+Journal des sessions de jeu — pour étudier hors ligne comment les joueurs
+convergent vers un bon mix.
+
+Désactivé par défaut : il n'est tenu que si la variable d'environnement
+GRID_GAME_JOURNAL désigne un dossier. Chaque requête du callback principal (y
+compris une réponse servie par le cache) ajoute alors un événement :
+    (session, horodatage, niveau, options, unités des sliders, score)
+La session est un identifiant aléatoire porté par un cookie de session du
+navigateur ; aucune donnée personnelle n'est enregistrée.
+
+Les requêtes ne font que déposer l'événement dans une file, sans E/S ni
+calcul : le score est celui que le callback a calculé et affiché au joueur
+(NaN sur l'écran d'accueil, sans score). Un thread d'écriture par processus
+regroupe les événements par lots (TAILLE_LOT, ou DELAI_LOT secondes), sans
+autre travail que l'écriture, et les ajoute à un segment CSV propre au processus, journal-<début>-<pid>-<n>.csv. Un segment plein
+(EVENEMENTS_PAR_SEGMENT) est fermé et converti en Parquet (colonnes,
+compression zstd) : sessions-<début>-<pid>-<n>.parquet. Si la file déborde (disque
+trop lent), les événements en trop sont perdus et comptés, jamais attendus.
+
+pyarrow est optionnel : sans lui, les segments fermés restent en CSV.
+analyse_sessions.py relit les segments et les rejoue par la simulation par lots.
+"""
+
+import atexit
+import csv
+import math
+import os
+import queue
+import threading
+import time
+
+from data import ORDRE_SLIDERS
+
+COLONNES_JOURNAL = ["session", "horodatage", "scenario", "options", *ORDRE_SLIDERS, "score"]
+
+# Événements écrits à la fois, et attente maximale avant d'écrire un lot incomplet (s)
+TAILLE_LOT = 256
+DELAI_LOT = 2.0
+
+# Événements par segment avant sa conversion en Parquet
+EVENEMENTS_PAR_SEGMENT = 50_000
+
+# Événements en attente au-delà desquels les nouveaux sont perdus
+CAPACITE_FILE = 10_000
+
+# Séparateur des options dans la colonne "options" (ex : "engagement+pannes")
+SEPARATEUR_OPTIONS = "+"
+
+# Marque de fin déposée dans la file par fermer()
+_ARRET = object()
+
+
+def pyarrow_disponible() -> bool:
+    """Indique si les segments peuvent être convertis en Parquet."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class JournalSessions:
+    """
+    Journal en ajout seul, écrit par un thread de fond.
+
+    enregistrer() peut être appelé depuis n'importe quel thread de requête :
+    il ne bloque jamais. Le thread d'écriture démarre au premier événement du
+    processus (après le fork des workers gunicorn, chacun a le sien).
+    """
+
+    def __init__(
+        self,
+        dossier: str,
+        taille_lot: int = TAILLE_LOT,
+        delai_lot: float = DELAI_LOT,
+        evenements_par_segment: int = EVENEMENTS_PAR_SEGMENT,
+        capacite: int = CAPACITE_FILE,
+    ):
+        self.dossier = dossier
+        self.taille_lot = taille_lot
+        self.delai_lot = delai_lot
+        self.evenements_par_segment = evenements_par_segment
+        self.capacite = capacite
+        self.nb_perdus = 0
+        self._verrou = threading.Lock()
+        self._pid: int | None = None
+        self._file: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._segment: str | None = None
+        self._nb_segment = 0
+        self._numero_segment = 0
+
+    # -------------------------------------------------------------------------
+    # Côté requêtes
+    # -------------------------------------------------------------------------
+
+    def enregistrer(
+        self, session: str, unites: tuple, options: tuple = (), scenario: str = "", score: float = math.nan,
+    ) -> None:
+        """
+        Ajoute un événement au journal, sans attendre.
+
+        Args:
+            session: identifiant de la session du joueur
+            unites: nombre d'unités par slider (ordre ORDRE_SLIDERS)
+            options: tuple trié d'options de simulation
+            scenario: identifiant du niveau
+            score: score affiché au joueur (NaN s'il n'y en a pas)
+        """
+        file = self._demarrer()
+        try:
+            file.put_nowait((session, time.time(), scenario, tuple(options), tuple(unites), score))
+        except queue.Full:
+            self.nb_perdus += 1
+
+    def vider(self) -> None:
+        """Attend que tous les événements déjà enregistrés soient écrits."""
+        if self._pid == os.getpid():
+            self._file.join()
+
+    def fermer(self) -> None:
+        """Écrit les événements en attente, arrête le thread et convertit le segment en cours."""
+        with self._verrou:
+            if self._pid != os.getpid() or self._thread is None:
+                return
+            # Un événement enregistré ensuite redémarre un thread (nouveau segment)
+            thread, self._thread, self._pid = self._thread, None, None
+        self._file.put(_ARRET)
+        thread.join()
+        self._clore_segment()
+
+    def _demarrer(self) -> queue.Queue:
+        """File du processus courant ; démarre le thread d'écriture au premier appel."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._file
+        with self._verrou:
+            # Après un fork, la file et le thread du maître ne sont pas ceux de ce processus
+            if self._pid != pid:
+                self._file = queue.Queue(maxsize=self.capacite)
+                self._segment, self._nb_segment = None, 0
+                self._thread = threading.Thread(target=self._boucle, name="journal-sessions", daemon=True)
+                self._thread.start()
+                atexit.register(self.fermer)
+                self._pid = pid
+        return self._file
+
+    # -------------------------------------------------------------------------
+    # Thread d'écriture
+    # -------------------------------------------------------------------------
+
+    def _boucle(self) -> None:
+        """Regroupe les événements par lots et les écrit, jusqu'à la marque de fin."""
+        file = self._file
+        arret = False
+        while not arret:
+            lot = [file.get()]
+            echeance = time.monotonic() + self.delai_lot
+            while len(lot) < self.taille_lot and lot[-1] is not _ARRET:
+                try:
+                    lot.append(file.get(timeout=max(0.0, echeance - time.monotonic())))
+                except queue.Empty:
+                    break
+            arret = lot[-1] is _ARRET
+            evenements = [evenement for evenement in lot if evenement is not _ARRET]
+            try:
+                if evenements:
+                    self._ecrire(evenements)
+            except (OSError, ValueError):
+                # Disque plein, segment illisible... : le lot est perdu, le thread continue
+                self.nb_perdus += len(evenements)
+            finally:
+                for _ in lot:
+                    file.task_done()
+
+    def _ecrire(self, evenements: list) -> None:
+        """Ajoute un lot d'événements au segment en cours (changé s'il est plein)."""
+        lignes = [
+            [session, f"{horodatage:.3f}", scenario, SEPARATEUR_OPTIONS.join(options), *unites, score]
+            for session, horodatage, scenario, options, unites, score in evenements
+        ]
+        if self._segment is None:
+            os.makedirs(self.dossier, exist_ok=True)
+            debut = time.strftime("%Y%m%dT%H%M%S")
+            self._numero_segment += 1
+            self._segment = os.path.join(
+                self.dossier, f"journal-{debut}-{os.getpid()}-{self._numero_segment}.csv",
+            )
+            self._nb_segment = 0
+        with open(self._segment, "a", newline="", encoding="utf-8") as f:
+            ecrivain = csv.writer(f)
+            if self._nb_segment == 0:
+                ecrivain.writerow(COLONNES_JOURNAL)
+            ecrivain.writerows(lignes)
+        self._nb_segment += len(lignes)
+        if self._nb_segment >= self.evenements_par_segment:
+            self._clore_segment()
+
+    def _clore_segment(self) -> None:
+        """Convertit le segment en cours en Parquet (en CSV renommé sans pyarrow)."""
+        segment, self._segment = self._segment, None
+        if segment is None:
+            return
+        clos = os.path.join(self.dossier, os.path.basename(segment).replace("journal-", "sessions-", 1))
+        if not pyarrow_disponible():
+            os.replace(segment, clos)
+            return
+
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+
+        types = {"session": pa.string(), "scenario": pa.string(), "options": pa.string()}
+        table = pa_csv.read_csv(
+            segment,
+            convert_options=pa_csv.ConvertOptions(column_types=types, strings_can_be_null=False),
+        )
+        temporaire = clos.replace(".csv", ".parquet.tmp")
+        pq.write_table(table, temporaire, compression="zstd")
+        os.replace(temporaire, clos.replace(".csv", ".parquet"))
+        os.remove(segment)
+
+
+JOURNAL = JournalSessions(os.environ["GRID_GAME_JOURNAL"]) if os.environ.get("GRID_GAME_JOURNAL") else None
@@ -0,0 +1,95 @@
+"""
+Calcul par lots : précision de stockage et découpage sous un budget mémoire.
+
+Un lot de K mix occupe K × S × H valeurs par tableau de travail du dispatch
+(capacité, production, écrêtement...) : sur un horizon d'un an (8 760 h),
+quelques centaines de mix en float64 dépassent déjà la mémoire d'un worker.
+Deux leviers, réglables par variables d'environnement :
+
+- la précision de stockage (GRID_GAME_PRECISION, "float64" par défaut) :
+  en "float32", les tableaux (..., S, H) du dispatch sont stockés en simple
+  précision, mais les sommes d'énergie et de coût sont accumulées en float64.
+  Le score reste égal à celui du float64 à l'arrondi près ;
+- le budget mémoire d'un appel (GRID_GAME_MEMOIRE_LOT, en Mo, 256 par
+  défaut) : planifier_blocs découpe un lot trop gros en blocs de mix qui
+  tiennent dans le budget, calculés l'un après l'autre.
+
+La pile du dispatch soustrait les sources une à une de la demande : une heure
+exactement couverte garde un résidu de l'ordre de l'arrondi (≈ 1e-11 MW en
+float64). ecart_demande ramène à 0 tout écart demande − production sous
+TOLERANCE_ECART : ce résidu n'est ni un déficit, ni un surplus, ni une heure au
+prix plafond, quelle que soit la précision de stockage.
+"""
+
+import math
+import os
+
+import numpy as np
+
+# Précisions de stockage acceptées
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
+
+PRECISION_DEFAUT = os.environ.get("GRID_GAME_PRECISION", "float64")
+
+# Écart relatif (à demande + production) sous lequel une heure est équilibrée :
+# quelques arrondis de la précision la plus grossière, la même pour toutes les précisions
+TOLERANCE_ECART = 8 * max(float(np.finfo(dtype).eps) for dtype in PRECISIONS.values())
+
+# Mémoire de travail maximale d'un calcul par lots (octets)
+BUDGET_MEMOIRE = int(float(os.environ.get("GRID_GAME_MEMOIRE_LOT", 256)) * 2**20)
+
+
+def type_stockage(precision: str | None = None) -> type:
+    """
+    Type NumPy des tableaux du dispatch pour une précision.
+
+    Args:
+        precision: "float64" ou "float32" (défaut : PRECISION_DEFAUT)
+
+    Raises:
+        ValueError si la précision est inconnue
+    """
+    precision = PRECISION_DEFAUT if precision is None else precision
+    try:
+        return PRECISIONS[precision]
+    except KeyError:
+        raise ValueError(f"Précision inconnue : {precision!r} (attendu : {', '.join(PRECISIONS)})") from None
+
+
+def ecart_demande(demande, production_totale) -> np.ndarray:
+    """
+    Écart demande − production horaire (MW), mis à 0 s'il est de l'ordre de l'arrondi.
+
+    Positif : déficit ; négatif : surplus. Toute mesure de déficit, de surplus ou
+    d'heures de déficit passe par là (voir TOLERANCE_ECART).
+
+    Args:
+        demande: demande (servie) — tableau (..., H), diffusable avec production_totale
+        production_totale: production totale (..., H)
+    """
+    ecart = np.subtract(demande, production_totale)
+    tolerance = TOLERANCE_ECART * (np.abs(demande) + np.abs(production_totale))
+    return np.where(np.abs(ecart) > tolerance, ecart, 0.0)
+
+
+def planifier_blocs(nb_mix: int, octets_par_mix: int, budget: int | None = None) -> list[slice]:
+    """
+    Découpe un lot de mix en blocs consécutifs dont la mémoire de travail tient dans le budget.
+
+    Les blocs ont tous (à un mix près) la même taille : le dernier n'est pas
+    un reliquat minuscule. Un mix qui dépasse à lui seul le budget forme un bloc.
+
+    Args:
+        nb_mix: nombre de mix du lot
+        octets_par_mix: mémoire de travail d'un mix (octets)
+        budget: mémoire maximale d'un bloc (octets, défaut : BUDGET_MEMOIRE)
+
+    Returns:
+        liste de tranches [debut:fin] couvrant range(nb_mix) (une seule si le lot tient)
+    """
+    budget = BUDGET_MEMOIRE if budget is None else budget
+    mix_par_bloc = max(1, budget // max(1, octets_par_mix))
+    nb_blocs = max(1, math.ceil(nb_mix / mix_par_bloc))
+    # Bornes réparties uniformément : nb_blocs blocs de ⌊nb_mix / nb_blocs⌋ ou ⌈nb_mix / nb_blocs⌉ mix
+    bornes = [nb_mix * k // nb_blocs for k in range(nb_blocs + 1)]
+    return [slice(debut, fin) for debut, fin in zip(bornes, bornes[1:])]
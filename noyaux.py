@@ -0,0 +1,278 @@
+"""
+Noyaux compilés des boucles séquentielles du dispatch.
+
+Certaines étapes du dispatch dépendent de l'heure précédente et ne se
+vectorisent pas sur l'horizon : c'est le cas de l'engagement des unités
+(verrous de marche et d'arrêt, voir engagement.py). Elles se vectorisent en
+revanche sur les mix : ce module les calcule pour un lot de N mix à la fois.
+
+Avec Numba (optionnel : pip install numba), les noyaux sont compilés en code
+natif, les mix d'un lot répartis sur les cœurs (prange). Ils sont compilés
+(ou chargés du cache disque : cache=True, dans __pycache__ ou NUMBA_CACHE_DIR)
+au premier appel, pas à l'import : charger un noyau parallel=True démarre la
+couche de threads de Numba (TBB), qu'un fork ultérieur laisse dans un état
+bloquant (maître gunicorn préchargé, pool de processus de balayage.py). Un
+mix seul passe par le noyau séquentiel, qui ne démarre aucun thread ; seuls
+les lots de plusieurs mix chargent le noyau parallèle. compiler_noyaux() les
+compile d'avance (image Docker) : une requête ne paie jamais de compilation.
+
+Sans Numba, ou avec GRID_GAME_NUMBA=0, chaque noyau a un équivalent NumPy,
+vectorisé sur les mix (boucle Python sur les heures seulement). Les versions
+donnent le même résultat au bit près.
+"""
+
+import math
+import os
+import threading
+
+import numpy as np
+
+# GRID_GAME_NUMBA=0 : versions NumPy, sans même importer Numba (~0,15 s d'import)
+numba = None
+if os.environ.get("GRID_GAME_NUMBA", "1") != "0":
+    try:
+        import numba
+    except ImportError:
+        pass
+
+# Noyaux compilés disponibles (Numba installé et non désactivé)
+NUMBA_DISPONIBLE = numba is not None
+
+# Heure du dernier démarrage / arrêt d'une unité qui n'a jamais démarré / été arrêtée
+_JAMAIS = -(1 << 40)
+
+# Noyaux compilés, chargés au premier appel (voir _noyaux)
+_NOYAUX: dict = {}
+_VERROU_NOYAUX = threading.Lock()
+
+
+# =============================================================================
+# Engagement des unités
+# =============================================================================
+
+def engager_lot(
+    nb_unites: np.ndarray,
+    demande_residuelle: np.ndarray,
+    capacite_unite: np.ndarray,
+    fraction_min: np.ndarray,
+    min_marche: np.ndarray,
+    min_arret: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Engagement des unités pilotables d'un lot de mix (heuristique de engagement.py).
+
+    Unité par unité, l'état d'une source est : en marche ou non, heure du
+    dernier démarrage et du dernier arrêt. Une unité démarrée depuis moins de
+    min_marche heures ne peut pas être arrêtée ; une unité arrêtée depuis moins
+    de min_arret heures ne peut pas démarrer. On démarre les unités libres de
+    plus petit indice, on arrête celles de plus grand indice.
+
+    Args:
+        nb_unites: tableau (N, P) d'entiers, unités construites par source pilotable
+        demande_residuelle: tableau (N, H), demande restante après les non-pilotables (MW)
+        capacite_unite: tableau (P,), capacité disponible d'une unité (MW)
+        fraction_min: tableau (P,), production minimale d'une unité en marche (fraction)
+        min_marche, min_arret: tableaux (P,) d'entiers, durées minimales (h)
+
+    Returns:
+        (production (N, P, H) en MW, unites_engagees (N, P, H), demarrages (N, P))
+    """
+    # Tableaux contigus et modifiables (une vue diffusée en lecture seule n'a pas le type compilé)
+    arguments = tuple(
+        np.require(tableau, dtype=dtype, requirements=("C", "W"))
+        for tableau, dtype in (
+            (nb_unites, np.int64), (demande_residuelle, np.float64), (capacite_unite, np.float64),
+            (fraction_min, np.float64), (min_marche, np.int64), (min_arret, np.int64),
+        )
+    )
+    if not NUMBA_DISPONIBLE:
+        return _engager_numpy(*arguments)
+    if len(arguments[0]) != 1:
+        return _noyau_lot()(*arguments)
+
+    # Un seul mix : noyau séquentiel, sans la couche de threads du noyau parallèle
+    nb_unites, demande_residuelle = arguments[:2]
+    production = np.zeros((1,) + nb_unites.shape[1:] + demande_residuelle.shape[1:])
+    unites_engagees = np.zeros(production.shape, dtype=np.int64)
+    demarrages = np.zeros(nb_unites.shape, dtype=np.int64)
+    _noyaux()["mix"](
+        nb_unites[0], demande_residuelle[0], *arguments[2:], production[0], unites_engagees[0], demarrages[0],
+    )
+    return production, unites_engagees, demarrages
+
+
+def _engager_numpy(nb_unites, demande_residuelle, capacite_unite, fraction_min, min_marche, min_arret):
+    """engager_lot en NumPy : état (N, U) de chaque source, boucle sur les heures."""
+    nb_mix, nb_sources = nb_unites.shape
+    nb_heures = demande_residuelle.shape[1]
+    nb_max = max(1, int(nb_unites.max(initial=0)))
+    production = np.zeros((nb_mix, nb_sources, nb_heures))
+    unites_engagees = np.zeros((nb_mix, nb_sources, nb_heures), dtype=np.int64)
+    demarrages = np.zeros((nb_mix, nb_sources), dtype=np.int64)
+
+    construites = np.arange(nb_max) < nb_unites[:, :, None]  # (N, P, U)
+    marche = np.zeros((nb_mix, nb_sources, nb_max), dtype=bool)
+    demarre = np.full((nb_mix, nb_sources, nb_max), _JAMAIS, dtype=np.int64)
+    arrete = np.full((nb_mix, nb_sources, nb_max), _JAMAIS, dtype=np.int64)
+
+    for h in range(nb_heures):
+        reste = np.maximum(0.0, demande_residuelle[:, h])
+
+        # --- Engagement : juste assez d'unités, par coût croissant ---
+        for i in range(nb_sources):
+            verrou = marche[:, i] & (h - demarre[:, i] < min_marche[i])
+            eligibles = construites[:, i] & (h - arrete[:, i] >= min_arret[i])
+            en_marche = marche[:, i].sum(axis=1)
+
+            besoin = np.where(reste > 0, np.ceil(reste / capacite_unite[i]), 0).astype(np.int64)
+            n = np.minimum(np.maximum(besoin, verrou.sum(axis=1)), eligibles.sum(axis=1))
+
+            # Démarrages : les unités libres de plus petit indice ; arrêts : celles de plus grand indice
+            libres = eligibles & ~marche[:, i]
+            demarres = libres & (np.cumsum(libres, axis=1) <= (n - en_marche)[:, None])
+            arretables = marche[:, i] & ~verrou
+            arretes = arretables & (np.cumsum(arretables[:, ::-1], axis=1)[:, ::-1] <= (en_marche - n)[:, None])
+            marche[:, i] = (marche[:, i] | demarres) & ~arretes
+            demarre[:, i][demarres] = h
+            arrete[:, i][arretes] = h
+
+            demarrages[:, i] += demarres.sum(axis=1)
+            unites_engagees[:, i, h] = n
+            reste = reste - n * capacite_unite[i]
+
+        # --- Répartition : minimum technique de chaque unité en marche, puis merit order ---
+        capacite = unites_engagees[:, :, h] * capacite_unite
+        minimum = capacite * fraction_min
+        somme_minimum = np.zeros(nb_mix)
+        for i in range(nb_sources):
+            somme_minimum = somme_minimum + minimum[:, i]
+        reste = demande_residuelle[:, h] - somme_minimum
+        for i in range(nb_sources):
+            complement = np.minimum(capacite[:, i] - minimum[:, i], np.maximum(0.0, reste))
+            production[:, i, h] = minimum[:, i] + complement
+            reste = reste - complement
+
+    return production, unites_engagees, demarrages
+
+
+def _engager_mix(
+    nb_unites, demande_residuelle, capacite_unite, fraction_min, min_marche, min_arret,
+    production, unites_engagees, demarrages,
+):
+    """engager_lot pour un seul mix, unité par unité (corps du noyau compilé)."""
+    nb_sources = nb_unites.shape[0]
+    nb_heures = demande_residuelle.shape[0]
+    nb_max = max(1, nb_unites.max())
+    marche = np.zeros((nb_sources, nb_max), dtype=np.bool_)
+    demarre = np.full((nb_sources, nb_max), _JAMAIS, dtype=np.int64)
+    arrete = np.full((nb_sources, nb_max), _JAMAIS, dtype=np.int64)
+    capacite = np.zeros(nb_sources)
+    minimum = np.zeros(nb_sources)
+
+    for h in range(nb_heures):
+        reste = max(0.0, demande_residuelle[h])
+
+        # --- Engagement : juste assez d'unités, par coût croissant ---
+        for i in range(nb_sources):
+            verrou = eligibles = en_marche = 0
+            for u in range(nb_unites[i]):
+                if marche[i, u]:
+                    en_marche += 1
+                    if h - demarre[i, u] < min_marche[i]:
+                        verrou += 1
+                if h - arrete[i, u] >= min_arret[i]:
+                    eligibles += 1
+
+            besoin = math.ceil(reste / capacite_unite[i]) if reste > 0 else 0
+            n = min(max(besoin, verrou), eligibles)
+            if n > en_marche:
+                a_demarrer = n - en_marche
+                for u in range(nb_unites[i]):
+                    if a_demarrer == 0:
+                        break
+                    if not marche[i, u] and h - arrete[i, u] >= min_arret[i]:
+                        marche[i, u] = True
+                        demarre[i, u] = h
+                        a_demarrer -= 1
+                demarrages[i] += n - en_marche
+            elif n < en_marche:
+                a_arreter = en_marche - n
+                for u in range(nb_unites[i] - 1, -1, -1):
+                    if a_arreter == 0:
+                        break
+                    if marche[i, u] and h - demarre[i, u] >= min_marche[i]:
+                        marche[i, u] = False
+                        arrete[i, u] = h
+                        a_arreter -= 1
+            unites_engagees[i, h] = n
+            reste -= n * capacite_unite[i]
+
+        # --- Répartition : minimum technique de chaque unité en marche, puis merit order ---
+        somme_minimum = 0.0
+        for i in range(nb_sources):
+            capacite[i] = unites_engagees[i, h] * capacite_unite[i]
+            minimum[i] = capacite[i] * fraction_min[i]
+            somme_minimum += minimum[i]
+        reste = demande_residuelle[h] - somme_minimum
+        for i in range(nb_sources):
+            complement = min(capacite[i] - minimum[i], max(0.0, reste))
+            production[i, h] = minimum[i] + complement
+            reste -= complement
+
+
+def _engager_parallele(nb_unites, demande_residuelle, capacite_unite, fraction_min, min_marche, min_arret):
+    """engager_lot compilé : un mix par itération de prange (corps du noyau parallèle)."""
+    nb_mix, nb_sources = nb_unites.shape
+    nb_heures = demande_residuelle.shape[1]
+    production = np.zeros((nb_mix, nb_sources, nb_heures))
+    unites_engagees = np.zeros((nb_mix, nb_sources, nb_heures), dtype=np.int64)
+    demarrages = np.zeros((nb_mix, nb_sources), dtype=np.int64)
+    for m in numba.prange(nb_mix):
+        _engager_mix_natif(
+            nb_unites[m], demande_residuelle[m], capacite_unite, fraction_min, min_marche, min_arret,
+            production[m], unites_engagees[m], demarrages[m],
+        )
+    return production, unites_engagees, demarrages
+
+
+# Version compilée de _engager_mix, appelée par le noyau parallèle (affectée par _noyaux)
+_engager_mix_natif = None
+
+
+def _noyaux() -> dict:
+    """
+    Noyaux compilés {"mix": séquentiel, un mix ; "lot": parallèle, N mix}, chargés au
+    premier appel. Le noyau parallèle n'est compilé (ou chargé) qu'au premier lot.
+    """
+    global _engager_mix_natif
+    with _VERROU_NOYAUX:
+        if "mix" not in _NOYAUX:
+            _engager_mix_natif = _NOYAUX["mix"] = numba.njit(
+                "void(int64[::1], float64[::1], float64[::1], float64[::1], int64[::1], int64[::1],"
+                " float64[:, ::1], int64[:, ::1], int64[::1])",
+                cache=True,
+            )(_engager_mix)
+        return _NOYAUX
+
+
+def _noyau_lot():
+    """Noyau parallèle de engager_lot, compilé (ou chargé du cache) au premier lot."""
+    noyaux = _noyaux()
+    with _VERROU_NOYAUX:
+        if "lot" not in noyaux:
+            noyaux["lot"] = numba.njit(
+                "Tuple((float64[:, :, ::1], int64[:, :, ::1], int64[:, ::1]))"
+                "(int64[:, ::1], float64[:, ::1], float64[::1], float64[::1], int64[::1], int64[::1])",
+                parallel=True, cache=True,
+            )(_engager_parallele)
+        return noyaux["lot"]
+
+
+def compiler_noyaux() -> None:
+    """
+    Compile les noyaux (ou les charge du cache disque) sans attendre un premier appel :
+    à lancer à la construction de l'image, jamais dans un processus qui forke ensuite.
+    Sans effet sans Numba.
+    """
+    if NUMBA_DISPONIBLE:
+        _noyau_lot()
@@ -0,0 +1,278 @@
+"""
+Partage de configurations — encodage compact d'un mix dans l'URL
+et magasin serveur de configurations nommées.
+
+Un mix est un vecteur d'unités (ordre ORDRE_MERIT). Chaque nombre d'unités
+est codé sur juste assez de bits pour le max_unites du niveau (un code se lit
+donc avec le scénario de son lien), le tout précédé d'un numéro de version,
+puis encodé en base64url sans remplissage :
+    {"nucleaire": 20, "hydraulique": 10, "eolien": 10, "solaire": 20,
+     "charbon": 0, "gaz": 40, "petrole": 5}  →  "oRQFBYBSAA" (10 caractères)
+Version 1 : les sources seules. Version 2 : suivies des unités de pilotage de
+la demande (FLEXIBILITE) — utilisée seulement s'il y en a, un mix sans
+pilotage garde donc le même code.
+
+Paramètres d'URL reconnus :
+    ?m=<code>   mix encodé
+    ?o=<option> option de simulation d'un lien ?m= (répété, voir OPTIONS_SIMULATION)
+    ?c=<nom>    configuration nommée enregistrée dans le magasin (mix, niveau et options)
+    ?s=<id>     scénario (niveau), voir scenarios.py
+    ?lang=en    langue de l'interface (lue côté client)
+"""
+
+import base64
+import json
+import os
+import tempfile
+import threading
+from urllib.parse import parse_qs, quote, urlencode
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou entre threads seulement
+    fcntl = None
+
+from data import ORDRE_MERIT, OPTIONS_SIMULATION, FLEXIBILITE
+from scenarios import SCENARIO_DEFAUT, Scenario, charger_scenario, lister_scenarios
+
+
+# =============================================================================
+# Encodage bit à bit du vecteur d'unités
+# =============================================================================
+
+_BITS_VERSION = 3
+_VERSIONS = (1, 2)
+
+
+def _champs(version: int, scenario: Scenario) -> list[tuple[str, int]]:
+    """Champs codés par une version : (identifiant, max_unites du niveau), chacun sur juste assez de bits."""
+    champs = [(s, int(scenario.moyens[s]["max_unites"])) for s in ORDRE_MERIT]
+    if version == 2:
+        champs.append((FLEXIBILITE, int(scenario.flexibilite["max_unites"])))
+    return champs
+
+
+def _nb_octets(champs: list[tuple[str, int]]) -> int:
+    return (_BITS_VERSION + sum(maximum.bit_length() for _, maximum in champs) + 7) // 8
+
+
+def encoder_mix(choix_joueur: dict, scenario: "str | Scenario | None" = None) -> str:
+    """
+    Encode un choix_joueur (et ses unités de pilotage de la demande) en chaîne base64url compacte,
+    avec les max_unites du scénario (celui du lien : decoder_mix doit recevoir le même).
+    """
+    scenario = charger_scenario(scenario)
+    version = 2 if choix_joueur.get(FLEXIBILITE) else 1
+    champs = _champs(version, scenario)
+    entier = version
+    decalage = _BITS_VERSION
+    for champ, maximum in champs:
+        nb = int(choix_joueur.get(champ, 0) or 0)
+        if not 0 <= nb <= maximum:
+            raise ValueError(f"Nombre d'unités hors limites pour {champ} : {nb}")
+        entier |= nb << decalage
+        decalage += maximum.bit_length()
+    octets = entier.to_bytes(_nb_octets(champs), "little")
+    return base64.urlsafe_b64encode(octets).rstrip(b"=").decode("ascii")
+
+
+def decoder_mix(code: str, scenario: "str | Scenario | None" = None) -> dict:
+    """
+    Décode une chaîne produite par encoder_mix pour le même scénario.
+
+    Raises:
+        ValueError si le code est mal formé, d'une autre version ou hors limites.
+    """
+    try:
+        octets = base64.urlsafe_b64decode(code + "=" * (-len(code) % 4))
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"Code de mix invalide : {code!r}") from exc
+
+    entier = int.from_bytes(octets, "little")
+    version = entier & ((1 << _BITS_VERSION) - 1)
+    if version not in _VERSIONS:
+        raise ValueError(f"Version de code de mix non supportée : {code!r}")
+    champs = _champs(version, charger_scenario(scenario))
+    if len(octets) != _nb_octets(champs):
+        raise ValueError(f"Code de mix invalide : {code!r}")
+
+    choix_joueur = {}
+    decalage = _BITS_VERSION
+    for champ, maximum in champs:
+        largeur = maximum.bit_length()
+        nb = (entier >> decalage) & ((1 << largeur) - 1)
+        if nb > maximum:
+            raise ValueError(f"Nombre d'unités hors limites pour {champ} : {nb}")
+        choix_joueur[champ] = nb
+        decalage += largeur
+    if entier >> decalage:
+        raise ValueError(f"Code de mix invalide : {code!r}")
+    choix_joueur.setdefault(FLEXIBILITE, 0)
+    return choix_joueur
+
+
+# =============================================================================
+# Magasin de configurations nommées
+# =============================================================================
+
+class NomPris(ValueError):
+    """Une configuration porte déjà ce nom."""
+
+
+class MagasinConfigurations:
+    """
+    Configurations nommées, persistées dans un fichier JSON :
+        {nom: {"mix": code_mix, "scenario": id, "options": [option, ...]}}
+    Le code du mix est relatif au scénario enregistré avec lui. Une entrée réduite
+    à un code (fichier édité à la main) vaut pour le scénario par défaut, sans option.
+
+    Le fichier est relu quand il a changé sur disque : les enseignants peuvent
+    l'éditer à la main, et les workers gunicorn voient les enregistrements des autres.
+    Un enregistrement relit et réécrit le fichier sous un verrou fcntl (entre workers) :
+    deux enregistrements simultanés ne s'écrasent pas.
+    """
+
+    def __init__(self, chemin: str):
+        self.chemin = chemin
+        self._verrou = threading.Lock()
+        self._configurations: dict[str, dict] = {}
+        self._mtime: int | None = None
+
+    def _recharger(self, forcer: bool = False) -> None:
+        """Relit le fichier s'il a été modifié depuis la dernière lecture (ou toujours si forcer)."""
+        try:
+            mtime = os.stat(self.chemin).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime and not forcer:
+            return
+        with open(self.chemin, encoding="utf-8") as f:
+            brutes = json.load(f)
+        self._configurations = {nom: _normaliser(entree) for nom, entree in brutes.items()}
+        self._mtime = mtime
+
+    def lister(self) -> dict:
+        """Retourne toutes les configurations {nom: {"mix", "scenario", "options"}}."""
+        with self._verrou:
+            self._recharger()
+            return {nom: dict(entree) for nom, entree in self._configurations.items()}
+
+    def charger(self, nom: str) -> tuple[dict, str, tuple] | None:
+        """
+        Retourne la configuration enregistrée sous ce nom, (choix_joueur, scenario_id, options),
+        ou None si elle n'existe pas.
+
+        Raises:
+            ValueError si son code de mix est invalide pour son scénario.
+        """
+        with self._verrou:
+            self._recharger()
+            entree = self._configurations.get(nom)
+        if entree is None:
+            return None
+        return decoder_mix(entree["mix"], entree["scenario"]), entree["scenario"], entree["options"]
+
+    def enregistrer(
+        self,
+        nom: str,
+        choix_joueur: dict,
+        scenario: str = SCENARIO_DEFAUT,
+        options: tuple = (),
+    ) -> str:
+        """
+        Enregistre une nouvelle configuration (mix, niveau et options) ; retourne le code du mix.
+
+        Raises:
+            ValueError si le nom est vide ou le scénario inconnu ;
+            NomPris si une configuration porte déjà ce nom (jamais remplacée).
+        """
+        nom = nom.strip()
+        if not nom:
+            raise ValueError("Le nom de la configuration est vide")
+        if scenario not in lister_scenarios():
+            raise ValueError(f"Scénario inconnu : {scenario}")
+        entree = {"mix": encoder_mix(choix_joueur, scenario), "scenario": scenario, "options": _options(options)}
+        dossier = os.path.dirname(os.path.abspath(self.chemin))
+        with self._verrou, open(f"{self.chemin}.lock", "a") as verrou:
+            if fcntl is not None:
+                fcntl.flock(verrou, fcntl.LOCK_EX)
+            # Relu sous le verrou : un autre worker a pu enregistrer depuis la dernière lecture
+            self._recharger(forcer=True)
+            if nom in self._configurations:
+                raise NomPris(nom)
+            brutes = {**self._configurations, nom: entree}
+            # Écriture atomique : un lecteur ne voit jamais un fichier à moitié écrit
+            descripteur, temporaire = tempfile.mkstemp(prefix=".configurations-", suffix=".tmp", dir=dossier)
+            try:
+                with os.fdopen(descripteur, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {nom: {**e, "options": list(e["options"])} for nom, e in brutes.items()},
+                        f, ensure_ascii=False, indent=2,
+                    )
+                os.replace(temporaire, self.chemin)
+            except BaseException:
+                os.unlink(temporaire)
+                raise
+            self._configurations = brutes
+            self._mtime = os.stat(self.chemin).st_mtime_ns
+        return entree["mix"]
+
+
+def _options(options) -> tuple:
+    """Options reconnues, en tuple trié (même forme que components.sidebar.lire_options)."""
+    return tuple(sorted(set(options or ()) & set(OPTIONS_SIMULATION)))
+
+
+def _normaliser(entree) -> dict:
+    """Entrée du fichier → {"mix", "scenario", "options"} (un code seul : scénario par défaut)."""
+    if isinstance(entree, str):
+        return {"mix": entree, "scenario": SCENARIO_DEFAUT, "options": ()}
+    return {
+        "mix": entree["mix"],
+        "scenario": entree.get("scenario", SCENARIO_DEFAUT),
+        "options": _options(entree.get("options")),
+    }
+
+
+MAGASIN = MagasinConfigurations(os.environ.get("GRID_GAME_CONFIGURATIONS", "configurations.json"))
+
+
+# =============================================================================
+# Lecture de l'URL
+# =============================================================================
+
+def lire_url(search: str | None) -> tuple[dict | None, str | None, tuple | None]:
+    """
+    Lit la query string d'un lien partagé : (choix_joueur, scenario_id, options),
+    None pour ce que l'URL n'impose pas. ?c=<nom> impose le mix, le niveau et les
+    options enregistrés ; ?m=<code> le mix, lu avec le niveau de ?s= (ou celui par défaut),
+    et les options de ?o= (aucune si absent). Un code invalide ou un nom inconnu n'impose rien.
+    """
+    parametres = parse_qs((search or "").lstrip("?"))
+    scenario = parametres.get("s", [None])[0]
+    scenario = scenario if scenario in lister_scenarios() else None
+    try:
+        if "m" in parametres:
+            return decoder_mix(parametres["m"][0], scenario), scenario, _options(parametres.get("o"))
+        if "c" in parametres:
+            configuration = MAGASIN.charger(parametres["c"][0])
+            if configuration is not None and configuration[1] in lister_scenarios():
+                return configuration
+    except ValueError:
+        pass
+    return None, scenario, None
+
+
+def construire_lien(
+    choix_joueur: dict,
+    lang: str = "fr",
+    scenario: str = SCENARIO_DEFAUT,
+    options: tuple = (),
+) -> str:
+    """Construit la query string de partage d'un mix (et de son scénario et de ses options)."""
+    lien = f"?m={encoder_mix(choix_joueur, scenario)}"
+    if scenario != SCENARIO_DEFAUT:
+        lien += f"&s={quote(scenario)}"
+    if options:
+        lien += "&" + urlencode({"o": list(_options(options))}, doseq=True)
+    return lien if lang == "fr" else f"{lien}&lang={lang}"
@@ -0,0 +1,129 @@
+"""
+Résultat d'un dispatch : colonnes horaires d'un mix, dans un seul tableau.
+
+ResultatDispatch remplace le dict de colonnes (et le DataFrame) que
+consommaient les indicateurs et les graphiques. Les colonnes sont les lignes
+d'un tableau (C, H) contigu, en lecture seule ; les sources viennent en tête
+dans l'ordre ORDRE_MERIT, si bien que resultat.production est une simple vue
+(S, H). Les totaux (énergie de chaque colonne, heures de déficit et de
+surplus) sont calculés au premier accès, d'une seule réduction, puis gardés :
+les indicateurs et les graphiques d'un même résultat ne refont pas les sommes.
+
+Un ResultatDispatch se lit comme le dict d'avant (resultat["gaz"],
+resultat.get("ecretement"), items()...) ; to_frame() reconstruit le DataFrame
+historique de calculer_production_horaire, pour la compatibilité.
+"""
+
+from collections.abc import Mapping
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from data import ORDRE_MERIT
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from scenarios import Scenario
+
+
+class ResultatDispatch(Mapping):
+    """
+    Colonnes horaires d'un dispatch (MW, prix en €/MWh) et leurs totaux mémorisés.
+
+    Colonnes : une par source (ORDRE_MERIT), demande_mw (demande servie),
+    report_demande, production_totale, deficit, surplus, prix, ecretement et
+    ecretement_<source> pour chaque source de scenario.ordre_ecretement.
+    """
+
+    def __init__(self, colonnes: list[str], valeurs: np.ndarray, scenario: "Scenario"):
+        """
+        Args:
+            colonnes: noms des lignes de valeurs ; les sources d'abord, dans l'ordre ORDRE_MERIT
+            valeurs: tableau (C, H) contigu — conservé tel quel et passé en lecture seule
+            scenario: scénario du dispatch (heures et libellés de to_frame)
+        """
+        self._index = {nom: k for k, nom in enumerate(colonnes)}
+        self.valeurs = valeurs
+        self.valeurs.setflags(write=False)
+        self.scenario = scenario
+
+    @classmethod
+    def depuis_colonnes(cls, colonnes: Mapping, scenario: "Scenario") -> "ResultatDispatch":
+        """Résultat à partir d'un mapping {colonne: valeurs (H,)} (dict, DataFrame...), copié."""
+        if isinstance(colonnes, cls):
+            return colonnes
+        noms = [s for s in ORDRE_MERIT if s in colonnes] + [
+            nom for nom in colonnes if nom not in ORDRE_MERIT and nom not in ("heure", "label")
+        ]
+        return cls(noms, np.array([np.asarray(colonnes[nom], dtype=float) for nom in noms]), scenario)
+
+    # -------------------------------------------------------------------------
+    # Lecture comme un dict de colonnes
+    # -------------------------------------------------------------------------
+
+    def __getitem__(self, nom: str) -> np.ndarray:
+        return self.valeurs[self._index[nom]]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, nom) -> bool:
+        return nom in self._index
+
+    @property
+    def production(self) -> np.ndarray:
+        """Vue (S, H) de la production par source (ordre ORDRE_MERIT)."""
+        return self.valeurs[:len(ORDRE_MERIT)]
+
+    # -------------------------------------------------------------------------
+    # Totaux mémorisés
+    # -------------------------------------------------------------------------
+
+    @cached_property
+    def energies(self) -> dict[str, np.float64]:
+        """Somme de chaque colonne sur l'horizon (MWh pour les puissances), en une réduction."""
+        # Scalaires NumPy, comme les sommes de colonnes d'avant (mêmes arrondis des indicateurs)
+        return dict(zip(self._index, self.valeurs.sum(axis=1)))
+
+    def energie(self, nom: str) -> np.float64:
+        """Somme d'une colonne sur l'horizon (0 pour une colonne absente)."""
+        return self.energies.get(nom, np.float64(0.0))
+
+    @cached_property
+    def energie_reportee(self) -> np.float64:
+        """Consommation déplacée par le pilotage de la demande (MWh, reports positifs)."""
+        return np.maximum(0, self["report_demande"]).sum()
+
+    @cached_property
+    def heures_deficit(self) -> int:
+        """Nombre d'heures avec déficit."""
+        return int((self["deficit"] > 0).sum())
+
+    @cached_property
+    def heures_surplus(self) -> int:
+        """Nombre d'heures avec surplus."""
+        return int((self["surplus"] > 0).sum())
+
+    # -------------------------------------------------------------------------
+    # Compatibilité
+    # -------------------------------------------------------------------------
+
+    def to_frame(self) -> "pd.DataFrame":
+        """
+        DataFrame historique : heure, label, demande_mw, report_demande, une colonne
+        par source du scénario, production_totale, deficit, surplus, prix,
+        ecretement et ecretement_<source>.
+        """
+        import pandas as pd  # import différé : pandas n'est pas nécessaire au jeu lui-même
+
+        ordre = ["demande_mw", "report_demande", *self.scenario.moyens]
+        ordre += [nom for nom in self._index if nom not in ordre]
+        return pd.DataFrame({
+            "heure": self.scenario.heures,
+            "label": self.scenario.labels,
+            **{nom: np.array(self[nom]) for nom in ordre},
+        })
@@ -0,0 +1,309 @@
+"""
+Scénarios de jeu (niveaux) — variantes de la demande, des profils météo et du catalogue.
+
+Le scénario de référence est celui de data.py. Les autres sont décrits par les
+fichiers JSON du dossier scenarios/, qui ne donnent que ce qui change :
+    {
+      "niveau": 1,
+      "nom": {"fr": "Pointe d'hiver", "en": "Winter peak"},
+      "description": {"fr": "...", "en": "..."},
+      "nb_jours": 1,
+      "demande": {"facteur": 1.18},
+      "profil_eolien": {"facteurs_jours": [0.4, 0.1, ...]},
+      "moyens": {"nucleaire": {"disponibilite": 0.45}},
+      "flexibilite": {"part_max": 0.05},
+      "ordre_ecretement": ["eolien", "solaire"],
+      "bareme": {...}
+    }
+"ordre_ecretement" fixe l'ordre d'écrêtement des sources (défaut : par
+cout_ecretement croissant ; une source absente de la liste n'est pas écrêtée).
+"flexibilite" surcharge les paramètres du pilotage de la demande (data.FLEXIBILITE_DEMANDE).
+"bareme" remplace le barème de notation standard (format : voir bareme.py).
+Une série (demande, profil_solaire, profil_eolien) est soit une liste explicite
+de nb_jours × 24 valeurs, soit la journée de référence répétée nb_jours fois,
+multipliée par "facteur" et / ou par "facteurs_jours" (un facteur par jour).
+
+Un fichier n'est lu qu'au premier usage du scénario. Le Scenario construit
+(tableaux NumPy en lecture seule) est mis en cache, et reconstruit si le
+fichier change sur disque : changer de niveau, ou éditer un niveau, ne
+demande ni redémarrage ni ré-import. Les caches en aval (simulation,
+figures) sont indexés par l'objet Scenario, donc invalidés avec lui.
+
+D'autres scénarios peuvent être ajoutés par code avec
+enregistrer_scenario(scenario_id, chargeur), où chargeur() retourne une
+description au même format.
+"""
+
+import copy
+import json
+import os
+import threading
+from typing import Callable
+
+import numpy as np
+
+from data import (
+    MOYENS_PRODUCTION, DEMANDE_HORAIRE, HEURES,
+    PROFIL_SOLAIRE, PROFIL_EOLIEN, ORDRE_MERIT, FLEXIBILITE_DEMANDE,
+)
+
+SCENARIO_DEFAUT = "reference"
+
+_DOSSIER_SCENARIOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+
+
+# =============================================================================
+# Scénario construit
+# =============================================================================
+
+class Scenario:
+    """
+    Données d'un niveau : demande, profils, catalogue, et leur forme vectorielle
+    (ordre ORDRE_MERIT, comme les sliders) utilisée par simulation.py.
+    Tous les tableaux sont en lecture seule : un Scenario est partagé entre requêtes.
+    """
+
+    def __init__(self, scenario_id: str, description: dict):
+        self.id = scenario_id
+        self.niveau = description.get("niveau", 0)
+        self.nom = description.get("nom", {"fr": scenario_id, "en": scenario_id})
+        self.description = description.get("description", {"fr": "", "en": ""})
+
+        # Barème de notation propre au niveau (None : bareme.BAREME_STANDARD)
+        self.bareme = description.get("bareme")
+
+        # --- Horizon : nb_jours journées de 24 heures ---
+        self.nb_jours = int(description.get("nb_jours", 1))
+        self.nb_heures = self.nb_jours * len(HEURES)
+        self.heures = list(range(self.nb_heures))
+        self.labels = (
+            [f"{h:02d}h" for h in HEURES] if self.nb_jours == 1
+            else [f"J{h // 24 + 1} {h % 24:02d}h" for h in self.heures]
+        )
+
+        self.demande = self._serie(description.get("demande"), DEMANDE_HORAIRE)
+        self.profil_solaire = self._serie(description.get("profil_solaire"), PROFIL_SOLAIRE)
+        self.profil_eolien = self._serie(description.get("profil_eolien"), PROFIL_EOLIEN)
+
+        # --- Catalogue : MOYENS_PRODUCTION surchargé paramètre par paramètre ---
+        self.moyens = copy.deepcopy(MOYENS_PRODUCTION)
+        for source_id, parametres in description.get("moyens", {}).items():
+            if source_id not in self.moyens:
+                raise ValueError(f"Source inconnue dans le scénario {scenario_id} : {source_id}")
+            self.moyens[source_id].update(parametres)
+
+        # --- Pilotage de la demande (voir flexibilite.py) ---
+        self.flexibilite = {**FLEXIBILITE_DEMANDE, **description.get("flexibilite", {})}
+
+        # --- Catalogue sous forme vectorielle ---
+        self.puissance = np.array([self.moyens[s]["puissance"] for s in ORDRE_MERIT], dtype=float)
+        self.cout_production = np.array([self.moyens[s]["cout_production"] for s in ORDRE_MERIT], dtype=float)
+        self.cout_construction = np.array([self.moyens[s]["cout_construction"] for s in ORDRE_MERIT], dtype=float)
+        self.co2 = np.array([self.moyens[s]["co2"] for s in ORDRE_MERIT], dtype=float)
+        # Indemnité d'écrêtement (€/MWh) ; 0 pour les sources non écrêtables
+        self.cout_ecretement = np.array(
+            [self.moyens[s].get("cout_ecretement", 0) for s in ORDRE_MERIT], dtype=float,
+        )
+
+        # Construction amortie sur la durée de vie (M€ / an / unité)
+        self.amortissement_annuel = np.array([
+            self.moyens[s]["cout_construction"] / self.moyens[s].get("duree_vie", 30)
+            for s in ORDRE_MERIT
+        ])
+
+        # Construction amortie sur la durée de vie, ramenée à l'horizon (M€ / unité)
+        self.amortissement_horizon = np.array([
+            self.moyens[s]["cout_construction"] / self.moyens[s].get("duree_vie", 30) / 365 * self.nb_jours
+            for s in ORDRE_MERIT
+        ])
+
+        # Sources triées par coût marginal croissant (pile de merit order pour le prix)
+        self.ordre_couts = np.argsort(self.cout_production, kind="stable")
+        self.couts_tries = self.cout_production[self.ordre_couts]
+
+        # Facteur de charge horaire par source (S × H) :
+        #   - solaire / éolien : profil météo
+        #   - autres : taux de disponibilité constant
+        self.facteurs = np.array([
+            self.profil_solaire if s == "solaire"
+            else self.profil_eolien if s == "eolien"
+            else np.full(self.nb_heures, self.moyens[s]["disponibilite"])
+            for s in ORDRE_MERIT
+        ])
+
+        # Indices des sources de chaque passe du dispatch, triés par coût de production croissant
+        par_cout = sorted(ORDRE_MERIT, key=lambda s: self.moyens[s]["cout_production"])
+        self.ordre_non_pilotables = [ORDRE_MERIT.index(s) for s in par_cout if not self.moyens[s]["pilotable"]]
+        self.ordre_pilotables = [ORDRE_MERIT.index(s) for s in par_cout if self.moyens[s]["pilotable"]]
+
+        # Indices des sources écrêtables, dans l'ordre où l'excédent les écrête (option « écrêtement »)
+        ordre_ecretement = description.get("ordre_ecretement")
+        if ordre_ecretement is None:
+            ordre_ecretement = sorted(
+                (s for s in ORDRE_MERIT if "cout_ecretement" in self.moyens[s]),
+                key=lambda s: self.moyens[s]["cout_ecretement"],
+            )
+        for source_id in ordre_ecretement:
+            if source_id not in self.moyens or self.moyens[source_id]["pilotable"]:
+                raise ValueError(f"Source non écrêtable dans le scénario {scenario_id} : {source_id}")
+        self.ordre_ecretement = [ORDRE_MERIT.index(s) for s in ordre_ecretement]
+
+        for tableau in (
+            self.demande, self.profil_solaire, self.profil_eolien, self.puissance,
+            self.cout_production, self.cout_construction, self.co2, self.cout_ecretement,
+            self.amortissement_annuel, self.amortissement_horizon, self.ordre_couts,
+            self.couts_tries, self.facteurs,
+        ):
+            tableau.setflags(write=False)
+
+    def _serie(self, surcharge, reference: np.ndarray) -> np.ndarray:
+        """Série horaire sur l'horizon : liste explicite, ou journée de référence répétée et mise à l'échelle."""
+        if isinstance(surcharge, list):
+            serie = np.array(surcharge, dtype=float)
+            if len(serie) != self.nb_heures:
+                raise ValueError(
+                    f"Scénario {self.id} : {len(serie)} valeurs horaires pour un horizon de {self.nb_heures} h"
+                )
+            return serie
+
+        surcharge = surcharge or {}
+        serie = np.tile(reference, self.nb_jours).astype(float)
+        if "facteurs_jours" in surcharge:
+            facteurs = np.asarray(surcharge["facteurs_jours"], dtype=float)
+            if len(facteurs) != self.nb_jours:
+                raise ValueError(f"Scénario {self.id} : {len(facteurs)} facteurs pour {self.nb_jours} jours")
+            serie = serie * np.repeat(facteurs, len(reference))
+        if "facteur" in surcharge:
+            serie = serie * surcharge["facteur"]
+        return serie
+
+    def nom_affiche(self, lang: str = "fr") -> str:
+        """Nom du scénario dans la langue demandée."""
+        return self.nom.get(lang, self.nom.get("fr", self.id))
+
+    def description_affichee(self, lang: str = "fr") -> str:
+        """Description du scénario dans la langue demandée."""
+        return self.description.get(lang, self.description.get("fr", ""))
+
+    def __repr__(self) -> str:
+        return f"Scenario({self.id!r})"
+
+
+# =============================================================================
+# Registre
+# =============================================================================
+
+# scenario_id → (chargeur, chemin du fichier ou None)
+_REGISTRE: dict[str, tuple[Callable[[], dict], str | None]] = {}
+
+# scenario_id → (date de modification du fichier, description brute, Scenario ou None)
+_CHARGES: dict[str, tuple] = {}
+_VERROU = threading.Lock()
+
+# Incrémenté à chaque (re)chargement ou enregistrement d'un scénario
+_VERSION = 0
+
+
+def enregistrer_scenario(scenario_id: str, chargeur: Callable[[], dict], chemin: str | None = None) -> None:
+    """
+    Ajoute (ou remplace) un scénario au registre.
+
+    Args:
+        scenario_id: identifiant (paramètre d'URL ?s=, clé des caches)
+        chargeur: fonction sans argument retournant la description du scénario
+        chemin: fichier source éventuel — le scénario est rechargé quand il change
+    """
+    global _VERSION
+    with _VERROU:
+        _REGISTRE[scenario_id] = (chargeur, chemin)
+        _CHARGES.pop(scenario_id, None)
+        _VERSION += 1
+
+
+def _lire_json(chemin: str) -> dict:
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _decouvrir_fichiers() -> None:
+    """Enregistre les fichiers JSON du dossier scenarios/ (sans les lire)."""
+    if not os.path.isdir(_DOSSIER_SCENARIOS):
+        return
+    for fichier in sorted(os.listdir(_DOSSIER_SCENARIOS)):
+        scenario_id, extension = os.path.splitext(fichier)
+        chemin = os.path.join(_DOSSIER_SCENARIOS, fichier)
+        if extension == ".json" and scenario_id not in _REGISTRE:
+            _REGISTRE[scenario_id] = (lambda chemin=chemin: _lire_json(chemin), chemin)
+
+
+def _entree(scenario_id: str) -> tuple:
+    """Entrée du cache d'un scénario, relue si son fichier a changé. Appelée sous _VERROU."""
+    global _VERSION
+    if scenario_id not in _REGISTRE:
+        _decouvrir_fichiers()
+    if scenario_id not in _REGISTRE:
+        raise ValueError(f"Scénario inconnu : {scenario_id!r}")
+
+    chargeur, chemin = _REGISTRE[scenario_id]
+    try:
+        mtime = os.path.getmtime(chemin) if chemin else None
+    except OSError as exc:
+        raise ValueError(f"Scénario introuvable : {scenario_id!r}") from exc
+    entree = _CHARGES.get(scenario_id)
+    if entree is None or entree[0] != mtime:
+        entree = (mtime, chargeur(), None)
+        _CHARGES[scenario_id] = entree
+        _VERSION += 1
+    return entree
+
+
+def decrire_scenario(scenario_id: str) -> dict:
+    """Description brute d'un scénario (niveau, nom, description...), sans construire ses tableaux."""
+    with _VERROU:
+        return _entree(scenario_id)[1]
+
+
+def charger_scenario(scenario: "str | Scenario | None" = None) -> Scenario:
+    """
+    Retourne le Scenario construit (mis en cache) pour un identifiant.
+
+    Accepte aussi un Scenario (retourné tel quel) ou None (scénario par défaut).
+
+    Raises:
+        ValueError si le scénario n'existe pas ou si sa description est invalide.
+    """
+    if isinstance(scenario, Scenario):
+        return scenario
+    scenario_id = scenario or SCENARIO_DEFAUT
+    with _VERROU:
+        mtime, description, construit = _entree(scenario_id)
+        if construit is None:
+            construit = Scenario(scenario_id, description)
+            _CHARGES[scenario_id] = (mtime, description, construit)
+        return construit
+
+
+def lister_scenarios() -> list[str]:
+    """Identifiants de tous les scénarios, triés par niveau."""
+    with _VERROU:
+        _decouvrir_fichiers()
+        identifiants = [s for s, (_, chemin) in _REGISTRE.items() if chemin is None or os.path.exists(chemin)]
+    return sorted(identifiants, key=lambda s: (decrire_scenario(s).get("niveau", 0), s))
+
+
+def version_scenarios() -> int:
+    """
+    Numéro de version du registre : change dès qu'un scénario est (re)chargé ou
+    enregistré. Appeler après lister_scenarios() pour tenir compte des fichiers modifiés.
+    """
+    return _VERSION
+
+
+enregistrer_scenario(SCENARIO_DEFAUT, lambda: {
+    "niveau": 0,
+    "nom": {"fr": "Journée type", "en": "Typical day"},
+    "description": {
+        "fr": "Une journée type de la France métropolitaine.",
+        "en": "A typical day in metropolitan France.",
+    },
+})
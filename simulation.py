@@ -1,211 +1,1083 @@
 """
 Moteur de simulation du réseau électrique.
 Dispatch de la production selon le merit order, calcul des coûts et émissions.
+
+Toutes les fonctions prennent un scénario (identifiant, Scenario, ou None pour
+le scénario par défaut) : demande, profils et catalogue viennent de là
+(voir scenarios.py). L'horizon est de scenario.nb_heures heures (H).
 """
 
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 import numpy as np
-import pandas as pd
-from data import (
-    MOYENS_PRODUCTION, DEMANDE_HORAIRE, HEURES, LABELS_HEURES,
-    PROFIL_SOLAIRE, PROFIL_EOLIEN, ORDRE_MERIT
-)
+from data import ORDRE_MERIT, PRIX_PLAFOND, FLEXIBILITE
+
+from bareme import compiler_bareme
+from engagement import engager_unites, engager_unites_lot
+from fiabilite import evaluer_fiabilite
+from flexibilite import calculer_report
+from lots import ecart_demande, planifier_blocs, type_stockage
+from resultat import ResultatDispatch
+from scenarios import Scenario, SCENARIO_DEFAUT, charger_scenario
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _vecteur_unites(choix_joueur: dict) -> np.ndarray:
+    """Convertit choix_joueur en vecteur d'unités (ordre ORDRE_MERIT)."""
+    return np.array([max(0, choix_joueur.get(s, 0) or 0) for s in ORDRE_MERIT], dtype=float)
+
+
+def _passe_non_pilotables(
+    unites: np.ndarray,
+    scenario: Scenario,
+    flexibilite=None,
+    ecretement: bool = False,
+    dtype=np.float64,
+    demande: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray | None, np.ndarray | None]:
+    """
+    Passe 1 du dispatch : les sources non-pilotables produisent tout ce qu'elles peuvent.
+    Avec flexibilite (unités de pilotage de la demande), la charge nette qui reste
+    aux sources pilotables est ensuite aplatie par le report de consommation.
+    Avec ecretement, l'excédent qui reste est enfin écrêté, source par source
+    dans l'ordre scenario.ordre_ecretement ; le reste est l'excédent must-run.
+    Les tableaux de travail sont stockés en dtype (voir lots.py). demande remplace
+    scenario.demande : (H,), ou (..., H) pour une demande par mix (voir trajectoire.py).
+
+    Returns:
+        (capacite, production, demande_restante, report, ecretees) — (..., S, H),
+        (..., S, H), (..., H), (..., H) ou None sans pilotage de la demande,
+        et (..., S, H) (MW écrêtés par source) ou None sans écrêtement
+    """
+    demande = scenario.demande if demande is None else demande
+    capacite = np.multiply((unites * scenario.puissance)[..., :, None], scenario.facteurs, dtype=dtype)
+    production = np.zeros_like(capacite)
+    demande_restante = np.broadcast_to(demande, capacite.shape[:-2] + demande.shape[-1:]).astype(dtype)
+
+    for i in scenario.ordre_non_pilotables:
+        production[..., i, :] = capacite[..., i, :]
+        demande_restante -= capacite[..., i, :]
+
+    report = None
+    if flexibilite is not None and np.any(np.asarray(flexibilite) > 0):
+        report = calculer_report(demande_restante, flexibilite, scenario, demande)
+        demande_restante += report
 
+    ecretees = None
+    if ecretement:
+        ecretees = np.zeros_like(production)
+        excedent = np.maximum(0, -demande_restante)
+        for i in scenario.ordre_ecretement:
+            ecretees[..., i, :] = np.minimum(production[..., i, :], excedent)
+            production[..., i, :] -= ecretees[..., i, :]
+            excedent -= ecretees[..., i, :]
+        demande_restante = np.where(demande_restante < 0, -excedent, demande_restante)
 
-def calculer_production_horaire(choix_joueur: dict) -> pd.DataFrame:
+    return capacite, production, demande_restante, report, ecretees
+
+
+def calculer_demande_lot(
+    unites: np.ndarray,
+    flexibilite=None,
+    scenario: "str | Scenario | None" = None,
+    demande: np.ndarray | None = None,
+) -> np.ndarray:
     """
-    Calcule la production horaire de chaque source sur 24h.
+    Demande servie après report de consommation (pilotage de la demande, voir flexibilite.py).
 
     Args:
-        choix_joueur: dict {type_source: nombre_unites, ...}
-                      ex: {"nucleaire": 2, "solaire": 5, "eolien": 3}
+        unites: tableau (..., S) du nombre d'unités par source (ordre ORDRE_MERIT)
+        flexibilite: unités de pilotage de la demande — scalaire ou tableau (...) ; None : aucune
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        demande: demande (H,) ou (..., H) à la place de scenario.demande
 
     Returns:
-        DataFrame avec colonnes : heure, label, demande_mw,
-        + une colonne par source active (MW produits),
-        + production_totale, deficit, surplus
+        tableau (..., H) (MW) — la demande (diffusée) sans pilotage de la demande
+    """
+    scenario = charger_scenario(scenario)
+    unites = np.asarray(unites, dtype=float)
+    base = scenario.demande if demande is None else np.asarray(demande, dtype=float)
+    demande = np.broadcast_to(base, unites.shape[:-1] + base.shape[-1:])
+    if flexibilite is None or not np.any(np.asarray(flexibilite) > 0):
+        return demande
+    report = _passe_non_pilotables(unites, scenario, flexibilite, demande=base)[3]
+    return demande + report
+
+
+def calculer_production_lot(
+    unites: np.ndarray,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+    ecretement: bool = False,
+) -> np.ndarray:
     """
-    df = pd.DataFrame({
-        "heure": HEURES,
-        "label": LABELS_HEURES,
-        "demande_mw": DEMANDE_HORAIRE.copy(),
-    })
+    Dispatch vectorisé : une ou plusieurs combinaisons d'unités à la fois.
 
-    # Calculer la capacité disponible par source et par heure
-    # Dispatch en 2 passes :
-    #   1. Sources NON-pilotables (nucléaire, solaire, éolien) : produisent tout ce qu'elles peuvent
-    #   2. Sources pilotables (hydro, gaz, charbon, pétrole) : comblent le gap restant (merit order)
+    Args:
+        unites: tableau (..., S) du nombre d'unités par source (ordre ORDRE_MERIT)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: unités de pilotage de la demande — scalaire ou tableau (...) ;
+                     la production couvre alors calculer_demande_lot(unites, flexibilite)
+        ecretement: écrête l'excédent des sources écrêtables (option « écrêtement »)
 
-    sources_actives = {k: v for k, v in choix_joueur.items() if v > 0}
+    Returns:
+        tableau (..., S, H) de la production horaire (MW) par source
+    """
+    return _dispatch_lot(np.asarray(unites, dtype=float), charger_scenario(scenario), flexibilite, ecretement)[0]
+
+
+def calculer_production_ecretement(
+    unites: np.ndarray,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Dispatch vectorisé avec écrêtement : la production, et ce que l'écrêtement
+    a retiré à chaque source, issus de la même passe.
 
-    # Séparer pilotables et non-pilotables
-    sources_non_pilotables = sorted(
-        [s for s in sources_actives if not MOYENS_PRODUCTION[s]["pilotable"]],
-        key=lambda s: MOYENS_PRODUCTION[s]["cout_production"]
+    Args:
+        unites: tableau (..., S) du nombre d'unités par source (ordre ORDRE_MERIT)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: unités de pilotage de la demande — scalaire ou tableau (...)
+
+    Returns:
+        (production, ecretees) — tableaux (..., S, H) en MW ; ecretees est nul
+        hors des sources de scenario.ordre_ecretement
+    """
+    production, _, ecretees = _dispatch_lot(
+        np.asarray(unites, dtype=float), charger_scenario(scenario), flexibilite, True,
     )
-    sources_pilotables = sorted(
-        [s for s in sources_actives if MOYENS_PRODUCTION[s]["pilotable"]],
-        key=lambda s: MOYENS_PRODUCTION[s]["cout_production"]
+    return production, ecretees
+
+
+def _dispatch_lot(
+    unites: np.ndarray,
+    scenario: Scenario,
+    flexibilite=None,
+    ecretement: bool = False,
+    dtype=np.float64,
+    demande: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """Production (..., S, H), demande servie (..., H) et MW écrêtés (..., S, H) ou None — voir calculer_production_lot."""
+    # Passe 1 : sources non-pilotables — produisent tout ce qu'elles peuvent
+    # (puis report de consommation vers les creux de charge nette, et écrêtement de l'excédent)
+    capacite, production, demande_restante, report, ecretees = _passe_non_pilotables(
+        unites, scenario, flexibilite, ecretement, dtype, demande,
     )
 
-    # Initialiser les colonnes de production
-    for source in MOYENS_PRODUCTION:
-        df[source] = 0.0
+    # Passe 2 : sources pilotables — comblent le gap (merit order par coût croissant)
+    for i in scenario.ordre_pilotables:
+        production[..., i, :] = np.minimum(capacite[..., i, :], np.maximum(0, demande_restante))
+        demande_restante -= production[..., i, :]
+
+    demande = scenario.demande if demande is None else demande
+    demande = np.broadcast_to(demande, unites.shape[:-1] + demande.shape[-1:])
+    return production, (demande if report is None else demande + report), ecretees
+
+
+def calculer_production_engagement(
+    unites: np.ndarray,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+    ecretement: bool = False,
+    precision: str = "float64",
+    demande: np.ndarray | None = None,
+) -> tuple[np.ndarray, dict]:
+    """
+    Dispatch en mode « engagement des unités » : la passe 2 engage les unités
+    pilotables une à une (voir engagement.py) au lieu d'un bloc continu.
+
+    Args:
+        unites: tableau (S,) du nombre d'unités par source (ordre ORDRE_MERIT),
+                ou (..., S) pour un lot de mix (engager_unites_lot)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: unités de pilotage de la demande — scalaire ou tableau (...) ; None : aucune
+        ecretement: écrête l'excédent des sources non-pilotables (option « écrêtement »)
+        precision: précision de stockage de la production (lots.PRECISIONS)
+        demande: demande (H,) ou (..., H) à la place de scenario.demande
+
+    Returns:
+        (production (..., S, H), résultat de engager_unites) ; avec ecretement, le
+        résultat contient aussi "ecretees" (..., S, H), les MW écrêtés par source
+    """
+    scenario = charger_scenario(scenario)
+    unites = np.asarray(unites, dtype=float)
+    _, production, demande_restante, _, ecretees = _passe_non_pilotables(
+        unites, scenario, flexibilite, ecretement, type_stockage(precision), demande,
+    )
+
+    sources = [ORDRE_MERIT[i] for i in scenario.ordre_pilotables]
+    if unites.ndim == 1:
+        engagement = engager_unites(
+            sources, [int(unites[i]) for i in scenario.ordre_pilotables], demande_restante, scenario.moyens,
+        )
+    else:
+        engagement = engager_unites_lot(
+            sources, unites[..., scenario.ordre_pilotables].astype(np.int64), demande_restante, scenario.moyens,
+        )
+    production[..., scenario.ordre_pilotables, :] = engagement["production"]
+    if ecretees is not None:
+        engagement["ecretees"] = ecretees
+    return production, engagement
+
+
+def calculer_prix_lot(
+    production: np.ndarray,
+    scenario: "str | Scenario | None" = None,
+    demande: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Prix marginal de marché horaire : coût marginal de la dernière source appelée,
+    ou PRIX_PLAFOND pendant les heures de déficit.
+
+    Args:
+        production: tableau (..., S, H) issu de calculer_production_lot
+        scenario: le scénario du dispatch (défaut : SCENARIO_DEFAUT)
+        demande: demande servie (..., H), voir calculer_demande_lot (défaut : scenario.demande)
+
+    Returns:
+        tableau (..., H) du prix (€/MWh)
+    """
+    scenario = charger_scenario(scenario)
+    if demande is None:
+        demande = scenario.demande
+    # Production cumulée le long de la pile triée par coût marginal croissant :
+    # la dernière source appelée est la première où le cumul atteint la production
+    # totale (searchsorted côté gauche, vectorisé sur les heures et les mix)
+    cumul = np.cumsum(production[..., scenario.ordre_couts, :], axis=-2)
+    rang = (cumul < cumul[..., -1:, :]).sum(axis=-2)
+    prix = scenario.couts_tries[rang]
+
+    # Prix plafond aux seules heures de déficit réel (pas sur un résidu d'arrondi, voir lots.ecart_demande)
+    return np.where(ecart_demande(demande, production.sum(axis=-2)) > 0, PRIX_PLAFOND, prix)
+
+
+def calculer_marche_lot(
+    unites: np.ndarray,
+    production: np.ndarray | None = None,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+) -> dict:
+    """
+    Prix horaire, revenus et profits par source pour une ou plusieurs combinaisons.
+
+    Args:
+        unites: tableau (..., S) du nombre d'unités par source (ordre ORDRE_MERIT)
+        production: dispatch déjà calculé (..., S, H) ; recalculé s'il est absent
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: unités de pilotage de la demande — scalaire ou tableau (...)
+
+    Returns:
+        dict : prix (..., H) en €/MWh ; revenus, couts_production, profits (..., S) en M€.
+        Le profit déduit le coût de production et la construction amortie sur l'horizon.
+    """
+    scenario = charger_scenario(scenario)
+    unites = np.asarray(unites, dtype=float)
+    if production is None:
+        production, demande, _ = _dispatch_lot(unites, scenario, flexibilite)
+    else:
+        demande = calculer_demande_lot(unites, flexibilite, scenario)
+
+    prix = calculer_prix_lot(production, scenario, demande)
+    revenus = (production * prix[..., None, :]).sum(axis=-1) / 1e6
+    couts_production = production.sum(axis=-1) * scenario.cout_production / 1e6
+    profits = revenus - couts_production - unites * scenario.amortissement_horizon
+    return {
+        "prix": prix,
+        "revenus": revenus,
+        "couts_production": couts_production,
+        "profits": profits,
+    }
+
+
+def calculer_mesures_lot(
+    unites: np.ndarray,
+    production: np.ndarray | None = None,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+    ecretement: bool = False,
+    engagement: bool = False,
+    precision: str | None = None,
+    budget: int | None = None,
+    demande: np.ndarray | None = None,
+) -> dict:
+    """
+    Mesures du barème (bareme.MESURES) pour une ou plusieurs combinaisons.
+
+    Mêmes formules que calculer_indicateurs, vectorisées : noter un lot de mix
+    revient à bareme.noter(calculer_mesures_lot(unites)). Un lot dont la
+    mémoire de travail dépasse le budget est calculé par blocs de mix
+    (lots.planifier_blocs) : le résultat est le même.
+
+    Args:
+        unites: tableau (..., S) du nombre d'unités par source (ordre ORDRE_MERIT)
+        production: dispatch déjà calculé (..., S, H) ; recalculé s'il est absent
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: unités de pilotage de la demande — scalaire ou tableau (...)
+        ecretement: option « écrêtement » (production doit alors avoir été calculée avec)
+        engagement: option « engagement des unités » (calculer_production_engagement, par lot)
+        precision: stockage du dispatch, "float64" ou "float32" (défaut : GRID_GAME_PRECISION) ;
+                   les sommes sont toujours accumulées en float64
+        budget: mémoire de travail maximale (octets, défaut : GRID_GAME_MEMOIRE_LOT)
+        demande: demande (H,), ou (..., H) une par mix, à la place de scenario.demande
+
+    Returns:
+        dict {mesure: tableau (...)}
+    """
+    scenario = charger_scenario(scenario)
+    unites = np.asarray(unites, dtype=float)
+    dtype = type_stockage(precision)
+    forme = unites.shape[:-1]
+    blocs = planifier_blocs(
+        int(np.prod(forme)), _octets_par_mix(scenario, dtype, flexibilite, ecretement, engagement), budget,
+    )
+    if demande is not None:
+        demande = np.asarray(demande, dtype=float)
+    if len(blocs) == 1:
+        return _mesures_bloc(unites, production, scenario, flexibilite, ecretement, engagement, dtype, demande)
+
+    # Lot trop gros : mix à plat, un bloc après l'autre
+    unites = unites.reshape(-1, len(ORDRE_MERIT))
+    if flexibilite is not None:
+        flexibilite = np.broadcast_to(np.asarray(flexibilite, dtype=float), forme).reshape(-1)
+    if production is not None:
+        production = production.reshape(len(unites), len(ORDRE_MERIT), -1)
+    if demande is not None and demande.ndim > 1:
+        demande = np.broadcast_to(demande, forme + demande.shape[-1:]).reshape(len(unites), -1)
+    mesures_blocs = [
+        _mesures_bloc(
+            unites[bloc], None if production is None else production[bloc], scenario,
+            None if flexibilite is None else flexibilite[bloc], ecretement, engagement, dtype,
+            demande if demande is None or demande.ndim == 1 else demande[bloc],
+        )
+        for bloc in blocs
+    ]
+    return {
+        nom: np.concatenate([mesures[nom] for mesures in mesures_blocs]).reshape(forme)
+        for nom in mesures_blocs[0]
+    }
+
+
+def _octets_par_mix(scenario: Scenario, dtype, flexibilite, ecretement: bool, engagement: bool) -> int:
+    """Mémoire de travail d'un mix dans calculer_mesures_lot (octets, estimation haute)."""
+    nb_heures, nb_sources = scenario.nb_heures, len(ORDRE_MERIT)
+    # Stockage : capacité, production, écrêtement (S, H) ; demande restante et temporaires (H)
+    octets = (nb_sources * (3 if ecretement else 2) + 3) * nb_heures * np.dtype(dtype).itemsize
+    # Accumulation en float64 : production totale, demande servie, écarts (H)
+    octets += 4 * nb_heures * 8
+    if flexibilite is not None:
+        # remplir_creux : seuils, ordre, pentes et sommes sur 2 × 24 points par jour
+        octets += 12 * nb_heures * 8
+    if engagement:
+        # engager_lot : production et unités engagées (P, H), et leur copie dans la production
+        octets += 3 * len(scenario.ordre_pilotables) * nb_heures * 8
+    return octets
+
+
+def _mesures_bloc(
+    unites: np.ndarray,
+    production: np.ndarray | None,
+    scenario: Scenario,
+    flexibilite,
+    ecretement: bool,
+    engagement: bool,
+    dtype,
+    demande_base: np.ndarray | None = None,
+) -> dict:
+    """calculer_mesures_lot pour un lot qui tient dans le budget mémoire."""
+    if production is None and engagement:
+        production, resultat = calculer_production_engagement(
+            unites, scenario, flexibilite, ecretement, np.dtype(dtype).name, demande_base,
+        )
+        demande = calculer_demande_lot(unites, flexibilite, scenario, demande_base)
+        ecretees = resultat.get("ecretees")
+    elif production is None:
+        production, demande, ecretees = _dispatch_lot(unites, scenario, flexibilite, ecretement, dtype, demande_base)
+    else:
+        demande = calculer_demande_lot(unites, flexibilite, scenario, demande_base)
+        ecretees = (
+            _passe_non_pilotables(unites, scenario, flexibilite, True, dtype, demande_base)[4] if ecretement else None
+        )
+
+    # Sommes accumulées en float64, quel que soit le stockage
+    energie_source = production.sum(axis=-1, dtype=np.float64)  # (..., S) MWh
+    totale = production.sum(axis=-2, dtype=np.float64)  # (..., H)
+    # Même tolérance quelle que soit la précision de stockage (lots.ecart_demande)
+    ecart = ecart_demande(demande, totale)
+    deficit = np.maximum(0, ecart)
+    surplus = np.maximum(0, -ecart)
+    return _mesures(
+        unites, scenario, flexibilite,
+        energie_source=energie_source,
+        energie_produite=totale.sum(axis=-1),
+        energie_deficit=deficit.sum(axis=-1),
+        energie_surplus=surplus.sum(axis=-1),
+        heures_deficit=(deficit > 0).sum(axis=-1),
+        ecretees=None if ecretees is None else ecretees.sum(axis=-1, dtype=np.float64),
+        demande=demande_base,
+    )
+
+
+def _mesures(
+    unites: np.ndarray,
+    scenario: Scenario,
+    flexibilite,
+    energie_source: np.ndarray,
+    energie_produite: np.ndarray,
+    energie_deficit: np.ndarray,
+    energie_surplus: np.ndarray,
+    heures_deficit: np.ndarray,
+    ecretees: np.ndarray | None,
+    demande: np.ndarray | None = None,
+) -> dict:
+    """
+    Mesures du barème à partir des bilans d'énergie d'un lot de mix (voir calculer_mesures_lot).
+
+    Args:
+        energie_source, ecretees: (..., S) MWh produits et écrêtés par source (ecretees : None sans écrêtement)
+        energie_produite, energie_deficit, energie_surplus, heures_deficit: (...) sur l'horizon
+        demande: demande (H,) ou (..., H) du lot (défaut : scenario.demande)
+    """
+    energie_demandee = (scenario.demande if demande is None else demande).sum(axis=-1)
+    cout_production = energie_source @ scenario.cout_production / 1e6  # M€
+    co2_total = energie_source @ scenario.co2 * 1000 / 1e6  # tCO₂
+    cout_construction = unites @ scenario.cout_construction
+    if ecretees is not None:
+        # Indemnités d'écrêtement : comptées avec les coûts de production (coût total, LCOE)
+        cout_production = cout_production + ecretees @ scenario.cout_ecretement / 1e6
+        energie_ecretee = ecretees.sum(axis=-1)
+    else:
+        energie_ecretee = np.zeros(unites.shape[:-1])
+    cout_amorti_annuel = unites @ scenario.amortissement_annuel + cout_production * 365 / scenario.nb_jours
+    if flexibilite is not None:
+        parametres = scenario.flexibilite
+        cout_construction = cout_construction + np.asarray(flexibilite) * parametres["cout_construction"]
+        cout_amorti_annuel = cout_amorti_annuel + (
+            np.asarray(flexibilite) * parametres["cout_construction"] / parametres["duree_vie"]
+        )
+    energie_annuelle = np.maximum(1, energie_produite * 365 / scenario.nb_jours)
+
+    return {
+        "taux_couverture": (energie_demandee - energie_deficit) / energie_demandee * 100,
+        "part_co2_evitee": 1 - co2_total / (energie_demandee * 820 * 1000 / 1e6),
+        "lcoe": cout_amorti_annuel * 1e6 / energie_annuelle,
+        "ratio_surplus": _ratio(energie_surplus, energie_demandee),
+        "ratio_ecretement": _ratio(energie_ecretee, energie_demandee),
+        "heures_deficit": heures_deficit,
+        "co2_total": co2_total,
+        "cout_total": cout_construction + cout_production,
+    }
+
+
+def _ratio(energie: np.ndarray, energie_demandee) -> np.ndarray:
+    """Part de la demande (0 là où la demande est nulle)."""
+    return np.divide(
+        energie, energie_demandee, out=np.zeros(np.broadcast_shapes(np.shape(energie), np.shape(energie_demandee))),
+        where=np.asarray(energie_demandee) > 0,
+    )
+
+
+# Éléments (lignes × colonnes × heures) d'un bloc de calculer_mesures_grille
+_ELEMENTS_BLOC_GRILLE = 1 << 18
+
+
+def calculer_mesures_grille(
+    unites: np.ndarray,
+    source_x: str,
+    source_y: str,
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+    ecretement: bool = False,
+) -> dict:
+    """
+    Mesures du barème sur une grille : deux sources parcourent toute leur plage
+    (0 à max_unites), les autres gardent leur nombre d'unités.
+
+    Chaque étage de la pile du dispatch ne dépend que des sources empilées
+    avant lui : les étages qui précèdent les deux sources sont calculés une
+    fois, ceux entre les deux une fois par colonne, seuls les suivants sur
+    toute la grille, par blocs de lignes. Mêmes valeurs que
+    calculer_mesures_lot sur les mix de la grille.
+
+    Args:
+        unites: tableau (S,) du nombre d'unités par source (ordre ORDRE_MERIT) ;
+                celles de source_x et source_y sont ignorées
+        source_x, source_y: sources des colonnes et des lignes (distinctes)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: unités de pilotage de la demande (scalaire)
+        ecretement: option « écrêtement »
+
+    Returns:
+        dict {mesure: tableau (lignes, colonnes)} — ligne j, colonne i : j unités
+        de source_y et i unités de source_x
+    """
+    scenario = charger_scenario(scenario)
+    ix, iy = ORDRE_MERIT.index(source_x), ORDRE_MERIT.index(source_y)
+    if ix == iy:
+        raise ValueError("calculer_mesures_grille : deux sources distinctes sont nécessaires")
+    valeurs_x = np.arange(scenario.moyens[source_x]["max_unites"] + 1, dtype=float)
+    valeurs_y = np.arange(scenario.moyens[source_y]["max_unites"] + 1, dtype=float)
+    unites = np.array(unites, dtype=float)
+    unites[[ix, iy]] = 0
+    grille = np.broadcast_to(unites, (len(valeurs_y), len(valeurs_x), len(unites))).copy()
+    grille[..., ix] = valeurs_x
+    grille[..., iy] = valeurs_y[:, None]
+    if flexibilite is not None and not np.any(np.asarray(flexibilite) > 0):
+        flexibilite = None
+
+    capacite = (unites * scenario.puissance)[:, None] * scenario.facteurs  # (S, H)
+    capacite_x = (valeurs_x * scenario.puissance[ix])[None, :, None] * scenario.facteurs[ix]  # (1, X, H)
+    nb_lignes = max(1, _ELEMENTS_BLOC_GRILLE // (len(valeurs_x) * scenario.nb_heures))
+
+    mesures = []
+    for debut in range(0, len(valeurs_y), nb_lignes):
+        lignes = valeurs_y[debut:debut + nb_lignes]
+        capacite_y = (lignes * scenario.puissance[iy])[:, None, None] * scenario.facteurs[iy]  # (Y, 1, H)
+        # Chaque étage garde la forme de ce dont il dépend : (H,), (1, X, H) ou (Y, X, H)
+        etages = [capacite_x if i == ix else capacite_y if i == iy else capacite[i] for i in range(len(ORDRE_MERIT))]
+
+        # Passe 1 : mêmes opérations que _passe_non_pilotables
+        residu = scenario.demande
+        for i in scenario.ordre_non_pilotables:
+            residu = residu - etages[i]
+        demande = scenario.demande
+        if flexibilite is not None:
+            report = calculer_report(residu, flexibilite, scenario)
+            residu = residu + report
+            demande = demande + report
+        ecretees = None
+        if ecretement:
+            ecretees = np.zeros(len(ORDRE_MERIT))
+            excedent = np.maximum(0, -residu)
+            for i in scenario.ordre_ecretement:
+                ecretee = np.minimum(etages[i], excedent)
+                etages[i] = etages[i] - ecretee
+                excedent = excedent - ecretee
+                ecretees = ecretees + (np.arange(len(ORDRE_MERIT)) == i) * ecretee.sum(axis=-1)[..., None]
+            residu = np.where(residu < 0, -excedent, residu)
+
+        # Passe 2 : sources pilotables
+        for i in scenario.ordre_pilotables:
+            etages[i] = np.minimum(etages[i], np.maximum(0, residu))
+            residu = residu - etages[i]
+
+        # Bilans d'énergie ; production totale sommée dans l'ordre ORDRE_MERIT, comme calculer_mesures_lot
+        forme = (len(lignes), len(valeurs_x))
+        energie = np.stack([np.broadcast_to(etage.sum(axis=-1), forme) for etage in etages], axis=-1)
+        totale = np.zeros(forme + (scenario.nb_heures,))
+        for etage in etages:
+            totale += etage
+        ecart = ecart_demande(demande, totale)
+        mesures.append(_mesures(
+            grille[debut:debut + nb_lignes], scenario, flexibilite,
+            energie_source=energie,
+            energie_produite=totale.sum(axis=-1),
+            energie_deficit=np.maximum(0, ecart).sum(axis=-1),
+            energie_surplus=np.maximum(0, -ecart).sum(axis=-1),
+            heures_deficit=(ecart > 0).sum(axis=-1),
+            ecretees=None if ecretees is None else np.broadcast_to(ecretees, energie.shape),
+        ))
+    return {nom: np.concatenate([bloc[nom] for bloc in mesures]) for nom in mesures[0]}
+
+
+def calculer_dispatch(
+    choix_joueur: dict,
+    options: tuple = (),
+    scenario: "str | Scenario | None" = None,
+) -> ResultatDispatch:
+    """
+    Calcule la production horaire de chaque source sur l'horizon, sans pandas.
+
+    Args:
+        choix_joueur: dict {type_source: nombre_unites, ...}, et éventuellement
+                      FLEXIBILITE : nombre d'unités de pilotage de la demande
+        options: options de simulation (OPTIONS_SIMULATION), ex : ("engagement",)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+
+    Returns:
+        ResultatDispatch (lu comme un dict de tableaux NumPy de H valeurs) :
+        demande_mw (demande servie, après report), report_demande (MW reportés,
+        positif : consommation ajoutée), une entrée par source (MW produits),
+        production_totale, deficit, surplus, prix (prix marginal de marché,
+        €/MWh), ecretement (MW écrêtés, toutes sources) et ecretement_<source>
+        pour chaque source de scenario.ordre_ecretement (nuls sans l'option « écrêtement »)
+    """
+    scenario = charger_scenario(scenario)
+    flexibilite = max(0, choix_joueur.get(FLEXIBILITE, 0) or 0) or None
+    production, demande, ecretees = calculer_dispatch_lot(_vecteur_unites(choix_joueur), options, scenario, flexibilite)
+    return _colonnes_dispatch(production, scenario, demande, ecretees)
+
+
+def calculer_dispatch_lot(
+    unites: np.ndarray,
+    options: tuple = (),
+    scenario: "str | Scenario | None" = None,
+    flexibilite=None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """
+    Dispatch d'un ou plusieurs mix avec les options de simulation : le chemin de
+    calculer_dispatch (et donc de l'interface), pour un lot (export.py).
 
-    # Pour chaque heure, dispatcher la production
-    for h in range(24):
-        demande_restante = DEMANDE_HORAIRE[h]
+    Args:
+        unites: tableau (..., S) du nombre d'unités par source (ordre ORDRE_MERIT)
+        options: options de simulation (OPTIONS_SIMULATION) ; « pannes » ne change
+                 pas le dispatch (indicateurs de fiabilité seulement)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        flexibilite: unités de pilotage de la demande — scalaire ou tableau (...) ; None : aucune
+
+    Returns:
+        (production (..., S, H), demande servie (..., H), MW écrêtés (..., S, H) ou None
+        sans l'option « écrêtement »)
+    """
+    scenario = charger_scenario(scenario)
+    unites = np.asarray(unites, dtype=float)
+    ecretement = "ecretement" in options
+    if "engagement" in options:
+        production, engagement = calculer_production_engagement(unites, scenario, flexibilite, ecretement)
+        return production, calculer_demande_lot(unites, flexibilite, scenario), engagement.get("ecretees")
+    return _dispatch_lot(unites, scenario, flexibilite, ecretement)
 
-        # Passe 1 : sources non-pilotables — produisent tout ce qu'elles peuvent
-        for source in sources_non_pilotables:
-            info = MOYENS_PRODUCTION[source]
-            nb_unites = sources_actives[source]
-            capacite_nominale = nb_unites * info["puissance"]
 
-            # Appliquer le facteur de disponibilité selon la source
-            if source == "solaire":
-                facteur = PROFIL_SOLAIRE[h]
-            elif source == "eolien":
-                facteur = PROFIL_EOLIEN[h]
-            else:
-                # Nucléaire : production constante à son taux de disponibilité
-                facteur = info["disponibilite"]
+def _colonnes_dispatch(
+    production: np.ndarray,
+    scenario: Scenario,
+    demande: np.ndarray | None = None,
+    ecretees: np.ndarray | None = None,
+) -> ResultatDispatch:
+    """Résultat de calculer_dispatch à partir de la production (S, H), de la demande servie et des MW écrêtés (S, H)."""
+    if demande is None:
+        demande = scenario.demande
+    nb_sources = len(ORDRE_MERIT)
+    colonnes = [
+        *ORDRE_MERIT, "demande_mw", "report_demande", "production_totale", "deficit", "surplus", "prix",
+        "ecretement", *[f"ecretement_{ORDRE_MERIT[i]}" for i in scenario.ordre_ecretement],
+    ]
+    # Toutes les colonnes dans un seul tableau (C, H), sources en tête
+    valeurs = np.empty((len(colonnes), production.shape[-1]))
+    valeurs[:nb_sources] = production
+    valeurs[nb_sources] = demande
+    valeurs[nb_sources + 1] = demande - scenario.demande
+    totale = valeurs[nb_sources + 2]
+    totale[:] = production.sum(axis=0)
+    ecart = ecart_demande(demande, totale)
+    valeurs[nb_sources + 3] = np.maximum(0, ecart)
+    valeurs[nb_sources + 4] = np.maximum(0, -ecart)
+    valeurs[nb_sources + 5] = calculer_prix_lot(production, scenario, demande)
+    if ecretees is None:
+        valeurs[nb_sources + 6:] = 0
+    else:
+        valeurs[nb_sources + 6] = ecretees.sum(axis=0)
+        valeurs[nb_sources + 7:] = ecretees[scenario.ordre_ecretement]
+    return ResultatDispatch(colonnes, valeurs, scenario)
 
-            production = capacite_nominale * facteur
-            df.at[h, source] = production
-            demande_restante -= production
 
-        # Passe 2 : sources pilotables — comblent le gap (merit order par coût croissant)
-        for source in sources_pilotables:
-            info = MOYENS_PRODUCTION[source]
-            nb_unites = sources_actives[source]
-            capacite_nominale = nb_unites * info["puissance"]
-            capacite_disponible = capacite_nominale * info["disponibilite"]
+def _sequence_dispatch(scenario: Scenario) -> list:
+    """Indices des sources dans l'ordre où le dispatch les empile (passe 1 puis passe 2)."""
+    return scenario.ordre_non_pilotables + scenario.ordre_pilotables
 
-            # Ne produire que ce qui est encore nécessaire
-            production = min(capacite_disponible, max(0, demande_restante))
-            df.at[h, source] = production
-            demande_restante -= production
 
-    # Calcul des totaux
-    colonnes_production = [s for s in MOYENS_PRODUCTION if s in df.columns]
-    df["production_totale"] = df[colonnes_production].sum(axis=1)
-    df["deficit"] = np.maximum(0, df["demande_mw"] - df["production_totale"])
-    df["surplus"] = np.maximum(0, df["production_totale"] - df["demande_mw"])
+def _empiler(
+    etat: dict,
+    debut: int,
+    scenario: Scenario,
+    residus_precedents: list | None = None,
+) -> None:
+    """
+    Rejoue la pile du dispatch à partir de la position debut (mêmes opérations,
+    dans le même ordre, que calculer_production_lot : résultat identique au bit près).
 
-    return df
+    Avec residus_precedents (la pile avant modification), s'arrête dès que la
+    demande restante redevient identique : la suite de la pile est inchangée.
+    Les lignes ne sont jamais modifiées en place, seulement remplacées : un
+    état dérivé partage les lignes inchangées de l'état d'origine.
+    """
+    capacite, production, residus = etat["capacite"], etat["production"], etat["residus"]
+    sequence = _sequence_dispatch(scenario)
+    nb_non_pilotables = len(scenario.ordre_non_pilotables)
+    for k in range(debut, len(sequence)):
+        i = sequence[k]
+        if k < nb_non_pilotables:
+            production[i] = capacite[i]
+        else:
+            production[i] = np.minimum(capacite[i], np.maximum(0, residus[k]))
+        residus[k + 1] = residus[k] - production[i]
+        if residus_precedents is not None and np.array_equal(residus[k + 1], residus_precedents[k + 1]):
+            return
 
 
-def calculer_indicateurs(choix_joueur: dict, df_production: pd.DataFrame) -> dict:
+def calculer_etat_dispatch(unites: np.ndarray, scenario: "str | Scenario | None" = None) -> dict:
+    """
+    Dispatch d'un mix, avec la pile intermédiaire qui permet de le modifier source par source.
+
+    Args:
+        unites: tableau (S,) du nombre d'unités par source (ordre ORDRE_MERIT)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+
+    Returns:
+        dict avec unites (S,), et des listes de lignes (H,) : capacite et
+        production par source (ordre ORDRE_MERIT), residus (S + 1 lignes) :
+        la demande restante avant chaque étage de la pile
+    """
+    scenario = charger_scenario(scenario)
+    unites = np.asarray(unites, dtype=float)
+    etat = {
+        "unites": unites.copy(),
+        "capacite": list((unites * scenario.puissance)[:, None] * scenario.facteurs),
+        "production": [None] * len(ORDRE_MERIT),
+        "residus": [scenario.demande] + [None] * len(ORDRE_MERIT),
+    }
+    _empiler(etat, 0, scenario)
+    return etat
+
+
+def modifier_source(
+    etat: dict,
+    source: str,
+    delta: int,
+    scenario: "str | Scenario | None" = None,
+) -> dict:
+    """
+    Dispatch incrémental : ajoute delta unités (négatif pour en retirer) à une source.
+
+    Les étages de la pile situés avant la source sont repris tels quels ; seuls
+    la source et les étages suivants sont rejoués, jusqu'à ce que la demande
+    restante redevienne celle d'avant. Le résultat est identique au bit près à
+    calculer_etat_dispatch sur le nouveau mix.
+
+    Args:
+        etat: résultat de calculer_etat_dispatch ou de modifier_source (non modifié)
+        source: identifiant de la source (ORDRE_MERIT)
+        delta: variation du nombre d'unités (le total est ramené à 0 au minimum)
+        scenario: le scénario de etat (défaut : SCENARIO_DEFAUT)
+
+    Returns:
+        nouvel état, au même format (lignes inchangées partagées avec etat)
+    """
+    scenario = charger_scenario(scenario)
+    i = ORDRE_MERIT.index(source)
+    nouveau = {
+        "unites": etat["unites"].copy(),
+        "capacite": list(etat["capacite"]),
+        "production": list(etat["production"]),
+        "residus": list(etat["residus"]),
+    }
+    nouveau["unites"][i] = max(0.0, etat["unites"][i] + delta)
+    nouveau["capacite"][i] = (nouveau["unites"][i] * scenario.puissance[i]) * scenario.facteurs[i]
+    _empiler(nouveau, _sequence_dispatch(scenario).index(i), scenario, etat["residus"])
+    return nouveau
+
+
+def dispatch_depuis_etat(etat: dict, scenario: "str | Scenario | None" = None) -> ResultatDispatch:
+    """Résultat de calculer_dispatch (colonnes horaires et prix) pour un état de dispatch."""
+    return _colonnes_dispatch(np.array(etat["production"]), charger_scenario(scenario))
+
+
+def ecarts_indicateurs(avant: dict, apres: dict) -> dict:
+    """
+    Variation des indicateurs numériques entre deux résultats de calculer_indicateurs
+    (ex : avant / après modifier_source) — {indicateur: apres - avant}.
+    """
+    return {
+        cle: np.asarray(apres[cle] - avant[cle]).item()
+        for cle, valeur in apres.items()
+        if isinstance(valeur, (int, float, np.number)) and not isinstance(valeur, bool) and cle in avant
+    }
+
+
+def simuler(
+    unites: tuple,
+    options: tuple = (),
+    scenario: str = SCENARIO_DEFAUT,
+    flexibilite: int = 0,
+) -> tuple[ResultatDispatch, dict]:
+    """
+    Dispatch + indicateurs d'un mix, mis en cache.
+
+    Args:
+        unites: tuple du nombre d'unités par source (ordre ORDRE_MERIT, comme les sliders)
+        options: tuple trié d'options de simulation (OPTIONS_SIMULATION)
+        scenario: identifiant du scénario
+        flexibilite: nombre d'unités de pilotage de la demande
+
+    Returns:
+        (dispatch, indicateurs) — partagés entre appelants : ne pas les modifier.
+        Avec l'option « pannes », indicateurs["fiabilite"] contient LOLE / EENS
+        (evaluer_fiabilite, graine fixe : le résultat est reproductible).
+    """
+    # Le cache est indexé par l'objet Scenario : un niveau modifié sur disque
+    # est reconstruit par charger_scenario, et ses anciens résultats ne sont plus atteints
+    return _simuler(tuple(unites), tuple(options), charger_scenario(scenario), int(flexibilite or 0))
+
+
+# Derniers états de dispatch calculés par simuler : (unites, scenario) → état.
+# Un mix qui ne diffère d'un mix récent que par une source (un slider déplacé)
+# est obtenu par modifier_source plutôt que par un dispatch complet.
+_ETATS_RECENTS: OrderedDict = OrderedDict()
+_NB_ETATS_RECENTS = 64
+_VERROU_ETATS = threading.Lock()
+
+
+def _etat_dispatch(unites: tuple, scenario: Scenario) -> dict:
+    """État de dispatch d'un mix, dérivé si possible d'un mix récent voisin."""
+    with _VERROU_ETATS:
+        voisin = next(
+            (
+                (cle[0], etat) for cle, etat in reversed(_ETATS_RECENTS.items())
+                if cle[1] is scenario and sum(a != b for a, b in zip(cle[0], unites)) == 1
+            ),
+            None,
+        )
+    if voisin is None:
+        etat = calculer_etat_dispatch(_vecteur_unites(dict(zip(ORDRE_MERIT, unites))), scenario)
+    else:
+        unites_voisin, etat_voisin = voisin
+        i = next(i for i, (a, b) in enumerate(zip(unites_voisin, unites)) if a != b)
+        etat = modifier_source(
+            etat_voisin, ORDRE_MERIT[i],
+            max(0, unites[i] or 0) - max(0, unites_voisin[i] or 0), scenario,
+        )
+
+    with _VERROU_ETATS:
+        _ETATS_RECENTS[(unites, scenario)] = etat
+        _ETATS_RECENTS.move_to_end((unites, scenario))
+        while len(_ETATS_RECENTS) > _NB_ETATS_RECENTS:
+            _ETATS_RECENTS.popitem(last=False)
+    return etat
+
+
+@lru_cache(maxsize=4096)
+def _simuler(unites: tuple, options: tuple, scenario: Scenario, flexibilite: int = 0) -> tuple[ResultatDispatch, dict]:
+    choix_joueur = dict(zip(ORDRE_MERIT, unites))
+    if flexibilite:
+        choix_joueur[FLEXIBILITE] = flexibilite
+    # Le dispatch incrémental ne rejoue que la pile des sources : le report de
+    # consommation et l'écrêtement dépendent de toutes les sources non-pilotables,
+    # ils passent par un dispatch complet
+    if "engagement" in options or "ecretement" in options or flexibilite:
+        dispatch = calculer_dispatch(choix_joueur, options, scenario)
+    else:
+        dispatch = dispatch_depuis_etat(_etat_dispatch(unites, scenario), scenario)
+    indicateurs = calculer_indicateurs(choix_joueur, dispatch, scenario)
+    if "pannes" in options:
+        indicateurs["fiabilite"] = evaluer_fiabilite(np.array(unites), scenario, flexibilite or None)
+    return dispatch, indicateurs
+
+
+def carte_scores(
+    unites: tuple,
+    source_x: str,
+    source_y: str,
+    options: tuple = (),
+    scenario: str = SCENARIO_DEFAUT,
+    flexibilite: int = 0,
+) -> dict:
+    """
+    Score et taux de couverture de tous les mix qui ne diffèrent que par deux
+    sources (calculer_mesures_grille), mis en cache.
+
+    Args:
+        unites: tuple du nombre d'unités par source (ordre ORDRE_MERIT) ;
+                celles des deux sources n'entrent pas dans la clé du cache
+        source_x, source_y: sources des colonnes et des lignes
+        options: tuple trié d'options de simulation — seul l'écrêtement change la
+                 carte (engagement : dispatch continu ; pannes : sans effet sur le score)
+        scenario: identifiant du scénario
+        flexibilite: nombre d'unités de pilotage de la demande
+
+    Returns:
+        dict {"score", "couverture"} de tableaux (lignes, colonnes) en lecture
+        seule — ligne j, colonne i : j unités de source_y et i unités de source_x
+    """
+    fixes = list(unites)
+    fixes[ORDRE_MERIT.index(source_x)] = fixes[ORDRE_MERIT.index(source_y)] = 0
+    return _carte_scores(
+        tuple(fixes), source_x, source_y, "ecretement" in options,
+        charger_scenario(scenario), int(flexibilite or 0),
+    )
+
+
+@lru_cache(maxsize=64)
+def _carte_scores(
+    unites: tuple, source_x: str, source_y: str, ecretement: bool, scenario: Scenario, flexibilite: int,
+) -> dict:
+    mesures = calculer_mesures_grille(
+        np.array(unites, dtype=float), source_x, source_y, scenario,
+        flexibilite if flexibilite else None, ecretement,
+    )
+    carte = {
+        "score": compiler_bareme(scenario.bareme).noter(mesures)["score_total"],
+        "couverture": mesures["taux_couverture"],
+    }
+    for valeurs in carte.values():
+        valeurs.setflags(write=False)
+    return carte
+
+
+def calculer_production_horaire(
+    choix_joueur: dict,
+    scenario: "str | Scenario | None" = None,
+    options: tuple = (),
+) -> "pd.DataFrame":
+    """
+    Calcule la production horaire de chaque source sur l'horizon du scénario.
+
+    Dispatch en 2 passes (voir calculer_production_lot) :
+      1. Sources NON-pilotables (nucléaire, solaire, éolien) : produisent tout ce qu'elles peuvent
+         (puis le pilotage de la demande, s'il y en a, reporte la consommation vers les creux,
+         et l'option « écrêtement » écrête l'excédent)
+      2. Sources pilotables (hydro, gaz, charbon, pétrole) : comblent le gap restant (merit order)
+
+    Args:
+        choix_joueur: dict {type_source: nombre_unites, ...}
+                      ex: {"nucleaire": 2, "solaire": 5, "eolien": 3}
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT)
+        options: options de simulation (OPTIONS_SIMULATION), comme calculer_dispatch
+
+    Returns:
+        DataFrame avec colonnes : heure, label, demande_mw (demande servie), report_demande,
+        + une colonne par source active (MW produits),
+        + production_totale, deficit, surplus, prix,
+        + ecretement et ecretement_<source> (MW écrêtés)
+    """
+    return calculer_dispatch(choix_joueur, options, scenario).to_frame()
+
+
+def calculer_indicateurs(
+    choix_joueur: dict,
+    df_production,
+    scenario: "str | Scenario | None" = None,
+) -> dict:
     """
     Calcule les indicateurs globaux de performance.
 
+    df_production est le ResultatDispatch de calculer_dispatch (ses totaux
+    mémorisés servent directement), ou tout mapping des mêmes colonnes (dict,
+    DataFrame de calculer_production_horaire), pour le même scénario.
+
     Returns:
         dict avec coût_construction, coût_production, coût_total,
         co2_total, taux_couverture, energie_totale_produite,
-        energie_totale_demandee, heures_deficit, details_par_source
+        energie_totale_demandee, heures_deficit, nb_heures, prix_moyen, details_par_source
+        (dont revenu et profit de marché par source, en M€), cout_flexibilite et
+        energie_reportee (pilotage de la demande), cout_ecretement et energie_ecretee
+        (option « écrêtement » ; coût compris dans coût_total et LCOE), et le score :
+        scores par critère du barème, score_total, et les mesures non arrondies
+        qui permettent de renoter le résultat (bareme.noter)
     """
-    sources_actives = {k: v for k, v in choix_joueur.items() if v > 0}
+    scenario = charger_scenario(scenario)
+    resultat = ResultatDispatch.depuis_colonnes(df_production, scenario)
+    moyens = scenario.moyens
+    sources_actives = {k: v for k, v in choix_joueur.items() if k in moyens and v > 0}
+    nb_flexibilite = choix_joueur.get(FLEXIBILITE, 0) or 0
 
-    # --- Coût de construction total (M€) ---
+    # --- Coût de construction total (M€), pilotage de la demande compris ---
+    cout_flexibilite = nb_flexibilite * scenario.flexibilite["cout_construction"]
     cout_construction = sum(
-        MOYENS_PRODUCTION[s]["cout_construction"] * n
+        moyens[s]["cout_construction"] * n
         for s, n in sources_actives.items()
-    )
+    ) + cout_flexibilite
 
     # --- Coût de production total (M€) ---
     # Pour chaque source : production en MWh × coût marginal
     cout_production = 0
+    cout_ecretement = 0
     details = {}
     for source in sources_actives:
-        info = MOYENS_PRODUCTION[source]
+        info = moyens[source]
         # Production totale en MWh (chaque pas = 1h, donc MW = MWh)
-        prod_mwh = df_production[source].sum()
+        prod_mwh = resultat.energie(source)
         cout_prod_source = prod_mwh * info["cout_production"] / 1e6  # en M€
         co2_source = prod_mwh * info["co2"] * 1000 / 1e6  # en tonnes CO₂ (gCO₂/kWh → tCO₂)
         cout_production += cout_prod_source
 
+        # Écrêtement (option) : MWh non produits, indemnisés au producteur
+        ecretement_mwh = float(resultat.energie(f"ecretement_{source}"))
+        cout_ecretement += ecretement_mwh * info.get("cout_ecretement", 0) / 1e6  # en M€
+
+        # Marché : chaque MWh est payé au prix marginal de son heure
+        revenu_source = (resultat[source] * resultat["prix"]).sum() / 1e6  # en M€
+        amortissement = (
+            info["cout_construction"] * sources_actives[source] / info.get("duree_vie", 30) / 365
+            * scenario.nb_jours
+        )
+
         details[source] = {
             "nom": info["nom"],
             "nb_unites": sources_actives[source],
             "production_mwh": prod_mwh,
-            "cout_construction": MOYENS_PRODUCTION[source]["cout_construction"] * sources_actives[source],
+            "cout_construction": moyens[source]["cout_construction"] * sources_actives[source],
             "cout_production": cout_prod_source,
             "co2_tonnes": co2_source,
+            "ecretement_mwh": ecretement_mwh,
+            "revenu": revenu_source,
+            "profit": revenu_source - cout_prod_source - amortissement,
         }
 
     # --- CO₂ total (tonnes) ---
     co2_total = sum(d["co2_tonnes"] for d in details.values())
 
     # --- Couverture de la demande ---
-    energie_demandee = df_production["demande_mw"].sum()
-    energie_deficit = df_production["deficit"].sum()
+    energie_demandee = resultat.energie("demande_mw")
+    energie_deficit = resultat.energie("deficit")
     taux_couverture = ((energie_demandee - energie_deficit) / energie_demandee) * 100
 
-    heures_deficit = (df_production["deficit"] > 0).sum()
-    heures_surplus = (df_production["surplus"] > 0).sum()
+    heures_deficit = resultat.heures_deficit
+
+    # --- Prix de marché moyen, pondéré par la demande (€/MWh) ---
+    prix_moyen = (resultat["prix"] * resultat["demande_mw"]).sum() / energie_demandee
+    heures_surplus = resultat.heures_surplus
 
     # --- Coût amorti annuel (LCOE-like) ---
     # On amortit le coût de construction sur la durée de vie de chaque source
     # puis on ajoute le coût de production annualisé
     cout_amorti_annuel = 0  # M€/an
     for source in sources_actives:
-        info = MOYENS_PRODUCTION[source]
+        info = moyens[source]
         nb = sources_actives[source]
         duree_vie = info.get("duree_vie", 30)
         # Construction amortie par an
         cout_amorti_annuel += (nb * info["cout_construction"]) / duree_vie
-    # Production annualisée (coût journalier × 365)
-    cout_amorti_annuel += cout_production * 365
+    cout_amorti_annuel += cout_flexibilite / scenario.flexibilite["duree_vie"]
+    # Production et indemnités d'écrêtement annualisées (coût sur l'horizon × nombre d'horizons par an)
+    cout_amorti_annuel += (cout_production + cout_ecretement) * 365 / scenario.nb_jours
 
     # Énergie annuelle produite (MWh)
-    energie_produite_jour = df_production["production_totale"].sum()
-    energie_annuelle = max(1, energie_produite_jour * 365)
+    energie_produite_horizon = resultat.energie("production_totale")
+    energie_annuelle = max(1, energie_produite_horizon * 365 / scenario.nb_jours)
 
     # LCOE en €/MWh
     lcoe = (cout_amorti_annuel * 1e6) / energie_annuelle
 
-    cout_total = cout_construction + cout_production
-
-    # --- Score composite ---
-    # Score sur 100 basé sur 4 critères :
-    # 1. Couverture (40 pts) : 40 pts si 100%, 0 si < 80%
-    # 2. CO₂ (30 pts) : comparé à un scénario 100% charbon
-    # 3. Coût (30 pts) : basé sur le LCOE (coût amorti par MWh)
-    # 4. Malus surplus : pénalité proportionnelle à la surproduction
+    cout_total = cout_construction + cout_production + cout_ecretement
 
-    # Score couverture
-    if taux_couverture >= 100:
-        score_couverture = 40
-    elif taux_couverture >= 80:
-        score_couverture = 40 * (taux_couverture - 80) / 20
-    else:
-        score_couverture = 0
-
-    # Score CO₂ : référence = tout au charbon
-    co2_reference = energie_demandee * 820 * 1000 / 1e6  # tCO₂
-    if co2_total <= 0:
-        score_co2 = 30
-    else:
-        ratio_co2 = co2_total / co2_reference
-        score_co2 = max(0, 30 * (1 - ratio_co2))
-
-    # Score coût : basé sur le LCOE
-    # Référence = 80 €/MWh (coût moyen scénario 100% gaz avec taxe carbone)
-    # Meilleur LCOE possible ~ 20 €/MWh (nucléaire + hydro)
-    lcoe_reference = 80.0  # €/MWh
-    if lcoe <= 0:
-        score_cout = 30
-    else:
-        score_cout = max(0, 30 * (1 - lcoe / lcoe_reference))
-
-    # Malus surplus : pénalité si surproduction
-    # Ratio surplus = énergie gaspillée / énergie demandée
-    # 0% surplus → malus 0 | 20% surplus → malus -10 | 50%+ surplus → malus -25
-    energie_surplus = df_production["surplus"].sum()
+    energie_surplus = resultat.energie("surplus")
+    energie_reportee = resultat.energie_reportee
+    energie_ecretee = resultat.energie("ecretement")
     ratio_surplus = energie_surplus / energie_demandee if energie_demandee > 0 else 0
-    malus_surplus = min(25, ratio_surplus * 50)  # max -25 pts
+    ratio_ecretement = energie_ecretee / energie_demandee if energie_demandee > 0 else 0
 
-    score_total = round(max(0, score_couverture + score_co2 + score_cout - malus_surplus), 1)
+    # --- Score composite : barème du scénario (voir bareme.py) ---
+    # Référence CO₂ = tout au charbon
+    co2_reference = energie_demandee * 820 * 1000 / 1e6  # tCO₂
+    mesures = {
+        "taux_couverture": float(taux_couverture),
+        "part_co2_evitee": float(1 - co2_total / co2_reference),
+        "lcoe": float(lcoe),
+        "ratio_surplus": float(ratio_surplus),
+        "ratio_ecretement": float(ratio_ecretement),
+        "heures_deficit": int(heures_deficit),
+        "co2_total": float(co2_total),
+        "cout_total": float(cout_total),
+    }
+    bareme = compiler_bareme(scenario.bareme)
+    notation = bareme.noter(mesures)
+    scores = {nom: round(float(points), 1) for nom, points in notation["scores"].items()}
+    score_total = round(float(notation["score_total"]), 1)
 
     return {
         "cout_construction": round(cout_construction, 1),
@@ -215,27 +1087,38 @@ def calculer_indicateurs(choix_joueur: dict, df_production: pd.DataFrame) -> dic
         "co2_total": round(co2_total, 1),
         "taux_couverture": round(taux_couverture, 1),
         "energie_demandee": round(energie_demandee, 1),
-        "energie_produite": round(df_production["production_totale"].sum(), 1),
+        "energie_produite": round(energie_produite_horizon, 1),
         "energie_deficit": round(energie_deficit, 1),
         "energie_surplus": round(energie_surplus, 1),
         "ratio_surplus": round(ratio_surplus * 100, 1),
         "heures_deficit": int(heures_deficit),
+        "nb_heures": scenario.nb_heures,
         "heures_surplus": int(heures_surplus),
-        "score_couverture": round(score_couverture, 1),
-        "score_co2": round(score_co2, 1),
-        "score_cout": round(score_cout, 1),
-        "malus_surplus": round(malus_surplus, 1),
-        "score_total": round(score_total, 1),
+        "prix_moyen": round(prix_moyen, 1),
+        "cout_flexibilite": round(cout_flexibilite, 1),
+        "energie_reportee": round(float(energie_reportee), 1),
+        "cout_ecretement": round(cout_ecretement, 1),
+        "energie_ecretee": round(float(energie_ecretee), 1),
+        # Critères du barème standard, sous leurs noms historiques (malus en points positifs)
+        "score_couverture": scores.get("couverture", 0.0),
+        "score_co2": scores.get("co2", 0.0),
+        "score_cout": scores.get("cout", 0.0),
+        "malus_surplus": -scores.get("surplus", 0.0),
+        "score_total": score_total,
+        "scores": scores,
+        "scores_max": bareme.points_max,
+        "mesures": mesures,
         "details_par_source": details,
     }
 
 
-def get_puissance_installee(choix_joueur: dict) -> dict:
+def get_puissance_installee(choix_joueur: dict, scenario: "str | Scenario | None" = None) -> dict:
     """Retourne la puissance installée par source."""
+    moyens = charger_scenario(scenario).moyens
     result = {}
     for source, nb in choix_joueur.items():
         if nb > 0:
-            info = MOYENS_PRODUCTION[source]
+            info = moyens[source]
             result[source] = {
                 "nom": info["nom"],
                 "puissance_unitaire": info["puissance"],
@@ -0,0 +1,6 @@
+"""Configuration pytest : les modules du jeu sont à la racine du dépôt."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
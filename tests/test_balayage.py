@@ -0,0 +1,34 @@
+"""Balayage de paramètres : population tirée dans le catalogue du niveau, pool de processus."""
+
+import copy
+import csv
+
+import numpy as np
+
+from balayage import executer_balayage, population_mix
+from data import ORDRE_MERIT
+from scenarios import Scenario, decrire_scenario
+
+
+def test_population_bornee_par_le_catalogue_du_niveau():
+    description = copy.deepcopy(decrire_scenario("reference"))
+    description.setdefault("moyens", {}).setdefault("gaz", {})["max_unites"] = 3
+    population = population_mix(2000, graine=1, scenario=Scenario("test", description))
+
+    gaz = ORDRE_MERIT.index("gaz")
+    assert population[:, gaz].max() == 3
+    assert population.min() == 0
+    np.testing.assert_array_equal(population_mix(50, graine=1), population_mix(50, graine=1, scenario="reference"))
+
+
+def test_balayage_termine_et_reprend(tmp_path):
+    definition = {"scenario": "reference", "nb_mix": 40, "parametres": {"moyens.gaz.cout_production": [60, 90]}}
+    chemin = executer_balayage(definition, str(tmp_path), processus=2)
+    with open(chemin, encoding="utf-8") as f:
+        lignes = list(csv.DictReader(f))
+    assert sorted(ligne["moyens.gaz.cout_production"] for ligne in lignes) == ["60", "90"]
+
+    # Relancé sur le même dossier : rien à recalculer
+    assert executer_balayage(definition, str(tmp_path), processus=2) == chemin
+    with open(chemin, encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 2
@@ -0,0 +1,43 @@
+"""Compression HTTP : réponses statiques compressées une fois, jamais périmées."""
+
+import gzip
+
+from flask import Flask, Response
+
+import compression_http
+from compression_http import installer_compression
+
+
+def _application(contenu: dict) -> Flask:
+    server = Flask(__name__)
+    installer_compression(server)
+
+    @server.route("/statique.json")
+    def statique():
+        return Response(contenu["octets"], mimetype="application/json",
+                        headers={"Cache-Control": "public, max-age=86400"})
+
+    return server
+
+
+def test_contenu_modifie_sous_la_meme_url_recompresse():
+    contenu = {"octets": b'{"demande": [' + b"1, " * 2000 + b"1]}"}
+    client = _application(contenu).test_client()
+    entetes = {"Accept-Encoding": "gzip"}
+
+    premiere = client.get("/statique.json", headers=entetes)
+    assert premiere.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(premiere.data) == contenu["octets"]
+
+    contenu["octets"] = b'{"demande": [' + b"2, " * 2000 + b"2]}"
+    seconde = client.get("/statique.json", headers=entetes)
+    assert gzip.decompress(seconde.data) == contenu["octets"]
+
+
+def test_cache_des_statiques_borne():
+    contenu = {}
+    client = _application(contenu).test_client()
+    for numero in range(compression_http._NB_STATIQUES + 20):
+        contenu["octets"] = b'{"version": %d, "x": "' % numero + b"a" * 4000 + b'"}'
+        client.get("/statique.json", headers={"Accept-Encoding": "gzip"})
+    assert len(compression_http._STATIQUES) <= compression_http._NB_STATIQUES
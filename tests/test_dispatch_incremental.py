@@ -0,0 +1,94 @@
+"""Dispatch incrémental : une source modifiée à la fois, comparé à un dispatch complet."""
+
+import numpy as np
+import pytest
+
+from data import ORDRE_MERIT
+from scenarios import charger_scenario, lister_scenarios
+from simulation import (
+    _sequence_dispatch,
+    calculer_dispatch,
+    calculer_etat_dispatch,
+    calculer_production_lot,
+    dispatch_depuis_etat,
+    modifier_source,
+    simuler,
+)
+
+NB_MIX = 40
+NB_MODIFICATIONS = 15
+
+
+def _maximums(scenario) -> np.ndarray:
+    return np.array([scenario.moyens[s]["max_unites"] for s in ORDRE_MERIT])
+
+
+@pytest.mark.parametrize("scenario_id", lister_scenarios())
+def test_modifications_aleatoires_identiques_au_dispatch_complet(scenario_id):
+    scenario = charger_scenario(scenario_id)
+    sequence = _sequence_dispatch(scenario)
+    rng = np.random.default_rng(3)
+    arrets_anticipes = 0
+
+    for _ in range(NB_MIX):
+        unites = rng.integers(0, _maximums(scenario) + 1).astype(float)
+        etat = calculer_etat_dispatch(unites, scenario)
+        assert np.array_equal(np.array(etat["production"]), calculer_production_lot(unites, scenario))
+
+        for _ in range(NB_MODIFICATIONS):
+            i = int(rng.integers(len(ORDRE_MERIT)))
+            delta = int(rng.integers(-8, 9))
+            production_avant = [ligne.copy() for ligne in etat["production"]]
+            nouveau = modifier_source(etat, ORDRE_MERIT[i], delta, scenario)
+            unites = unites.copy()
+            unites[i] = max(0, unites[i] + delta)
+
+            # Au bit près : production, puis toutes les colonnes du résultat (prix, déficit...)
+            assert np.array_equal(np.array(nouveau["production"]), calculer_production_lot(unites, scenario))
+            attendu = calculer_dispatch(dict(zip(ORDRE_MERIT, unites)), (), scenario)
+            obtenu = dispatch_depuis_etat(nouveau, scenario)
+            for colonne in attendu:
+                assert np.array_equal(obtenu[colonne], attendu[colonne]), colonne
+
+            # L'état d'origine n'est pas modifié
+            assert all(np.array_equal(a, b) for a, b in zip(etat["production"], production_avant))
+
+            # Arrêt anticipé : les étages après la source, non rejoués, sont partagés
+            apres = sequence[sequence.index(i) + 1:]
+            if apres and all(nouveau["production"][j] is etat["production"][j] for j in apres):
+                arrets_anticipes += 1
+            etat = nouveau
+
+    assert arrets_anticipes > 0
+
+
+def test_arret_anticipe_sur_une_source_en_reserve():
+    # Le gaz couvre toute la demande restante : du charbon en plus (après le gaz dans
+    # la pile) ne produit rien, et la pile s'arrête aussitôt, sans rejouer le pétrole
+    scenario = charger_scenario("reference")
+    unites = np.array([20, 10, 10, 20, 0, 170, 0], dtype=float)
+    etat = calculer_etat_dispatch(unites, scenario)
+    sequence = _sequence_dispatch(scenario)
+    k = sequence.index(ORDRE_MERIT.index("charbon"))
+    assert k < sequence.index(ORDRE_MERIT.index("petrole"))
+
+    nouveau = modifier_source(etat, "charbon", 3, scenario)
+    unites[ORDRE_MERIT.index("charbon")] += 3
+    assert np.array_equal(np.array(nouveau["production"]), calculer_production_lot(unites, scenario))
+    assert nouveau["production"][ORDRE_MERIT.index("petrole")] is etat["production"][ORDRE_MERIT.index("petrole")]
+    assert all(nouveau["residus"][j] is etat["residus"][j] for j in range(k + 2, len(sequence) + 1))
+
+
+@pytest.mark.parametrize("scenario_id", ["reference", "semaine_sans_vent"])
+def test_simuler_en_deplacant_un_slider(scenario_id):
+    """simuler dérive un mix voisin d'un mix récent : même résultat qu'un dispatch complet."""
+    scenario = charger_scenario(scenario_id)
+    rng = np.random.default_rng(11)
+    unites = tuple(int(n) for n in rng.integers(0, _maximums(scenario) + 1))
+    for _ in range(30):
+        i = int(rng.integers(len(ORDRE_MERIT)))
+        unites = unites[:i] + (max(0, unites[i] + int(rng.integers(-5, 6))),) + unites[i + 1:]
+        dispatch, _ = simuler(unites, (), scenario_id)
+        attendu = calculer_dispatch(dict(zip(ORDRE_MERIT, unites)), (), scenario)
+        for colonne in attendu:
+            assert np.array_equal(dispatch[colonne], attendu[colonne]), colonne
@@ -0,0 +1,47 @@
+"""Export du dispatch : mêmes valeurs que le dispatch de l'interface, options comprises."""
+
+import numpy as np
+import pytest
+
+from data import FLEXIBILITE, ORDRE_MERIT
+from export import colonnes_export, exporter_dispatch, iterer_blocs_dispatch
+from simulation import calculer_dispatch
+
+MIXES = np.array([
+    [20, 10, 10, 20, 5, 40, 5],
+    [0, 0, 100, 100, 0, 10, 0],
+    [60, 0, 80, 60, 0, 0, 0],
+], dtype=float)
+FLEXIBILITES = np.array([0, 4, 8], dtype=float)
+
+
+@pytest.mark.parametrize("options", [(), ("ecretement",), ("engagement",), ("ecretement", "engagement", "pannes")])
+def test_export_suit_le_dispatch_de_l_interface(options):
+    # Blocs de 2 mix : le découpage ne change rien
+    blocs = list(iterer_blocs_dispatch(MIXES, 2, "reference", FLEXIBILITES, options))
+    colonnes = {nom: np.concatenate([bloc[nom] for bloc in blocs]) for nom in blocs[0]}
+
+    assert list(colonnes) == colonnes_export("reference", options)
+    for k, (unites, flexibilite) in enumerate(zip(MIXES, FLEXIBILITES)):
+        choix_joueur = {**dict(zip(ORDRE_MERIT, unites)), FLEXIBILITE: flexibilite}
+        dispatch = calculer_dispatch(choix_joueur, options, "reference")
+        lignes = colonnes["mix"] == k
+        for nom in colonnes_export("reference", options)[2:]:
+            np.testing.assert_allclose(colonnes[nom][lignes], dispatch[nom], atol=1e-9, err_msg=nom)
+
+
+@pytest.mark.parametrize("format_export", ["csv", "arrow", "parquet"])
+def test_colonnes_d_ecretement_selon_l_option(format_export):
+    pa = pytest.importorskip("pyarrow") if format_export != "csv" else None
+    for options in [(), ("ecretement",)]:
+        format_effectif, flux = exporter_dispatch(MIXES, format_export, "reference", FLEXIBILITES, options)
+        contenu = b"".join(flux)
+        if format_effectif == "csv":
+            noms = contenu.split(b"\n", 1)[0].decode("utf-8").split(",")
+        elif format_effectif == "arrow":
+            noms = pa.ipc.open_stream(contenu).schema.names
+        else:
+            import pyarrow.parquet as pq
+            noms = pq.read_schema(pa.BufferReader(contenu)).names
+        assert noms == colonnes_export("reference", options)
+        assert ("ecretement" in noms) == ("ecretement" in options)
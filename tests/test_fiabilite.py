@@ -0,0 +1,42 @@
+"""Fiabilité : pannes tirées, avec et sans pilotage de la demande."""
+
+import copy
+
+import numpy as np
+import pytest
+
+from data import FLEXIBILITE, ORDRE_MERIT
+from fiabilite import calculer_deficit_tirages, evaluer_fiabilite
+from scenarios import Scenario, decrire_scenario
+from simulation import calculer_dispatch, simuler
+
+UNITES = np.array([20, 10, 10, 20, 0, 30, 5], dtype=float)
+
+
+def _sans_pannes() -> Scenario:
+    """Niveau de référence où toutes les unités sont toujours disponibles."""
+    description = copy.deepcopy(decrire_scenario("reference"))
+    moyens = description.setdefault("moyens", {})
+    for source in ("nucleaire", "hydraulique", "charbon", "gaz", "petrole"):
+        moyens.setdefault(source, {})["disponibilite"] = 1.0
+    return Scenario("sans_pannes", description)
+
+
+@pytest.mark.parametrize("flexibilite", [None, 4, 10])
+def test_sans_pannes_meme_deficit_que_le_dispatch(flexibilite):
+    scenario = _sans_pannes()
+    deficit = calculer_deficit_tirages(UNITES, scenario, flexibilite, nb_tirages=3)
+    choix_joueur = {**dict(zip(ORDRE_MERIT, UNITES)), FLEXIBILITE: flexibilite or 0}
+    attendu = calculer_dispatch(choix_joueur, (), scenario)["deficit"]
+    for tirage in deficit:
+        np.testing.assert_allclose(tirage, attendu, atol=1e-6)
+
+
+def test_pilotage_de_la_demande_pris_en_compte():
+    sans = evaluer_fiabilite(UNITES, "reference")
+    assert evaluer_fiabilite(UNITES, "reference", 0)["eens"] == sans["eens"]
+    assert evaluer_fiabilite(UNITES, "reference", 10)["eens"] < sans["eens"]
+
+    # Option « pannes » de l'interface : le pilotage du mix est transmis
+    _, indicateurs = simuler(tuple(UNITES), ("pannes",), "reference", 10)
+    assert indicateurs["fiabilite"]["eens"] == evaluer_fiabilite(UNITES, "reference", 10)["eens"]
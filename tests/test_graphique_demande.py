@@ -0,0 +1,30 @@
+"""Courbe de demande de l'accueil : URL versionnée, cache HTTP seulement pour la version actuelle."""
+
+from urllib.parse import parse_qs, urlsplit
+
+import scenarios
+from app import server, url_graphique_demande
+from scenarios import enregistrer_scenario, version_scenarios
+
+
+def test_url_change_quand_le_niveau_est_recharge():
+    url = url_graphique_demande("en", "pointe_hiver")
+    assert urlsplit(url).path == "/graphiques/demande-en.json"
+    assert parse_qs(urlsplit(url).query) == {"s": ["pointe_hiver"], "v": [str(version_scenarios())]}
+
+    # Niveau réenregistré (comme un fichier modifié sur disque) : nouvelle version, nouvelle URL
+    chargeur, chemin = scenarios._REGISTRE["pointe_hiver"]
+    enregistrer_scenario("pointe_hiver", chargeur, chemin)
+    assert url_graphique_demande("en", "pointe_hiver") != url
+
+
+def test_cache_http_seulement_pour_la_version_actuelle():
+    client = server.test_client()
+    actuelle = client.get(url_graphique_demande("fr", "reference"))
+    assert actuelle.status_code == 200
+    assert actuelle.headers["Cache-Control"] == "public, max-age=86400"
+
+    perimee = client.get("/graphiques/demande-fr.json?s=reference&v=-1")
+    assert perimee.status_code == 200
+    assert perimee.headers["Cache-Control"] == "no-cache"
+    assert client.get("/graphiques/demande-xx.json?s=reference").status_code == 404
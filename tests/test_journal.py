@@ -0,0 +1,53 @@
+"""Journal des sessions : chaque appel noté du score affiché, servi par le cache ou non."""
+
+import csv
+import math
+
+import app
+from data import ORDRE_SLIDERS
+from journal import JournalSessions
+from simulation import simuler
+
+MIX = (20, 10, 10, 20, 5, 40, 5)
+_SORTIES = [
+    "contenu-principal.children", "main-title.children", "main-subtitle.children", "sidebar-wrapper.children",
+    "sidebar-investissement.children", "sidebar-puissance.children", "sidebar-warning.children",
+    "sidebar-partage.children",
+]
+
+
+def _requete(unites: tuple) -> dict:
+    """Corps d'une requête Dash du callback principal (niveau de référence, sans option)."""
+    entrees = {"lang-store": ("data", "fr"), "url": ("search", ""), "options-simulation": ("value", []),
+               "choix-scenario": ("value", "reference")}
+    entrees.update({f"slider-{s}": ("value", n) for s, n in zip(ORDRE_SLIDERS, unites)})
+    return {
+        "output": ".." + "...".join(_SORTIES) + "..",
+        "outputs": [dict(zip(("id", "property"), sortie.split("."))) for sortie in _SORTIES],
+        "inputs": [{"id": i, "property": p, "value": v} for i, (p, v) in entrees.items()],
+        "changedPropIds": ["slider-gaz.value"],
+        "state": [],
+    }
+
+
+def test_score_affiche_journalise_meme_servi_par_le_cache(tmp_path, monkeypatch):
+    journal = JournalSessions(str(tmp_path))
+    monkeypatch.setattr(app, "JOURNAL", journal)
+    app.CACHE_REPONSES.vider()
+    client = app.server.test_client()
+    client.get("/")
+
+    succes = app.CACHE_REPONSES.succes
+    for unites in (MIX + (0,), MIX + (0,), (0,) * len(ORDRE_SLIDERS)):
+        assert client.post("/_dash-update-component", json=_requete(unites)).status_code == 200
+    assert app.CACHE_REPONSES.succes == succes + 1
+    journal.vider()
+
+    (segment,) = tmp_path.glob("journal-*.csv")
+    with open(segment, encoding="utf-8") as f:
+        scores = [float(ligne["score"]) for ligne in csv.DictReader(f)]
+    _, indicateurs = simuler(MIX)
+    assert scores[:2] == [indicateurs["score_total"]] * 2
+    # Écran d'accueil : aucun score affiché
+    assert math.isnan(scores[2])
+    journal.fermer()
@@ -0,0 +1,22 @@
+"""Langue de l'interface : valeurs inconnues ramenées au français, caches par langue bornés."""
+
+from app import lire_entrees
+from components.metrics import _colonnes_details, _libelles_metriques, creer_tableau_details
+from data import ORDRE_SLIDERS
+from simulation import simuler
+from translations import LANGUES
+
+
+def test_langue_inconnue_ramenee_au_francais():
+    for lang in (None, "", "de", "x" * 1000):
+        assert lire_entrees(lang, "", [], "reference", [0] * len(ORDRE_SLIDERS), None)[0] == "fr"
+    assert lire_entrees("en", "", [], "reference", [0] * len(ORDRE_SLIDERS), None)[0] == "en"
+
+
+def test_caches_par_langue_bornes():
+    _, indicateurs = simuler((20, 10, 10, 20, 5, 40, 5))
+    for numero in range(50):
+        creer_tableau_details(indicateurs, f"forgee-{numero}")
+    for cache in (_libelles_metriques, _colonnes_details):
+        assert cache.cache_info().maxsize == len(LANGUES)
+    assert _colonnes_details.cache_info().currsize <= len(LANGUES)
@@ -0,0 +1,116 @@
+"""Calcul par lots : précision de stockage (float32 / float64) et budget mémoire."""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import lots
+from balayage import population_mix
+from bareme import compiler_bareme
+from lots import ecart_demande, planifier_blocs, type_stockage
+from scenarios import charger_scenario, lister_scenarios
+from simulation import _octets_par_mix, calculer_mesures_lot
+
+# Variantes du dispatch : options et unités de pilotage de la demande
+VARIANTES = [
+    {},
+    {"ecretement": True},
+    {"flexibilite": 6.0},
+    {"engagement": True},
+]
+
+
+@pytest.fixture(scope="module")
+def population():
+    return population_mix(1500, graine=7)
+
+
+# =============================================================================
+# Précision de stockage
+# =============================================================================
+
+def test_type_stockage():
+    assert type_stockage("float64") is np.float64
+    assert type_stockage("float32") is np.float32
+    with pytest.raises(ValueError):
+        type_stockage("float16")
+
+
+@pytest.mark.parametrize("scenario_id", lister_scenarios())
+@pytest.mark.parametrize("variante", VARIANTES, ids=lambda v: ",".join(v) or "base")
+def test_float32_meme_resultat_que_float64(population, scenario_id, variante):
+    scenario = charger_scenario(scenario_id)
+    mesures_64 = calculer_mesures_lot(population, scenario=scenario, precision="float64", **variante)
+    mesures_32 = calculer_mesures_lot(population, scenario=scenario, precision="float32", **variante)
+
+    np.testing.assert_array_equal(mesures_32["heures_deficit"], mesures_64["heures_deficit"])
+    for nom in ("taux_couverture", "part_co2_evitee", "lcoe", "ratio_surplus", "ratio_ecretement"):
+        np.testing.assert_allclose(mesures_32[nom], mesures_64[nom], rtol=1e-5, atol=1e-6, err_msg=nom)
+
+    bareme = compiler_bareme(scenario.bareme)
+    np.testing.assert_allclose(
+        bareme.noter(mesures_32)["score_total"], bareme.noter(mesures_64)["score_total"], atol=1e-4,
+    )
+
+
+def test_ecart_demande_ignore_les_residus_d_arrondi():
+    demande = np.array([60000.0, 60000.0, 60000.0])
+    production = np.array([60000.0 - 7e-12, 59000.0, 61000.0])
+    np.testing.assert_array_equal(ecart_demande(demande, production), [0.0, 1000.0, -1000.0])
+
+
+# =============================================================================
+# Budget mémoire
+# =============================================================================
+
+@pytest.mark.parametrize("nb_mix, octets, budget", [(0, 10, 100), (1, 10, 100), (95, 10, 100), (1000, 7, 64), (5, 500, 100)])
+def test_planifier_blocs(nb_mix, octets, budget):
+    blocs = planifier_blocs(nb_mix, octets, budget)
+    assert [i for bloc in blocs for i in range(nb_mix)[bloc]] == list(range(nb_mix))
+    tailles = [bloc.stop - bloc.start for bloc in blocs]
+    # Chaque bloc tient dans le budget (sauf un mix seul plus gros que le budget)
+    assert all(taille * octets <= budget or taille == 1 for taille in tailles)
+    # Blocs de même taille, à un mix près
+    assert max(tailles) - min(tailles) <= 1
+
+
+def test_budget_par_defaut_lu_dans_l_environnement():
+    code = "import lots; print(lots.BUDGET_MEMOIRE, lots.PRECISION_DEFAUT)"
+    env = dict(os.environ, GRID_GAME_MEMOIRE_LOT="3", GRID_GAME_PRECISION="float32")
+    sortie = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=os.path.dirname(lots.__file__),
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert sortie == [str(3 * 2**20), "float32"]
+
+
+@pytest.mark.parametrize("variante", VARIANTES, ids=lambda v: ",".join(v) or "base")
+def test_lot_decoupe_sous_le_budget(population, monkeypatch, variante):
+    scenario = charger_scenario("semaine_sans_vent")
+    octets = _octets_par_mix(
+        scenario, np.float64, variante.get("flexibilite"), variante.get("ecretement", False),
+        variante.get("engagement", False),
+    )
+    budget = 40 * octets
+    blocs_planifies = []
+
+    def espion(nb_mix, octets_par_mix, budget=None):
+        blocs = planifier_blocs(nb_mix, octets_par_mix, budget)
+        blocs_planifies.extend(blocs)
+        return blocs
+
+    # Budget par défaut = GRID_GAME_MEMOIRE_LOT, lu dans lots.BUDGET_MEMOIRE
+    monkeypatch.setattr(lots, "BUDGET_MEMOIRE", budget)
+    monkeypatch.setattr("simulation.planifier_blocs", espion)
+    unites = population[:500].reshape(50, 10, -1)
+    decoupe = calculer_mesures_lot(unites, scenario=scenario, **variante)
+
+    assert len(blocs_planifies) > 1
+    assert all((bloc.stop - bloc.start) * octets <= budget for bloc in blocs_planifies)
+    entier = calculer_mesures_lot(unites, scenario=scenario, budget=2**40, **variante)
+    for nom in entier:
+        assert decoupe[nom].shape == (50, 10)
+        np.testing.assert_array_equal(decoupe[nom], entier[nom], err_msg=nom)
@@ -0,0 +1,50 @@
+"""Noyaux d'engagement : versions compilées identiques à NumPy, chargement paresseux."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import noyaux
+
+RACINE = Path(__file__).resolve().parent.parent
+
+CAPACITE = np.array([100.0, 200.0, 300.0, 50.0])
+FRACTION_MIN = np.array([0.3, 0.5, 0.2, 0.0])
+MIN_MARCHE = np.array([3, 8, 1, 2])
+MIN_ARRET = np.array([2, 5, 1, 1])
+
+
+@pytest.mark.skipif(not noyaux.NUMBA_DISPONIBLE, reason="numba non installé")
+@pytest.mark.parametrize("nb_mix", [1, 40])
+def test_noyaux_compiles_identiques_a_numpy(nb_mix):
+    rng = np.random.default_rng(nb_mix)
+    nb_unites = rng.integers(0, 6, (nb_mix, 4))
+    demande_residuelle = rng.uniform(-500, 3000, (nb_mix, 300))
+
+    compile_ = noyaux.engager_lot(nb_unites, demande_residuelle, CAPACITE, FRACTION_MIN, MIN_MARCHE, MIN_ARRET)
+    reference = noyaux._engager_numpy(
+        nb_unites, demande_residuelle, CAPACITE, FRACTION_MIN, MIN_MARCHE, MIN_ARRET,
+    )
+    for obtenu, attendu in zip(compile_, reference):
+        np.testing.assert_array_equal(obtenu, attendu)
+
+
+@pytest.mark.skipif(not noyaux.NUMBA_DISPONIBLE, reason="numba non installé")
+def test_ni_import_ni_mix_seul_ne_demarrent_de_threads():
+    """Un fork après import noyaux ou un mix seul (maître gunicorn) ne doit pas hériter de TBB."""
+    script = (
+        "import numba, numpy as np, noyaux\n"
+        "noyaux.engager_lot(np.ones((1, 1)), np.ones((1, 24)), np.ones(1), np.zeros(1),"
+        " np.ones(1), np.ones(1))\n"
+        "try:\n"
+        "    print(numba.threading_layer())\n"
+        "except ValueError:\n"
+        "    print('aucune')\n"
+    )
+    sortie = subprocess.run(
+        [sys.executable, "-c", script], cwd=RACINE, capture_output=True, text=True, check=True,
+    )
+    assert sortie.stdout.strip() == "aucune"
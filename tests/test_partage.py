@@ -0,0 +1,102 @@
+"""Partage : codes de mix dimensionnés par le niveau, magasin de configurations nommées."""
+
+import copy
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import partage
+from data import FLEXIBILITE, ORDRE_MERIT
+from partage import MagasinConfigurations, NomPris, construire_lien, decoder_mix, encoder_mix
+from scenarios import SCENARIO_DEFAUT, Scenario, decrire_scenario
+
+MIX = {"nucleaire": 20, "hydraulique": 10, "eolien": 10, "solaire": 20, "charbon": 0, "gaz": 40, "petrole": 5}
+
+
+# =============================================================================
+# Codes de mix
+# =============================================================================
+
+def test_code_du_niveau_par_defaut_inchange():
+    assert encoder_mix(MIX) == "oRQFBYBSAA"
+    assert decoder_mix("oRQFBYBSAA") == {**MIX, FLEXIBILITE: 0}
+
+
+def test_code_dimensionne_par_le_catalogue_du_niveau():
+    description = copy.deepcopy(decrire_scenario("reference"))
+    description.setdefault("moyens", {})["gaz"] = {"max_unites": 400}
+    scenario = Scenario("grand_parc", description)
+    choix_joueur = {**MIX, "gaz": 400, FLEXIBILITE: 3}
+
+    code = encoder_mix(choix_joueur, scenario)
+    assert decoder_mix(code, scenario) == choix_joueur
+    with pytest.raises(ValueError):
+        encoder_mix(choix_joueur)
+
+
+# =============================================================================
+# Magasin de configurations
+# =============================================================================
+
+def test_configuration_garde_niveau_et_options(tmp_path):
+    magasin = MagasinConfigurations(str(tmp_path / "configurations.json"))
+    magasin.enregistrer("tp1", MIX, "pointe_hiver", ["engagement", "inconnue", "ecretement"])
+
+    assert magasin.charger("tp1") == ({**MIX, FLEXIBILITE: 0}, "pointe_hiver", ("ecretement", "engagement"))
+    assert magasin.charger("absente") is None
+
+
+def test_nom_pris_jamais_remplace(tmp_path):
+    chemin = tmp_path / "configurations.json"
+    magasin = MagasinConfigurations(str(chemin))
+    magasin.enregistrer("tp1", MIX)
+    # Un autre worker (instance distincte) ne remplace pas non plus
+    with pytest.raises(NomPris):
+        MagasinConfigurations(str(chemin)).enregistrer(" tp1 ", {**MIX, "gaz": 0})
+    assert magasin.charger("tp1")[0]["gaz"] == 40
+
+
+def test_entree_reduite_a_un_code(tmp_path):
+    chemin = tmp_path / "configurations.json"
+    chemin.write_text(json.dumps({"ancienne": "oRQFBYBSAA"}), encoding="utf-8")
+    assert MagasinConfigurations(str(chemin)).charger("ancienne") == ({**MIX, FLEXIBILITE: 0}, "reference", ())
+
+
+def test_enregistrements_simultanes_tous_conserves(tmp_path):
+    chemin = str(tmp_path / "configurations.json")
+
+    def enregistrer(numero):
+        # Une instance par enregistrement, comme autant de workers gunicorn
+        MagasinConfigurations(chemin).enregistrer(f"c{numero}", {**MIX, "gaz": numero})
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(enregistrer, range(40)))
+    configurations = MagasinConfigurations(chemin).lister()
+    assert sorted(configurations) == sorted(f"c{numero}" for numero in range(40))
+    assert not [f for f in tmp_path.iterdir() if f.suffix == ".tmp"]
+
+
+def test_lien_de_configuration_impose_niveau_et_options(tmp_path, monkeypatch):
+    magasin = MagasinConfigurations(str(tmp_path / "configurations.json"))
+    magasin.enregistrer("tp1", MIX, "choc_carbone", ("ecretement",))
+    monkeypatch.setattr(partage, "MAGASIN", magasin)
+
+    choix_joueur, scenario, options = partage.lire_url("?c=tp1")
+    assert [choix_joueur[s] for s in ORDRE_MERIT] == [MIX[s] for s in ORDRE_MERIT]
+    assert (scenario, options) == ("choc_carbone", ("ecretement",))
+    assert partage.lire_url("?c=absente&s=pointe_hiver") == (None, "pointe_hiver", None)
+    assert partage.lire_url("?m=oRQFBYBSAA&s=inconnu")[1:] == (None, ())
+
+
+@pytest.mark.parametrize("scenario, options", [
+    ("reference", ()),
+    ("pointe_hiver", ("engagement",)),
+    ("choc_carbone", ("ecretement", "engagement", "pannes")),
+])
+def test_lien_de_mix_aller_retour(scenario, options):
+    choix_joueur = {**MIX, FLEXIBILITE: 2}
+    lien = construire_lien(choix_joueur, "en", scenario, options)
+    choix_lu, scenario_lu, options_lues = partage.lire_url(lien)
+    # Le niveau par défaut n'est pas écrit dans le lien
+    assert (choix_lu, scenario_lu or SCENARIO_DEFAUT, options_lues) == (choix_joueur, scenario, options)
@@ -0,0 +1,335 @@
+"""
+Trajectoire d'investissement — la transition du parc sur plusieurs années.
+
+Le jeu note un parc sur l'horizon d'un niveau (une journée, une semaine) :
+cout_construction et duree_vie n'y servent qu'au LCOE annualisé. Une
+trajectoire suit le parc année par année, de 10 à 30 ans, selon un plan :
+    {
+      "annees": 20,
+      "parc_initial": {"charbon": 40, "gaz": 30, "nucleaire": 20},
+      "flexibilite": 0,
+      "actions": [
+        {"annee": 3, "source": "eolien", "unites": 40},
+        {"annee": 5, "source": "charbon", "unites": -20}
+      ],
+      "croissance_demande": 0.01,
+      "taux_actualisation": 0.04
+    }
+Une action positive met des unités en service au début de l'année, une
+action négative retire les unités les plus anciennes de la source. Le parc
+initial est construit l'année 0 ; chaque unité est retirée d'office au bout
+de sa duree_vie (les unités de pilotage de la demande, en nombre fixe, sont
+renouvelées). La demande de l'année a est scenario.demande × (1 + croissance)^a,
+ou scenario.demande × facteurs_demande[a] si la liste est donnée.
+
+Chaque année est le dispatch de l'horizon du niveau avec le parc et la
+demande de l'année, ramené à l'année (× 365 / nb_jours). Le plan fixe le parc
+de chaque année : les années ne dépendent pas les unes des autres, et toutes
+celles à simuler le sont en un seul calcul par lots (calculer_mesures_lot,
+une demande par année). Un état annuel (parc, demande) déjà simulé est repris
+de la mémoire : retoucher une action ne resimule que les années dont le parc
+change, et une année dont le parc et la demande ne changent pas (croissance
+nulle) est simulée une fois.
+
+Bilan : coût actualisé (investissements et exploitation, moins la valeur
+résiduelle des unités encore en service à la fin), CO₂ cumulé, et LCOE de la
+trajectoire (coût actualisé / énergie servie actualisée).
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from bareme import compiler_bareme
+from data import FLEXIBILITE, ORDRE_MERIT
+from scenarios import Scenario, SCENARIO_DEFAUT, charger_scenario
+from simulation import calculer_mesures_lot
+
+# Durée maximale d'une trajectoire (années)
+ANNEES_MAX = 50
+
+# Taux d'actualisation par défaut des coûts et de l'énergie (par an)
+TAUX_ACTUALISATION = 0.04
+
+# Bilans annuels déjà simulés : (scenario, options, flexibilite, parc, facteur de demande) → bilan
+_BILANS: OrderedDict = OrderedDict()
+_NB_BILANS = 4096
+_VERROU_BILANS = threading.Lock()
+
+# Mesures gardées pour chaque année (voir calculer_mesures_lot), plus le score
+_MESURES_ANNUELLES = ("taux_couverture", "heures_deficit", "co2_total", "cout_total")
+
+
+# =============================================================================
+# Plan et parc année par année
+# =============================================================================
+
+def _entier(valeur, contexte: str) -> int:
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, float)) or valeur != int(valeur):
+        raise ValueError(f"{contexte} : entier attendu, reçu {valeur!r}")
+    return int(valeur)
+
+
+def facteurs_demande(plan: dict) -> np.ndarray:
+    """Facteur de la demande de chaque année (tableau (A,)), 1 l'année 0 avec une croissance."""
+    annees = _entier(plan.get("annees", 20), "annees")
+    if not 1 <= annees <= ANNEES_MAX:
+        raise ValueError(f"annees : entre 1 et {ANNEES_MAX}, reçu {annees}")
+    if plan.get("facteurs_demande") is not None:
+        facteurs = np.asarray(plan["facteurs_demande"], dtype=float)
+        if facteurs.shape != (annees,) or np.any(facteurs <= 0):
+            raise ValueError(f"facteurs_demande : {annees} facteurs positifs attendus")
+        return facteurs
+    croissance = float(plan.get("croissance_demande", 0.0))
+    if croissance <= -1:
+        raise ValueError(f"croissance_demande : supérieure à -1, reçu {croissance}")
+    return (1 + croissance) ** np.arange(annees)
+
+
+def calculer_parc(plan: dict, scenario: "str | Scenario | None" = None) -> dict:
+    """
+    Parc de chaque année d'un plan : mises en service, retraits (programmés ou
+    en fin de vie) et unités en service, par millésime.
+
+    Args:
+        plan: plan de la trajectoire (voir l'en-tête du module)
+        scenario: identifiant ou Scenario (défaut : SCENARIO_DEFAUT) — durées de vie et plafonds
+
+    Returns:
+        dict — parc, mises_en_service, retraits : tableaux (A, S) d'unités
+        (ordre ORDRE_MERIT) ; millesimes : {source: {année de mise en service: unités}}
+        encore en service à la fin de la trajectoire
+
+    Raises:
+        ValueError si le plan est invalide (source inconnue, année hors de la
+        trajectoire, retrait de plus d'unités qu'en service, parc au-delà de max_unites)
+    """
+    scenario = charger_scenario(scenario)
+    annees = len(facteurs_demande(plan))
+    nb_sources = len(ORDRE_MERIT)
+
+    actions = [[] for _ in range(annees)]
+    for action in plan.get("actions", []):
+        source = action.get("source")
+        if source not in ORDRE_MERIT:
+            raise ValueError(f"Action : source inconnue {source!r}")
+        annee = _entier(action.get("annee"), f"Action {source}, annee")
+        if not 0 <= annee < annees:
+            raise ValueError(f"Action {source} : année {annee} hors de la trajectoire (0 à {annees - 1})")
+        actions[annee].append((ORDRE_MERIT.index(source), _entier(action.get("unites"), f"Action {source}, unites")))
+
+    duree_vie = [int(scenario.moyens[s].get("duree_vie", 30)) for s in ORDRE_MERIT]
+    maximums = [scenario.moyens[s].get("max_unites") for s in ORDRE_MERIT]
+    parc = np.zeros((annees, nb_sources), dtype=np.int64)
+    mises_en_service = np.zeros_like(parc)
+    retraits = np.zeros_like(parc)
+
+    # Unités en service, par millésime (année de mise en service → unités), dans l'ordre de construction
+    millesimes = [{} for _ in ORDRE_MERIT]
+    for source, unites in (plan.get("parc_initial") or {}).items():
+        if source not in ORDRE_MERIT:
+            raise ValueError(f"Parc initial : source inconnue {source!r}")
+        unites = _entier(unites, f"Parc initial {source}")
+        if unites < 0:
+            raise ValueError(f"Parc initial {source} : nombre d'unités négatif")
+        if unites:
+            millesimes[ORDRE_MERIT.index(source)][0] = unites
+            mises_en_service[0, ORDRE_MERIT.index(source)] += unites
+
+    for annee in range(annees):
+        for i in range(nb_sources):
+            # Fin de vie : retrait au début de l'année
+            for millesime in [m for m in millesimes[i] if annee - m >= duree_vie[i]]:
+                retraits[annee, i] += millesimes[i].pop(millesime)
+        for i, unites in actions[annee]:
+            if unites > 0:
+                millesimes[i][annee] = millesimes[i].get(annee, 0) + unites
+                mises_en_service[annee, i] += unites
+                continue
+            a_retirer = -unites
+            if a_retirer > sum(millesimes[i].values()):
+                raise ValueError(
+                    f"Année {annee} : retrait de {a_retirer} unités {ORDRE_MERIT[i]}, "
+                    f"{sum(millesimes[i].values())} en service"
+                )
+            retraits[annee, i] += a_retirer
+            # Les plus anciennes d'abord
+            for millesime in sorted(millesimes[i]):
+                retire = min(a_retirer, millesimes[i][millesime])
+                millesimes[i][millesime] -= retire
+                a_retirer -= retire
+                if not millesimes[i][millesime]:
+                    del millesimes[i][millesime]
+                if not a_retirer:
+                    break
+        parc[annee] = [sum(m.values()) for m in millesimes]
+        for i, maximum in enumerate(maximums):
+            if maximum is not None and parc[annee, i] > maximum:
+                raise ValueError(f"Année {annee} : {parc[annee, i]} unités {ORDRE_MERIT[i]} (maximum {maximum})")
+
+    return {
+        "parc": parc,
+        "mises_en_service": mises_en_service,
+        "retraits": retraits,
+        "millesimes": {ORDRE_MERIT[i]: dict(m) for i, m in enumerate(millesimes) if m},
+    }
+
+
+# =============================================================================
+# Bilans annuels (mémorisés par état du parc)
+# =============================================================================
+
+def _bilans_annuels(
+    parcs: np.ndarray,
+    facteurs: np.ndarray,
+    scenario: Scenario,
+    options: tuple,
+    flexibilite: int,
+) -> dict:
+    """
+    Mesures et score de chaque année (tableaux (A,)) : les états (parc, demande)
+    absents de la mémoire sont simulés ensemble, en un lot.
+
+    Returns:
+        dict {mesure: tableau (A,)} (_MESURES_ANNUELLES et "score"), et
+        "annees_simulees" : nombre d'états simulés par cet appel
+    """
+    # La clé porte les seules options qui changent le dispatch (les pannes sont tirées au hasard)
+    options = ("ecretement" in options, "engagement" in options)
+    cles = [
+        (scenario, options, flexibilite, tuple(parc.tolist()), float(facteur))
+        for parc, facteur in zip(parcs, facteurs)
+    ]
+    with _VERROU_BILANS:
+        bilans = {cle: _BILANS[cle] for cle in cles if cle in _BILANS}
+        for cle in bilans:
+            _BILANS.move_to_end(cle)
+    manquantes = list(dict.fromkeys(cle for cle in cles if cle not in bilans))
+
+    if manquantes:
+        # Années indépendantes : un seul dispatch par lots, une ligne (parc, demande) par état
+        unites = np.array([cle[3] for cle in manquantes], dtype=float)
+        demande = np.array([cle[4] for cle in manquantes])[:, None] * scenario.demande
+        mesures = calculer_mesures_lot(
+            unites, scenario=scenario, flexibilite=np.full(len(manquantes), float(flexibilite)) if flexibilite else None,
+            ecretement=options[0], engagement=options[1], demande=demande,
+        )
+        scores = compiler_bareme(scenario.bareme).noter(mesures)["score_total"]
+        nouveaux = {
+            cle: {
+                **{nom: float(mesures[nom][k]) for nom in _MESURES_ANNUELLES},
+                "score": float(scores[k]),
+            }
+            for k, cle in enumerate(manquantes)
+        }
+        bilans.update(nouveaux)
+        with _VERROU_BILANS:
+            _BILANS.update(nouveaux)
+            while len(_BILANS) > _NB_BILANS:
+                _BILANS.popitem(last=False)
+
+    resultat = {
+        nom: np.array([bilans[cle][nom] for cle in cles])
+        for nom in (*_MESURES_ANNUELLES, "score")
+    }
+    resultat["annees_simulees"] = len(manquantes)
+    return resultat
+
+
+# =============================================================================
+# Trajectoire
+# =============================================================================
+
+def simuler_trajectoire(
+    plan: dict,
+    scenario: "str | Scenario | None" = SCENARIO_DEFAUT,
+    options: tuple = (),
+) -> dict:
+    """
+    Simule une trajectoire d'investissement année par année.
+
+    Args:
+        plan: plan de la trajectoire (voir l'en-tête du module)
+        scenario: identifiant ou Scenario — horizon, profils et catalogue de chaque année
+        options: options de simulation (OPTIONS_SIMULATION) ; « pannes » est ignorée
+
+    Returns:
+        dict — par année (tableaux (A,) ou (A, S)) : annees, parc, capacite (MW),
+        mises_en_service, retraits, facteur_demande, pointe_demande (MW), investissement et cout_exploitation (M€),
+        co2 (tCO₂), energie_demandee et energie_servie (MWh), taux_couverture (%),
+        heures_deficit (sur l'horizon du niveau), score ;
+        bilan : cout_actualise et valeur_residuelle (M€), co2_cumule (tCO₂),
+        lcoe (€/MWh, actualisé), annees_deficit, score_moyen, annees_simulees
+
+    Raises:
+        ValueError si le plan est invalide (voir calculer_parc)
+    """
+    scenario = charger_scenario(scenario)
+    facteurs = facteurs_demande(plan)
+    flotte = calculer_parc(plan, scenario)
+    flexibilite = _entier(plan.get(FLEXIBILITE) or 0, FLEXIBILITE)
+    if flexibilite < 0:
+        raise ValueError(f"{FLEXIBILITE} : nombre d'unités négatif")
+    taux = float(plan.get("taux_actualisation", TAUX_ACTUALISATION))
+    annees = len(facteurs)
+    echelle = 365 / scenario.nb_jours
+    parc = flotte["parc"]
+
+    bilans = _bilans_annuels(parc, facteurs, scenario, tuple(options), flexibilite)
+
+    # Pilotage de la demande : parc fixe, renouvelé en fin de vie
+    parametres = scenario.flexibilite
+    vie_flex = int(parametres["duree_vie"])
+    investissement = flotte["mises_en_service"] @ scenario.cout_construction
+    cout_flex = flexibilite * parametres["cout_construction"]
+    investissement[::vie_flex] += cout_flex
+
+    # Exploitation : le coût total de l'horizon moins la construction du parc, ramené à l'année
+    cout_exploitation = (bilans["cout_total"] - parc @ scenario.cout_construction - cout_flex) * echelle
+    co2 = bilans["co2_total"] * echelle
+    energie_demandee = facteurs * scenario.demande.sum() * echelle
+    energie_servie = energie_demandee * bilans["taux_couverture"] / 100
+
+    # Valeur résiduelle : part de vie restante des unités encore en service à la fin
+    valeur_residuelle = sum(
+        unites * scenario.moyens[source]["cout_construction"]
+        * (millesime + scenario.moyens[source].get("duree_vie", 30) - annees)
+        / scenario.moyens[source].get("duree_vie", 30)
+        for source, millesimes in flotte["millesimes"].items()
+        for millesime, unites in millesimes.items()
+    )
+    if flexibilite:
+        dernier_renouvellement = (annees - 1) // vie_flex * vie_flex
+        valeur_residuelle += cout_flex * (dernier_renouvellement + vie_flex - annees) / vie_flex
+
+    actualisation = (1 + taux) ** -np.arange(annees)
+    cout_actualise = (
+        (investissement + cout_exploitation) @ actualisation - valeur_residuelle * (1 + taux) ** -annees
+    )
+    energie_actualisee = energie_servie @ actualisation
+
+    return {
+        "annees": np.arange(annees),
+        "parc": parc,
+        "capacite": parc * scenario.puissance,
+        "mises_en_service": flotte["mises_en_service"],
+        "retraits": flotte["retraits"],
+        "facteur_demande": facteurs,
+        "pointe_demande": facteurs * scenario.demande.max(),
+        "investissement": investissement,
+        "cout_exploitation": cout_exploitation,
+        "co2": co2,
+        "energie_demandee": energie_demandee,
+        "energie_servie": energie_servie,
+        "taux_couverture": bilans["taux_couverture"],
+        "heures_deficit": bilans["heures_deficit"].astype(int),
+        "score": bilans["score"],
+        "cout_actualise": float(cout_actualise),
+        "valeur_residuelle": float(valeur_residuelle),
+        "co2_cumule": float(co2.sum()),
+        "lcoe": float(cout_actualise * 1e6 / energie_actualisee) if energie_actualisee > 0 else 0.0,
+        "annees_deficit": int((bilans["heures_deficit"] > 0).sum()),
+        "score_moyen": float(bilans["score"].mean()),
+        "annees_simulees": bilans["annees_simulees"],
+    }
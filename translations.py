@@ -8,6 +8,10 @@ Usage :
 La langue est passée en paramètre (« fr » ou « en »).
 """
 
+# Langues disponibles dans l'interface
+LANGUES = ("fr", "en")
+
+
 # =============================================================================
 # Dictionnaire de traductions  { clé: { "fr": ..., "en": ... } }
 # =============================================================================
@@ -56,6 +60,69 @@ _TRADUCTIONS: dict[str, dict[str, str]] = {
         "en": "⚠️ Installed capacity is below peak demand!",
     },
 
+    "flexibilite_titre": {
+        "fr": "🔌 Pilotage de la demande",
+        "en": "🔌 Demand response",
+    },
+    "flexibilite_caption": {
+        "fr": "{puissance} MW reportables | {cout} M€ | ≤ {part} % de la demande",
+        "en": "{puissance} MW shiftable | {cout} M€ | ≤ {part}% of demand",
+    },
+    "flexibilite_note": {
+        "fr": "🔌 Pilotage de la demande : {energie} MWh de consommation reportés des pointes vers les creux.",
+        "en": "🔌 Demand response: {energie} MWh of consumption shifted from peaks to valleys.",
+    },
+
+    # --- Niveaux (scénarios) ---
+    "scenario_titre": {
+        "fr": "🎯 Niveau",
+        "en": "🎯 Level",
+    },
+
+    # --- Options de simulation ---
+    "option_engagement": {
+        "fr": " Engagement unité par unité (durées min. de marche / d'arrêt)",
+        "en": " Unit-by-unit commitment (min. up / down times)",
+    },
+    "option_pannes": {
+        "fr": " Pannes fortuites (fiabilité sur des journées tirées au hasard)",
+        "en": " Forced outages (reliability over random days)",
+    },
+    "option_ecretement": {
+        "fr": " Écrêtement des renouvelables (l'excédent n'est plus injecté)",
+        "en": " Renewable curtailment (excess is no longer fed in)",
+    },
+    "ecretement_note": {
+        "fr": "✂️ Écrêtement : {energie} MWh de solaire / éolien non produits, {cout} M€ d'indemnités.",
+        "en": "✂️ Curtailment: {energie} MWh of solar / wind not produced, €{cout}M in compensation.",
+    },
+
+    # --- Partage ---
+    "partage_lien": {
+        "fr": "🔗 Lien vers ce mix",
+        "en": "🔗 Link to this mix",
+    },
+    "export_titre": {
+        "fr": "⬇️ Dispatch horaire :",
+        "en": "⬇️ Hourly dispatch:",
+    },
+    "partage_nom": {
+        "fr": "Nom de la configuration",
+        "en": "Configuration name",
+    },
+    "partage_enregistrer": {
+        "fr": "💾 Enregistrer",
+        "en": "💾 Save",
+    },
+    "partage_enregistre": {
+        "fr": "✅ Enregistrée : {nom}",
+        "en": "✅ Saved: {nom}",
+    },
+    "partage_nom_pris": {
+        "fr": "⚠️ Le nom « {nom} » est déjà pris : choisissez-en un autre",
+        "en": "⚠️ The name \"{nom}\" is already taken: choose another one",
+    },
+
     # --- Métriques ---
     "metric_score": {
         "fr": "SCORE GLOBAL",
@@ -82,6 +149,36 @@ _TRADUCTIONS: dict[str, dict[str, str]] = {
         "en": "SURPLUS (-{malus} pts)",
     },
 
+    "metric_lole": {
+        "fr": "HEURES DE DÉFAILLANCE / JOUR (LOLE)",
+        "en": "LOSS-OF-LOAD HOURS / DAY (LOLE)",
+    },
+    "metric_eens": {
+        "fr": "ÉNERGIE NON DISTRIBUÉE / JOUR (EENS)",
+        "en": "ENERGY NOT SERVED / DAY (EENS)",
+    },
+    "metric_lolp": {
+        "fr": "JOURNÉES AVEC DÉFAILLANCE",
+        "en": "DAYS WITH LOSS OF LOAD",
+    },
+    "metric_cout_actualise": {"fr": "COÛT ACTUALISÉ", "en": "DISCOUNTED COST"},
+    "metric_lcoe_trajectoire": {"fr": "LCOE DE LA TRAJECTOIRE", "en": "PATHWAY LCOE"},
+    "metric_co2_cumule": {"fr": "CO₂ CUMULÉ", "en": "CUMULATIVE CO₂"},
+    "metric_annees_deficit": {"fr": "ANNÉES AVEC DÉFICIT", "en": "YEARS WITH DEFICIT"},
+    "metric_score_moyen": {"fr": "SCORE MOYEN", "en": "AVERAGE SCORE"},
+    "fiabilite_note": {
+        "fr": (
+            "🎲 Pannes fortuites : espérances sur {tirages} tirages au hasard. "
+            "Chaque centrale tombe en panne et est réparée aléatoirement : "
+            "beaucoup de petites unités sont plus fiables que quelques grosses."
+        ),
+        "en": (
+            "🎲 Forced outages: expected values over {tirages} random draws. "
+            "Each plant fails and is repaired at random: "
+            "many small units are more reliable than a few large ones."
+        ),
+    },
+
     # --- Messages d'état ---
     "msg_bravo": {
         "fr": "Bravo !",
@@ -147,6 +244,14 @@ _TRADUCTIONS: dict[str, dict[str, str]] = {
         "fr": "💰 Coût vs CO₂ par source",
         "en": "💰 Cost vs CO₂ by Source",
     },
+    "section_carte": {
+        "fr": "🗺️ Explorer deux sources",
+        "en": "🗺️ Explore Two Sources",
+    },
+    "section_trajectoire": {
+        "fr": "🛤️ Trajectoire d'investissement",
+        "en": "🛤️ Investment Pathway",
+    },
     "section_courbe_charge": {
         "fr": "📈 Courbe de charge à couvrir (journée type)",
         "en": "📈 Load Curve to Cover (typical day)",
@@ -163,6 +268,8 @@ _TRADUCTIONS: dict[str, dict[str, str]] = {
     "col_cout_constr": {"fr": "Coût constr. (M€)", "en": "Constr. cost (M€)"},
     "col_cout_prod": {"fr": "Coût prod. (M€)", "en": "Prod. cost (M€)"},
     "col_co2_tonnes": {"fr": "CO₂ (tonnes)", "en": "CO₂ (tonnes)"},
+    "col_revenu": {"fr": "Revenu marché (M€)", "en": "Market revenue (M€)"},
+    "col_profit": {"fr": "Profit (M€)", "en": "Profit (M€)"},
 
     # --- Tableau caractéristiques ---
     "col_puissance": {"fr": "Puissance (MW)", "en": "Power (MW)"},
@@ -182,18 +289,59 @@ _TRADUCTIONS: dict[str, dict[str, str]] = {
     "legende_deficit": {"fr": "⚠️ Déficit (blackout)", "en": "⚠️ Deficit (blackout)"},
     "legende_construction": {"fr": "Construction", "en": "Construction"},
     "legende_production": {"fr": "Production", "en": "Production"},
+    "legende_ecretement": {"fr": "✂️ Écrêté", "en": "✂️ Curtailed"},
+    "legende_demande_initiale": {"fr": "Demande avant report", "en": "Demand before shifting"},
+    "legende_demande_enveloppe": {"fr": "Demande (min – max du jour)", "en": "Demand (daily min – max)"},
+    "axe_jour": {"fr": "Jour", "en": "Day"},
+    "axe_unites": {"fr": "unités", "en": "units"},
+    "axe_annee": {"fr": "Année", "en": "Year"},
+    "axe_capacite": {"fr": "Capacité installée (GW)", "en": "Installed capacity (GW)"},
+    "axe_co2_annuel": {"fr": "CO₂ (Mt/an)", "en": "CO₂ (Mt/yr)"},
+    "legende_pointe": {"fr": "📊 Pointe de demande", "en": "📊 Peak demand"},
+    "legende_co2_annuel": {"fr": "🏭 CO₂ annuel", "en": "🏭 Annual CO₂"},
+    "legende_votre_mix": {"fr": "⭐ Votre mix", "en": "⭐ Your mix"},
+
+    # --- Carte de deux sources ---
+    "carte_note": {
+        "fr": "Les autres sources gardent leur nombre d'unités actuel ; chaque case est un mix complet.",
+        "en": "Other sources keep their current number of units; each cell is a complete mix.",
+    },
+    "carte_mesure_score": {"fr": "Score", "en": "Score"},
+    "carte_mesure_couverture": {"fr": "Couverture (%)", "en": "Coverage (%)"},
+    "carte_meme_source": {"fr": "Choisissez deux sources différentes.", "en": "Pick two different sources."},
+
+    # --- Trajectoire d'investissement ---
+    "trajectoire_note": {
+        "fr": (
+            "Votre mix actuel est le parc de l'année 0. Programmez des mises en service (unités > 0) "
+            "et des retraits (unités < 0) ; les unités arrivées en fin de vie sont retirées d'office."
+        ),
+        "en": (
+            "Your current mix is the year-0 fleet. Schedule builds (units > 0) and retirements "
+            "(units < 0); units reaching end of life are retired automatically."
+        ),
+    },
+    "trajectoire_annees": {"fr": "Durée de la trajectoire (années)", "en": "Pathway length (years)"},
+    "trajectoire_croissance": {"fr": "Croissance de la demande (%/an)", "en": "Demand growth (%/yr)"},
+    "trajectoire_col_annee": {"fr": "Année", "en": "Year"},
+    "trajectoire_col_source": {"fr": "Source", "en": "Source"},
+    "trajectoire_col_unites": {"fr": "Unités (+ construire, − retirer)", "en": "Units (+ build, − retire)"},
+    "trajectoire_plan_invalide": {"fr": "Plan invalide : {erreur}", "en": "Invalid plan: {erreur}"},
 
     # --- Graphique hover ---
     "hover_production": {"fr": "Production", "en": "Production"},
     "hover_demande": {"fr": "Demande", "en": "Demand"},
     "hover_heure": {"fr": "Heure", "en": "Hour"},
     "hover_part": {"fr": "Part", "en": "Share"},
+    "hover_jour": {"fr": "Jour", "en": "Day"},
+    "hover_moyenne_jour": {"fr": "Moyenne du jour", "en": "Daily mean"},
 
     # --- Score breakdown ---
-    "score_couverture": {"fr": "Couverture\n(/40)", "en": "Coverage\n(/40)"},
-    "score_co2": {"fr": "CO₂\n(/30)", "en": "CO₂\n(/30)"},
-    "score_cout": {"fr": "Coût\n(/30)", "en": "Cost\n(/30)"},
-    "score_surplus": {"fr": "Surplus\n(malus)", "en": "Surplus\n(penalty)"},
+    "score_couverture": {"fr": "Couverture", "en": "Coverage"},
+    "score_co2": {"fr": "CO₂", "en": "CO₂"},
+    "score_cout": {"fr": "Coût", "en": "Cost"},
+    "score_surplus": {"fr": "Surplus", "en": "Surplus"},
+    "score_malus": {"fr": "malus", "en": "penalty"},
     "score_max": {"fr": "Maximum", "en": "Maximum"},
     "score_votre": {"fr": "Votre score", "en": "Your score"},
 